@@ -9,9 +9,11 @@ https://github.com/unbekanntes-pferd/dracoon-python-api
 
 __version__ = "0.3.1"
 
+import os
 import sys
 import asyncio
 import argparse
+from datetime import datetime
 from rich.console import Console
 from rich.table import Table
 from rich.prompt import Prompt, Confirm
@@ -20,10 +22,22 @@ from rich import box
 from dracoon import DRACOON, OAuth2ConnectionType
 
 from lib import (
-    show_header, get_credentials, pause,
+    show_header, get_credentials, pause, apause, run_prompt,
+    ProvisioningClient, DataPrefetcher, TokenCache,
     COLOR_PRIMARY, COLOR_SUCCESS, COLOR_ERROR, COLOR_WARNING, COLOR_DIM, TABLE_BOX
 )
-from modules import user_to_group, room_admin_report, group_members_report, customer_email_export
+from lib.profiling import profile_run
+from lib.cassette import RecordingTransport, ReplayTransport, cassette_path, attach_to_dracoon
+from lib.query_service import SERVICE_HOST, SERVICE_PORT
+from lib.snapshot_watch import WATCH_INTERVAL, WATCH_CONCURRENCY, WATCH_FULL_EVERY, STRATEGY_COUNTS, STRATEGIES
+from modules import (
+    user_to_group, room_admin_report, group_members_report, customer_email_export, snapshot_manager,
+    customer_analytics, export_diff
+)
+
+
+# Access Token so viele Sekunden vor Ablauf erneuern (lange Läufe wie --watch)
+TOKEN_RENEW_MARGIN = 300
 
 
 class DracoonPyclient:
@@ -31,6 +45,14 @@ class DracoonPyclient:
         self.console = Console()
         self.dracoon = None
         self.god_mode = False
+        self.dry_run = False
+        self.use_token_cache = True
+        self.profile = False
+        self.cassette = None
+        self.prefetch = None
+        # (base_url, client_id, client_secret) und Token-Cache der OAuth-Verbindung - für reconnect()
+        self.oauth_app = None
+        self.token_cache = None
         
         # Available modules
         self.modules = [
@@ -61,6 +83,27 @@ class DracoonPyclient:
                 'description': 'Export all email addresses from all customers (Multi-Tenant)',
                 'module': customer_email_export,
                 'requires_connection': False  # Nutzt Provisioning API statt normalem SDK
+            },
+            {
+                'id': 5,
+                'name': 'Local Snapshot',
+                'description': 'Refresh the local SQLite snapshot used by the reports for offline queries',
+                'module': snapshot_manager,
+                'requires_connection': False  # OAuth und/oder Provisioning API, je nach Konfiguration
+            },
+            {
+                'id': 6,
+                'name': 'Customer Analytics (Reseller)',
+                'description': 'Cross-tenant figures (utilization, quota, roles, locked users) from the snapshot',
+                'module': customer_analytics,
+                'requires_connection': False  # Nur lokale Snapshot-Daten
+            },
+            {
+                'id': 7,
+                'name': 'Export Diff',
+                'description': 'Compare two email exports or snapshots: added, removed and changed users',
+                'module': export_diff,
+                'requires_connection': False  # Nur lokale Dateien
             }
         ]
     
@@ -77,26 +120,47 @@ class DracoonPyclient:
             self.console.print(f"[{COLOR_ERROR}]⚠️  GOD-MODE ACTIVE ⚠️[/{COLOR_ERROR}]\n")
         
         self.console.print(f"[bold {COLOR_PRIMARY}]Connect to Dracoon[/bold {COLOR_PRIMARY}]\n")
-        self.console.print(f"[{COLOR_DIM}]OAuth Password Grant Flow[/{COLOR_DIM}]\n")
+        self.console.print(f"[{COLOR_DIM}]OAuth Refresh Token (cached) / Password Grant Flow[/{COLOR_DIM}]\n")
         
-        # Credentials laden
-        base_url, client_id, client_secret, username, password = get_credentials()
+        # Credentials laden - Passwort wird nur abgefragt, wenn kein gültiger Refresh Token vorliegt
+        base_url, client_id, client_secret, username, password = get_credentials(ask_password=False)
         
         # Wenn alle Felder leer sind, OAuth überspringen
-        if not any([client_id, client_secret, username, password]):
-            if skip_on_error:
-                self.console.print(f"[{COLOR_WARNING}]No OAuth credentials found. Skipping OAuth authentication.[/{COLOR_WARNING}]")
-                return False
+        if not any([client_id, client_secret, username, password]) and skip_on_error:
+            self.console.print(f"[{COLOR_WARNING}]No OAuth credentials found. Skipping OAuth authentication.[/{COLOR_WARNING}]")
+            return False
         
         self.console.print(f"\n[{COLOR_WARNING}]Connecting to Dracoon...[/{COLOR_WARNING}]")
         
+        token_cache = TokenCache(base_url, client_id, client_secret, username) if self.use_token_cache else None
+        
         try:
-            self.dracoon = DRACOON(base_url=base_url, client_id=client_id, client_secret=client_secret)
+            connected = False
+            refresh_token = token_cache.load() if token_cache else None
             
-            # God-Mode am DRACOON-Objekt setzen
-            self.dracoon.god_mode = self.god_mode
+            if refresh_token:
+                self.dracoon = self._create_dracoon(base_url, client_id, client_secret)
+                try:
+                    await self.dracoon.connect(OAuth2ConnectionType.refresh_token, refresh_token=refresh_token,
+                                               full_info=False)
+                    connected = True
+                    self.console.print(f"[{COLOR_DIM}]Reconnected with cached refresh token[/{COLOR_DIM}]")
+                except Exception:
+                    # Token abgelaufen oder widerrufen - Password Grant als Fallback
+                    token_cache.clear()
             
-            await self.dracoon.connect(OAuth2ConnectionType.password_flow, username, password)
+            if not connected:
+                if not password:
+                    password = Prompt.ask(f"[{COLOR_PRIMARY}]Password[/{COLOR_PRIMARY}]", password=True)
+                
+                # Neuer Client - ein fehlgeschlagener Refresh schließt den HTTP-Client
+                self.dracoon = self._create_dracoon(base_url, client_id, client_secret)
+                await self.dracoon.connect(OAuth2ConnectionType.password_flow, username, password, full_info=False)
+            
+            if token_cache:
+                token_cache.save(self.dracoon.connection.refresh_token)
+            self.oauth_app = (base_url, client_id, client_secret)
+            self.token_cache = token_cache
             
             user_info = await self.dracoon.user.get_account_information()
             first_name = getattr(user_info, 'firstName', '')
@@ -115,6 +179,55 @@ class DracoonPyclient:
                 return await self.connect(skip_on_error)
             return False
     
+    def _create_dracoon(self, base_url, client_id, client_secret):
+        """DRACOON-Client mit God-Mode / Dry-Run am Objekt"""
+        dracoon = DRACOON(base_url=base_url, client_id=client_id, client_secret=client_secret)
+        dracoon.god_mode = self.god_mode
+        dracoon.dry_run = self.dry_run
+        if self.cassette:
+            attach_to_dracoon(dracoon, self.cassette)
+        return dracoon
+    
+    def use_cassette(self, transport):
+        """Leitet SDK und Provisioning API über den Aufnahme-/Wiedergabe-Transport (--record/--replay)"""
+        self.cassette = transport
+        ProvisioningClient.transport = transport
+        
+        if isinstance(transport, ReplayTransport):
+            # Wiedergegebene Tokens sind geschwärzt und dürfen den Token-Cache nicht überschreiben
+            self.use_token_cache = False
+            self.console.print(f"[{COLOR_WARNING}]Replaying {len(transport):,} recorded responses from {transport.path} "
+                               f"(latency x{transport.latency_scale:g})[/{COLOR_WARNING}]")
+        else:
+            self.console.print(f"[{COLOR_WARNING}]Recording anonymised API traffic to {transport.path}[/{COLOR_WARNING}]")
+    
+    def close_cassette(self):
+        """Schließt die Cassette und zeigt, was aufgenommen bzw. wiedergegeben wurde"""
+        if not self.cassette:
+            return
+        self.cassette.close()
+        if isinstance(self.cassette, ReplayTransport):
+            self.console.print(f"[{COLOR_DIM}]Cassette: {self.cassette.served:,} responses replayed, "
+                               f"{self.cassette.misses:,} requests without recording[/{COLOR_DIM}]")
+        else:
+            self.console.print(f"[{COLOR_DIM}]Cassette: {self.cassette.recorded:,} responses recorded to {self.cassette.path}[/{COLOR_DIM}]")
+    
+    def _start_prefetch(self):
+        """Startet Hintergrund-Ladevorgänge (Users, Groups, erste Kundenseite)"""
+        prov_client = None
+        base_url = os.getenv('DRACOON_BASE_URL')
+        service_token = os.getenv('DRACOON_SERVICE_TOKEN')
+        if base_url and service_token:
+            prov_client = ProvisioningClient(base_url, service_token)
+        
+        self.prefetch = DataPrefetcher(self.dracoon, prov_client)
+        
+        # Wie god_mode am DRACOON-Objekt ablegen, damit Module darauf zugreifen können
+        if self.dracoon:
+            self.dracoon.prefetch = self.prefetch
+        
+        self.prefetch.start()
+    
     def show_main_menu(self):
         """Shows the main menu"""
         self.console.clear()
@@ -123,6 +236,9 @@ class DracoonPyclient:
         if self.god_mode:
             self.console.print(f"[{COLOR_ERROR}]⚠️  GOD-MODE ACTIVE ⚠️[/{COLOR_ERROR}]\n")
         
+        if self.dry_run:
+            self.console.print(f"[{COLOR_WARNING}]DRY-RUN: Room deletions are only planned, nothing is deleted[/{COLOR_WARNING}]\n")
+        
         # Info über verfügbare Auth-Methoden
         if self.dracoon:
             self.console.print(f"[{COLOR_SUCCESS}]✓ OAuth connected[/{COLOR_SUCCESS}]")
@@ -184,19 +300,102 @@ class DracoonPyclient:
             if module.get('requires_connection', True) and self.dracoon is None:
                 self.console.print(f"\n[{COLOR_ERROR}]✗ This module requires OAuth authentication![/{COLOR_ERROR}]")
                 self.console.print(f"[{COLOR_WARNING}]Please configure OAuth credentials in .env[/{COLOR_WARNING}]\n")
-                pause(self.console)
+                await apause(self.console)
                 return
             
             # Manche Module benötigen keine DRACOON-Connection (z.B. Provisioning API)
             if module.get('requires_connection', True):
-                await module['module'].main(self.dracoon)
+                run = module['module'].main(self.dracoon)
+            else:
+                run = module['module'].main(self.dracoon, prefetch=self.prefetch)
+            
+            if self.profile:
+                await profile_run(self.console, module['module'].__name__.split('.')[-1], run)
             else:
-                await module['module'].main()
+                await run
         except Exception as e:
             self.console.print(f"\n[{COLOR_ERROR}]Error running module: {str(e)}[/{COLOR_ERROR}]\n")
             import traceback
             traceback.print_exc()
-            pause(self.console)
+            await apause(self.console)
+        finally:
+            # Verbrauchte Daten für den nächsten Modulstart neu vorladen
+            if self.prefetch:
+                self.prefetch.start()
+    
+    async def refresh_snapshot(self) -> bool:
+        """Aktualisiert den lokalen Snapshot ohne Menü (--refresh-snapshot)"""
+        connected = await self.connect(skip_on_error=True)
+        
+        ok = await snapshot_manager.refresh_snapshot(
+            self.console,
+            self.dracoon if connected else None,
+            snapshot_manager.provisioning_client_from_env()
+        )
+        
+        if connected:
+            await self.dracoon.logout()
+        
+        return ok
+    
+    async def reconnect(self) -> DRACOON:
+        """
+        Erneuert das Access Token über den Refresh Token, wenn es abgelaufen ist (lange Läufe)
+        
+        Returns:
+            Verbundener DRACOON-Client (bei Erneuerung ein neuer)
+        """
+        # Eigene Prüfung mit Puffer - die des SDK nutzt timedelta.seconds (läuft nach einem Tag über)
+        connection = self.dracoon.client.connection
+        age = (datetime.now() - connection.connected_at).total_seconds()
+        if age < connection.access_token_validity - TOKEN_RENEW_MARGIN:
+            return self.dracoon
+        
+        refresh_token = self.dracoon.connection.refresh_token
+        # Neuer Client - ein fehlgeschlagener Refresh schließt den HTTP-Client
+        self.dracoon = self._create_dracoon(*self.oauth_app)
+        await self.dracoon.connect(OAuth2ConnectionType.refresh_token, refresh_token=refresh_token, full_info=False)
+        if self.token_cache:
+            self.token_cache.save(self.dracoon.connection.refresh_token)
+        return self.dracoon
+    
+    async def watch_snapshot(self, interval: float, concurrency: int, strategy: str, full_every: int):
+        """Hält den lokalen Snapshot aktuell, bis der Lauf abgebrochen wird (--watch)"""
+        connected = await self.connect(skip_on_error=True)
+        prov_client = snapshot_manager.provisioning_client_from_env()
+        
+        if not connected and not prov_client:
+            self.console.print(f"[{COLOR_ERROR}]✗ Neither OAuth nor DRACOON_SERVICE_TOKEN configured - nothing to watch[/{COLOR_ERROR}]")
+            return False
+        
+        try:
+            await snapshot_manager.watch_snapshot(
+                self.console, self.dracoon if connected else None, prov_client,
+                interval=interval, concurrency=concurrency, strategy=strategy, full_every=full_every,
+                reconnect=self.reconnect if connected else None
+            )
+        finally:
+            if connected:
+                await self.dracoon.logout()
+        
+        return True
+    
+    async def serve_snapshot(self, host: str, port: int, interval: float, concurrency: int, strategy: str,
+                             full_every: int):
+        """Lokaler HTTP/JSON-Abfragedienst über den Snapshot, bis der Lauf abgebrochen wird (--serve)"""
+        connected = await self.connect(skip_on_error=True)
+        
+        try:
+            await snapshot_manager.serve_snapshot(
+                self.console, self.dracoon if connected else None, snapshot_manager.provisioning_client_from_env(),
+                host=host, port=port, interval=interval, concurrency=concurrency, strategy=strategy,
+                full_every=full_every, reconnect=self.reconnect if connected else None
+            )
+        finally:
+            if connected:
+                await self.dracoon.logout()
+        
+        return True
     
     async def run(self):
         """Main loop"""
@@ -223,16 +422,22 @@ class DracoonPyclient:
                 self.console.print(f"\n[{COLOR_WARNING}]OAuth not configured or connection failed.[/{COLOR_WARNING}]")
                 self.console.print(f"[{COLOR_DIM}]Only Provisioning API modules (Service Token) will be available.[/{COLOR_DIM}]\n")
             
-            pause(self.console)
+            # Users/Groups/Kunden laden, während der Operator am Prompt wartet
+            self._start_prefetch()
+            
+            await apause(self.console)
             
             while True:
-                selected_module = self.show_main_menu()
+                selected_module = await run_prompt(self.show_main_menu)
                 
                 if selected_module is None:
                     break
                 
                 await self.run_module(selected_module)
             
+            if self.prefetch:
+                self.prefetch.cancel()
+            
             if self.dracoon:
                 await self.dracoon.logout()
             
@@ -254,6 +459,106 @@ def main():
         action='store_true',
         help='Activates God-Mode (deletes rooms without confirmation - DANGEROUS!)'
     )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Plans room deletions and writes the plan log without deleting anything'
+    )
+    parser.add_argument(
+        '--no-token-cache',
+        action='store_true',
+        help='Always use the password grant (do not read or store the OAuth refresh token)'
+    )
+    parser.add_argument(
+        '--refresh-snapshot',
+        action='store_true',
+        help='Refresh the local snapshot (exports/snapshot.sqlite) and exit'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep the local snapshot warm: refresh changed customers, users and groups periodically until Ctrl+C'
+    )
+    parser.add_argument(
+        '--watch-interval',
+        type=float,
+        default=WATCH_INTERVAL / 60,
+        metavar='MINUTES',
+        help=f'With --watch: minutes between the start of two refresh cycles (default: {WATCH_INTERVAL / 60:g})'
+    )
+    parser.add_argument(
+        '--watch-concurrency',
+        type=int,
+        default=WATCH_CONCURRENCY,
+        metavar='N',
+        help=f'With --watch: parallel requests (default: {WATCH_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--watch-strategy',
+        choices=STRATEGIES,
+        default=STRATEGY_COUNTS,
+        help='With --watch: change detection - "counts" reloads only customers/groups whose user count changed, '
+             '"full" reloads everything every cycle (default: counts)'
+    )
+    parser.add_argument(
+        '--watch-full-every',
+        type=int,
+        default=WATCH_FULL_EVERY,
+        metavar='N',
+        help=f'With --watch-strategy counts: full reload every N cycles, 0 = never (default: {WATCH_FULL_EVERY})'
+    )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Run a local read-only HTTP/JSON query service on the snapshot (with --watch: refresh periodically)'
+    )
+    parser.add_argument(
+        '--serve-host',
+        default=SERVICE_HOST,
+        metavar='HOST',
+        help=f'With --serve: address to listen on (default: {SERVICE_HOST}, local only)'
+    )
+    parser.add_argument(
+        '--serve-port',
+        type=int,
+        default=SERVICE_PORT,
+        metavar='PORT',
+        help=f'With --serve: port (default: {SERVICE_PORT})'
+    )
+    parser.add_argument(
+        '--time-budget',
+        type=float,
+        metavar='MINUTES',
+        help='Run the customer email export for at most MINUTES (least recently exported customers first) and exit'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Profile each module run (cProfile + tracemalloc) and write stats and report to exports/'
+    )
+    parser.add_argument(
+        '--sorted',
+        action='store_true',
+        help='With --time-budget: sort the export by customer name and e-mail (on disk, bounded memory)'
+    )
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument(
+        '--record',
+        metavar='CASSETTE',
+        help='Record the API traffic (tokens and e-mail addresses anonymised) to exports/cassettes/CASSETTE.jsonl'
+    )
+    cassette.add_argument(
+        '--replay',
+        metavar='CASSETTE',
+        help='Answer all API requests from a recorded cassette instead of the server (offline)'
+    )
+    parser.add_argument(
+        '--replay-latency',
+        type=float,
+        default=1.0,
+        metavar='SCALE',
+        help='Scale the recorded latencies when replaying (1 = as recorded, 0 = no delay)'
+    )
     parser.add_argument(
         '--version',
         action='version',
@@ -262,10 +567,78 @@ def main():
     
     args = parser.parse_args()
     
+    if args.time_budget is not None and args.time_budget <= 0:
+        parser.error("--time-budget must be greater than 0")
+    if args.replay_latency < 0:
+        parser.error("--replay-latency must not be negative")
+    if args.watch_interval <= 0:
+        parser.error("--watch-interval must be greater than 0")
+    if args.watch_concurrency < 1:
+        parser.error("--watch-concurrency must be at least 1")
+    if args.watch_full_every < 0:
+        parser.error("--watch-full-every must not be negative")
+    if not 0 <= args.serve_port <= 65535:
+        parser.error("--serve-port must be between 0 and 65535")
+    
     app = DracoonPyclient()
     app.god_mode = args.god_mode
+    app.dry_run = args.dry_run
+    app.use_token_cache = not args.no_token_cache
+    app.profile = args.profile
     
-    asyncio.run(app.run())
+    if args.record:
+        app.use_cassette(RecordingTransport(cassette_path(args.record)))
+    elif args.replay:
+        try:
+            app.use_cassette(ReplayTransport(cassette_path(args.replay), args.replay_latency))
+        except (OSError, ValueError) as e:
+            parser.error(f"Cannot read cassette: {e}")
+    
+    try:
+        if args.refresh_snapshot:
+            run = app.refresh_snapshot()
+            if args.profile:
+                run = profile_run(app.console, 'refresh_snapshot', run)
+            sys.exit(0 if asyncio.run(run) else 1)
+        
+        if args.serve:
+            run = app.serve_snapshot(
+                args.serve_host, args.serve_port, args.watch_interval * 60 if args.watch else None,
+                args.watch_concurrency, args.watch_strategy, args.watch_full_every
+            )
+            if args.profile:
+                run = profile_run(app.console, 'serve', run)
+            try:
+                sys.exit(0 if asyncio.run(run) else 1)
+            except KeyboardInterrupt:
+                app.console.print(f"\n[{COLOR_WARNING}]Query service stopped[/{COLOR_WARNING}]\n")
+                sys.exit(0)
+        
+        if args.watch:
+            run = app.watch_snapshot(
+                args.watch_interval * 60, args.watch_concurrency, args.watch_strategy, args.watch_full_every
+            )
+            if args.profile:
+                run = profile_run(app.console, 'watch', run)
+            try:
+                sys.exit(0 if asyncio.run(run) else 1)
+            except KeyboardInterrupt:
+                app.console.print(f"\n[{COLOR_WARNING}]Watch stopped[/{COLOR_WARNING}]\n")
+                sys.exit(0)
+        
+        if args.time_budget is not None:
+            run = customer_email_export.run_budgeted(args.time_budget * 60, args.sorted)
+            if args.profile:
+                run = profile_run(app.console, 'customer_email_export', run)
+            sys.exit(0 if asyncio.run(run) else 1)
+        
+        try:
+            asyncio.run(app.run())
+        except KeyboardInterrupt:
+            # Strg+C während eines Prompts im Hintergrund-Thread
+            app.console.print(f"\n\n[{COLOR_WARNING}]Cancelled by user[/{COLOR_WARNING}]\n")
+    finally:
+        app.close_cassette()
 
 
 if __name__ == "__main__":
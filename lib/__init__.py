@@ -6,8 +6,12 @@ from .utils import (
     show_header,
     get_credentials,
     search_and_select_user,
+    parse_selection,
     export_to_csv,
+    read_table_file,
     pause,
+    apause,
+    run_prompt,
     COLOR_PRIMARY,
     COLOR_SUCCESS,
     COLOR_ERROR,
@@ -17,13 +21,19 @@ from .utils import (
 )
 
 from .provisioning import ProvisioningClient
+from .prefetch import DataPrefetcher
+from .token_cache import TokenCache
 
 __all__ = [
     'show_header',
     'get_credentials',
     'search_and_select_user',
+    'parse_selection',
     'export_to_csv',
+    'read_table_file',
     'pause',
+    'apause',
+    'run_prompt',
     'COLOR_PRIMARY',
     'COLOR_SUCCESS',
     'COLOR_ERROR',
@@ -31,4 +41,6 @@ __all__ = [
     'COLOR_DIM',
     'TABLE_BOX',
     'ProvisioningClient',
+    'DataPrefetcher',
+    'TokenCache',
 ]
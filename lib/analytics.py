@@ -0,0 +1,209 @@
+"""
+Dracoon Pyclient - Cross-Tenant Analytics
+Kennzahlen über Kunden (Auslastung, Quota, Vertragstypen, Anlagejahr) und gesammelte
+Kunden-User (Rollen, gesperrte User) - spaltenweise mit numpy statt Schleifen über Dicts
+"""
+
+import re
+from operator import itemgetter
+from typing import Dict, List
+
+import numpy as np
+
+
+ROLE_FLAGS = [
+    ('is_admin', "Tenant Admin"),
+    ('is_config_manager', "Config Manager"),
+    ('is_user_manager', "User Manager"),
+    ('is_group_manager', "Group Manager"),
+    ('is_room_manager', "Room Manager"),
+    ('is_audit_log', "Audit Log"),
+]
+
+# Auslastung (User / userMax) in Prozent
+UTILIZATION_BINS = [0, 50, 80, 100, 101, np.inf]
+UTILIZATION_LABELS = ["< 50%", "50-80%", "80-100%", "100% (full)", "> 100% (over limit)"]
+
+# Quota je Kunde in GB
+QUOTA_BINS = [0, 1, 10, 100, 1000, np.inf]
+QUOTA_LABELS = ["< 1 GB", "1-10 GB", "10-100 GB", "100 GB-1 TB", "> 1 TB"]
+
+# Anlagedatum im Format des E-Mail-Exports
+GERMAN_DATE = re.compile(r"\d{2}\.\d{2}\.\d{4}")
+
+
+class CustomerColumns:
+    """
+    Spaltenweise Sicht auf Kunden und Kunden-User
+
+    Kunden-Kennzahlen (userUsed, userMax, quotaMax, Vertragstyp, Anlagedatum) stammen aus der
+    Kundenliste und decken jeden Kunden ab. Die Zeilen des E-Mail-Exports enthalten nur User
+    mit E-Mail und liefern allein Rollen und Sperren.
+    """
+
+    def __init__(self, customers: List[Dict], rows: List[Dict]):
+        """
+        Args:
+            customers: Kunden im Format der Provisioning API (get_customers() bzw. Snapshot)
+            rows: Zeilen des E-Mail-Exports (eine Zeile je User mit E-Mail)
+        """
+        customers = sorted(customers, key=itemgetter('id'))
+        count = len(customers)
+
+        def customer_column(field: str, dtype):
+            return np.fromiter((customer.get(field) or 0 for customer in customers), dtype=dtype, count=count)
+
+        self.customers = customer_column('id', np.int64)
+        self.user_used = customer_column('userUsed', np.int64)
+        self.user_max = customer_column('userMax', np.int64)
+        self.quota_gb = customer_column('quotaMax', np.float64) / 1024 ** 3
+        self.customer_name = np.array([customer.get('companyName') or '' for customer in customers], dtype=object)
+        self.contract_type = np.array([customer.get('customerContractType') or '' for customer in customers], dtype=object)
+        self.created_at = np.array([customer.get('createdAt') or '' for customer in customers], dtype=object)
+
+        row_count = len(rows)
+
+        def column(field: str, dtype):
+            # itemgetter statt Lambda/Generator - die Umwandlung ist der einzige Durchlauf über die Dicts
+            return np.fromiter(map(itemgetter(field), rows), dtype=dtype, count=row_count)
+
+        customer_id = column('customer_id', np.int64)
+        is_locked = column('is_locked', bool)
+        roles = {flag: column(flag, bool) for flag, _ in ROLE_FLAGS}
+
+        # Zuordnung User -> Kunde; Zeilen unbekannter Kunden fallen heraus
+        position = np.searchsorted(self.customers, customer_id)
+        known = position < count
+        known[known] = self.customers[position[known]] == customer_id[known]
+        self.user_customer = position[known]
+        self.is_locked = is_locked[known]
+        self.roles = {flag: values[known] for flag, values in roles.items()}
+
+        self.users_with_email = np.bincount(self.user_customer, minlength=count)
+
+    def __len__(self) -> int:
+        """Anzahl User mit E-Mail"""
+        return len(self.user_customer)
+
+    def customer_sum(self, values: np.ndarray) -> np.ndarray:
+        """Summe einer User-Spalte je Kunde"""
+        return np.bincount(self.user_customer, weights=values, minlength=len(self.customers))
+
+
+def _created_years(created_at: np.ndarray) -> np.ndarray:
+    """Jahr aus ISO-Datum (auch mit Millisekunden) bzw. 'dd.mm.YYYY' (leer wenn unbekannt)"""
+    text = created_at.astype(str)
+    if not text.size:
+        return text
+    # 'dd.mm.YYYY' nur bei exakt diesem Format - ISO-Zeitstempel enthalten ebenfalls Punkte
+    dotted = np.array([GERMAN_DATE.fullmatch(value) is not None for value in text], dtype=bool)
+    years = np.where(dotted, np.char.rpartition(text, '.')[:, 2], np.char.partition(text, '-')[:, 0])
+    return np.where((np.char.str_len(years) == 4) & np.char.isdigit(years), years, '')
+
+
+def _distribution(values: np.ndarray, bins: list, labels: List[str]) -> List[tuple]:
+    """Histogramm als (Label, Anzahl)"""
+    counts, _ = np.histogram(values, bins=bins)
+    return list(zip(labels, counts.tolist()))
+
+
+def _value_counts(values: np.ndarray) -> List[tuple]:
+    """Häufigkeiten, absteigend sortiert"""
+    keys, counts = np.unique(values.astype(str), return_counts=True)
+    order = np.argsort(-counts, kind='stable')
+    return [(str(keys[i]) or '(none)', int(counts[i])) for i in order]
+
+
+def compute_summary(columns: CustomerColumns) -> Dict[str, List[tuple]]:
+    """
+    Berechnet alle Kennzahlen
+
+    Returns:
+        {Abschnitt: [(Kennzahl, Wert), ...]}
+    """
+    summary: Dict[str, List[tuple]] = {}
+    customer_count = len(columns.customers)
+    user_count = int(columns.user_used.sum())
+    email_count = len(columns)
+
+    locked_total = int(columns.is_locked.sum())
+    summary["Overview"] = [
+        ("Customers", customer_count),
+        ("Users (userUsed)", user_count),
+        ("Users per customer (avg)", round(user_count / customer_count, 1) if customer_count else 0),
+        ("Users per customer (median)", float(np.median(columns.user_used)) if customer_count else 0),
+        ("Users per customer (max)", int(columns.user_used.max()) if customer_count else 0),
+        ("Users with e-mail", email_count),
+        ("Locked users with e-mail", locked_total),
+        ("Locked ratio (users with e-mail)", f"{locked_total / email_count:.1%}" if email_count else "-"),
+    ]
+
+    # Auslastung nur für Kunden mit userMax
+    limited = columns.user_max > 0
+    utilization = columns.user_used[limited] / columns.user_max[limited] * 100
+    summary["Users vs. userMax"] = [
+        ("Customers with user limit", int(limited.sum())),
+        ("Average utilization", f"{utilization.mean():.1f}%" if utilization.size else "-"),
+    ] + _distribution(utilization, UTILIZATION_BINS, UTILIZATION_LABELS)
+
+    quota = columns.quota_gb
+    summary["Quota (quotaMax)"] = [
+        ("Total quota (GB)", round(float(quota.sum()), 1)),
+        ("Median quota (GB)", round(float(np.median(quota)), 1) if quota.size else 0),
+        ("90th percentile (GB)", round(float(np.percentile(quota, 90)), 1) if quota.size else 0),
+        ("Largest quota (GB)", round(float(quota.max()), 1) if quota.size else 0),
+    ] + _distribution(quota, QUOTA_BINS, QUOTA_LABELS)
+
+    summary["Roles (users with e-mail)"] = [
+        (label, int(columns.roles[flag].sum())) for flag, label in ROLE_FLAGS
+    ] + [
+        ("Customers without tenant admin",
+         int((columns.customer_sum(columns.roles['is_admin'].astype(np.float64)) == 0).sum())),
+    ]
+
+    # Anteil gesperrter User nur für Kunden mit mindestens einem User mit E-Mail
+    locked_per_customer = columns.customer_sum(columns.is_locked.astype(np.float64))
+    with_email = columns.users_with_email > 0
+    locked_ratio = locked_per_customer[with_email] / columns.users_with_email[with_email]
+    summary["Locked users per customer (users with e-mail)"] = [
+        ("Customers with locked users", int((locked_per_customer > 0).sum())),
+        ("Customers with only locked users", int((locked_ratio == 1).sum())),
+        ("Customers with > 50% locked", int((locked_ratio > 0.5).sum())),
+    ]
+
+    summary["Customers by contract type"] = _value_counts(columns.contract_type)
+
+    years = _created_years(columns.created_at)
+    summary["Customers by creation year"] = sorted(_value_counts(years))
+
+    return summary
+
+
+def customer_rows(columns: CustomerColumns) -> List[list]:
+    """
+    Eine Zeile je Kunde: Users (userUsed), userMax, Auslastung, User mit E-Mail, davon gesperrt
+    und Tenant Admins, Quota, Vertragstyp, Anlagejahr
+    """
+    users = columns.user_used
+    utilization = np.divide(users * 100.0, columns.user_max, out=np.zeros(len(users)), where=columns.user_max > 0)
+    with_email = columns.users_with_email
+    locked = columns.customer_sum(columns.is_locked.astype(np.float64)).astype(np.int64)
+    locked_ratio = np.divide(locked * 100.0, with_email, out=np.zeros(len(with_email)), where=with_email > 0)
+    admins = columns.customer_sum(columns.roles['is_admin'].astype(np.float64)).astype(np.int64)
+
+    return [
+        list(row) for row in zip(
+            columns.customers.tolist(),
+            columns.customer_name.tolist(),
+            columns.contract_type.tolist(),
+            users.tolist(),
+            columns.user_max.tolist(),
+            np.round(utilization, 1).tolist(),
+            with_email.tolist(),
+            locked.tolist(),
+            np.round(locked_ratio, 1).tolist(),
+            admins.tolist(),
+            np.round(columns.quota_gb, 1).tolist(),
+            _created_years(columns.created_at).tolist(),
+        )
+    ]
@@ -0,0 +1,217 @@
+"""
+Dracoon Pyclient - Cassettes
+Zeichnet den httpx-Verkehr von ProvisioningClient und SDK anonymisiert auf (--record) und
+spielt ihn offline wieder ab (--replay) - mit aufgezeichneten oder skalierten Latenzen
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+from dracoon import DRACOON
+
+
+CASSETTE_DIR = os.path.join("exports", "cassettes")
+CASSETTE_VERSION = 1
+
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+EMAIL_PLACEHOLDER = "<email>"
+# Werte dieser Schlüssel werden nie gespeichert (Vergleich ohne Groß-/Kleinschreibung)
+SECRET_KEYS = {
+    'access_token', 'refresh_token', 'id_token', 'token', 'password', 'client_secret',
+    'x-sds-service-token', 'x-sds-auth-token', 'authorization', 'privatekey', 'private_key',
+}
+REDACTED = "REDACTED"
+
+
+def cassette_path(name: str) -> str:
+    """Pfad einer Cassette - ein reiner Name landet in exports/cassettes/<name>.jsonl"""
+    if os.sep in name or name.endswith('.jsonl'):
+        return name
+    return os.path.join(CASSETTE_DIR, f"{name}.jsonl")
+
+
+def request_key(method: str, path: str, query: List[tuple]) -> tuple:
+    """Schlüssel für die Wiedergabe - E-Mails in Filtern sind bei Aufnahme und Wiedergabe gleich maskiert"""
+    return (method, path, tuple(sorted((key, EMAIL_PATTERN.sub(EMAIL_PLACEHOLDER, value)) for key, value in query)))
+
+
+class Anonymizer:
+    """Ersetzt E-Mails konsistent (gleiche Adresse -> gleiches Pseudonym) und entfernt Tokens"""
+
+    def __init__(self):
+        # Zufälliger Schlüssel je Aufnahme: Pseudonyme lassen sich nicht zurückrechnen
+        self._key = os.urandom(16)
+        self._emails: Dict[str, str] = {}
+
+    def email(self, address: str) -> str:
+        pseudonym = self._emails.get(address.lower())
+        if pseudonym is None:
+            digest = hmac.new(self._key, address.lower().encode(), hashlib.sha256).hexdigest()[:12]
+            pseudonym = f"user-{digest}@example.invalid"
+            self._emails[address.lower()] = pseudonym
+        return pseudonym
+
+    def clean(self, value):
+        """Anonymisiert JSON-Daten rekursiv"""
+        if isinstance(value, dict):
+            return {
+                key: REDACTED if key.lower() in SECRET_KEYS and item else self.clean(item)
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [self.clean(item) for item in value]
+        if isinstance(value, str):
+            return EMAIL_PATTERN.sub(lambda match: self.email(match.group(0)), value)
+        return value
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Leitet Requests an den echten Transport weiter und hängt jede Antwort anonymisiert
+    an die Cassette an (eine JSON-Zeile je Request)
+
+    Gespeichert werden Methode, Pfad, Query, Status, Content-Type, Body und Latenz -
+    keine Request-Header und keine Request-Bodies (Login-Daten, Service-Token).
+    """
+
+    def __init__(self, path: str, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.path = path
+        # Wie im SDK: Wiederholung bei Verbindungsfehlern
+        self.inner = inner or httpx.AsyncHTTPTransport(retries=5)
+        self.anonymizer = Anonymizer()
+        self.recorded = 0
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.file = open(path, 'w', encoding='utf-8')
+        self._write({'cassette': CASSETTE_VERSION, 'recorded_at': datetime.now().isoformat(timespec='seconds')})
+
+    def _write(self, entry: Dict):
+        self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        try:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        finally:
+            await response.aclose()
+        latency = time.perf_counter() - start
+
+        # Unveränderte Antwort für den Aufrufer, dekodierte Kopie für die Cassette
+        live = httpx.Response(response.status_code, headers=response.headers, content=raw,
+                              extensions=response.extensions, request=request)
+        copy = httpx.Response(response.status_code, headers=response.headers, content=raw, request=request)
+        copy.read()
+
+        content_type = copy.headers.get('content-type', '')
+        if 'json' in content_type and copy.content:
+            try:
+                body = self.anonymizer.clean(copy.json())
+            except ValueError:
+                body = self.anonymizer.clean(copy.text)
+        else:
+            body = self.anonymizer.clean(copy.text)
+
+        self._write({
+            'method': request.method,
+            'path': request.url.path,
+            'query': [[key, self.anonymizer.clean(value)] for key, value in request.url.params.multi_items()],
+            'status': response.status_code,
+            'content_type': content_type,
+            'body': body,
+            'latency': round(latency, 4),
+        })
+        self.recorded += 1
+        return live
+
+    async def aclose(self):
+        # Wird von jedem AsyncClient geteilt - der Transport bleibt bis close() offen
+        pass
+
+    def close(self):
+        self.file.close()
+
+
+class CassetteMissError(httpx.TransportError):
+    """Für einen Request gibt es keine Aufnahme"""
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Beantwortet Requests aus einer Cassette
+
+    Zuordnung über Methode, Pfad und Query (unabhängig von der Base-URL). Wird ein Request
+    öfter gestellt als aufgezeichnet, werden die Aufnahmen reihum wiederholt.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 1.0):
+        self.path = path
+        self.latency_scale = latency_scale
+        self.interactions: Dict[tuple, List[Dict]] = {}
+        self.positions: Dict[tuple, int] = {}
+        self.served = 0
+        self.misses = 0
+
+        with open(path, encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            if header.get('cassette') != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette format: {path}")
+            self.recorded_at = header.get('recorded_at')
+            for line in f:
+                entry = json.loads(line)
+                key = request_key(entry['method'], entry['path'], [tuple(item) for item in entry['query']])
+                self.interactions.setdefault(key, []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.interactions.values())
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request.method, request.url.path, request.url.params.multi_items())
+        entries = self.interactions.get(key)
+        if not entries:
+            self.misses += 1
+            raise CassetteMissError(f"No recorded response for {request.method} {request.url.path}", request=request)
+
+        position = self.positions.get(key, 0)
+        self.positions[key] = position + 1
+        entry = entries[position % len(entries)]
+
+        if self.latency_scale > 0:
+            await asyncio.sleep(entry['latency'] * self.latency_scale)
+
+        body = entry['body']
+        if isinstance(body, str):
+            content = body.encode('utf-8')
+        else:
+            content = json.dumps(body).encode('utf-8')
+
+        self.served += 1
+        return httpx.Response(
+            entry['status'],
+            headers={'content-type': entry['content_type']} if entry['content_type'] else None,
+            content=content,
+            request=request
+        )
+
+    async def aclose(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def attach_to_dracoon(dracoon: DRACOON, transport: httpx.AsyncBaseTransport):
+    """Ersetzt den HTTP-Client des SDK durch einen gleich konfigurierten mit Cassetten-Transport"""
+    http = dracoon.client.http
+    dracoon.client.http = httpx.AsyncClient(headers=http.headers, timeout=http.timeout, transport=transport)
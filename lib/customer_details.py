@@ -0,0 +1,91 @@
+"""
+Dracoon Pyclient - Customer Details
+Lädt Kundendetails (get_customer) parallel mit Obergrenze, cached sie mit TTL im
+lokalen Snapshot und ergänzt die Zeilen des E-Mail-Exports
+"""
+
+from typing import Callable, Dict, List, Optional
+
+from .directory import gather_limited
+from .provisioning import ProvisioningClient
+from .snapshot import SnapshotStore
+
+
+# Gleichzeitige get_customer-Requests und Gültigkeit des Caches
+DETAILS_CONCURRENCY = 10
+DETAILS_TTL = 6 * 3600
+
+# Zusätzliche Spalten im Export: (Schlüssel in der Zeile, CSV-Überschrift)
+DETAIL_COLUMNS = [
+    ('user_used', 'User Used'),
+    ('quota_used_gb', 'Quota Used GB'),
+    ('customer_locked', 'Customer Locked'),
+    ('last_login_at', 'Customer Last Login'),
+]
+
+
+def detail_fields(details: Dict) -> Dict:
+    """Die Felder der Kundendetails, die in den Export übernommen werden"""
+    quota_used = details.get('quotaUsed') or 0
+    return {
+        'user_used': details.get('userUsed', ''),
+        'quota_used_gb': round(quota_used / (1024 ** 3), 1),
+        'customer_locked': details.get('isLocked', False),
+        'last_login_at': (details.get('lastLoginAt') or '')[:10],
+    }
+
+
+async def load_customer_details(prov_client: ProvisioningClient, customer_ids: List[int],
+                                store: Optional[SnapshotStore] = None, ttl: float = DETAILS_TTL,
+                                concurrency: int = DETAILS_CONCURRENCY,
+                                on_done: Optional[Callable] = None) -> Dict[int, Dict]:
+    """
+    Holt Kundendetails - aus dem Cache, sonst parallel über die API
+
+    Args:
+        prov_client: Provisioning-Client
+        customer_ids: IDs der Kunden
+        store: Optional - Snapshot als Cache
+        ttl: Maximales Alter gecachter Details in Sekunden
+        concurrency: Gleichzeitige Requests
+        on_done: Optional - Callback(customer_id, result) je Request
+
+    Returns:
+        {customer_id: Details} - Kunden, deren Details nicht geladen werden konnten, fehlen
+    """
+    unique_ids = list(dict.fromkeys(customer_ids))
+    details = store.customer_details(unique_ids, ttl) if store else {}
+    missing = [customer_id for customer_id in unique_ids if customer_id not in details]
+
+    results = await gather_limited(missing, prov_client.get_customer, concurrency, on_done=on_done)
+
+    fetched = {
+        customer_id: result
+        for customer_id, result in zip(missing, results)
+        if not isinstance(result, Exception)
+    }
+    if store and fetched:
+        store.put_customer_details(fetched)
+
+    details.update(fetched)
+    return details
+
+
+def merge_customer_details(rows: List[Dict], details: Dict[int, Dict]) -> int:
+    """
+    Ergänzt die Export-Zeilen um die Detail-Felder (in place)
+
+    Returns:
+        Anzahl der Kunden ohne Details
+    """
+    fields = {customer_id: detail_fields(data) for customer_id, data in details.items()}
+    empty = {key: '' for key, _ in DETAIL_COLUMNS}
+
+    missing = set()
+    for row in rows:
+        customer_fields = fields.get(row['customer_id'])
+        if customer_fields is None:
+            missing.add(row['customer_id'])
+        row.update(customer_fields or empty)
+
+    return len(missing)
@@ -0,0 +1,162 @@
+"""
+Dracoon Pyclient - Customer Scheduler
+Verteilt die User-Seiten aller Kunden auf parallele Worker - größte Kunden zuerst
+(userUsed aus der Kundenliste), Kunden ohne User werden gar nicht abgefragt.
+Optional mit Zeitbudget und eigener Priorität (z.B. länger nicht exportierte Kunden zuerst)
+"""
+
+import asyncio
+import math
+from typing import Callable, Dict, List, Optional
+
+from .provisioning import ProvisioningClient
+
+
+PAGE_SIZE = 500
+EXPORT_CONCURRENCY = 8
+
+
+def estimated_users(customer: Dict) -> Optional[int]:
+    """User-Anzahl laut Kundenliste (None, wenn nicht angegeben)"""
+    used = customer.get('userUsed')
+    return used if isinstance(used, int) else None
+
+
+def plan_customer_pages(customers: List[Dict], page_size: int = PAGE_SIZE,
+                        priority: Optional[Callable] = None) -> tuple:
+    """
+    Zerlegt die Kunden in Seiten-Aufträge, größte Kunden zuerst
+
+    Args:
+        customers: Kunden aus get_customers()
+        page_size: User je Request
+        priority: Optional - Callback(customer) -> Sortierwert, kleinere Werte zuerst;
+            die Größe entscheidet dann nur noch bei gleicher Priorität
+
+    Returns:
+        (pages, skipped) - pages: Liste von (customer_index, offset) in Abarbeitungsreihenfolge,
+        skipped: Indizes der Kunden mit userUsed == 0
+    """
+    sized = []
+    skipped = []
+    for index, customer in enumerate(customers):
+        users = estimated_users(customer)
+        if users == 0:
+            skipped.append(index)
+            continue
+        # Unbekannte Größe: eine Seite einplanen, weitere Seiten ergeben sich aus range.total
+        sized.append((users if users is not None else page_size, index))
+
+    # Longest Processing Time first: große Kunden starten sofort, kleine füllen am Ende die Lücken
+    if priority:
+        sized.sort(key=lambda item: (priority(customers[item[1]]), -item[0]))
+    else:
+        sized.sort(key=lambda item: -item[0])
+
+    pages = []
+    for users, index in sized:
+        page_count = max(1, math.ceil(users / page_size))
+        pages.extend((index, page * page_size) for page in range(page_count))
+
+    return pages, skipped
+
+
+async def collect_customer_users(prov_client: ProvisioningClient, customers: List[Dict],
+                                 concurrency: int = EXPORT_CONCURRENCY, page_size: int = PAGE_SIZE,
+                                 on_customer_done: Optional[Callable] = None,
+                                 on_page: Optional[Callable] = None,
+                                 priority: Optional[Callable] = None,
+                                 time_limit: Optional[float] = None) -> Dict[int, object]:
+    """
+    Lädt die User aller Kunden seitenweise mit einem Worker-Pool
+
+    Die Seiten großer Kunden werden auf mehrere Worker verteilt. Liefert die erste Seite
+    mehr User als geschätzt (range.total), werden die fehlenden Seiten nachgereicht.
+
+    Args:
+        prov_client: Provisioning-Client
+        customers: Kunden aus get_customers()
+        concurrency: Anzahl paralleler Worker
+        page_size: User je Request
+        on_customer_done: Optional - Callback(customer, users_or_exception) je fertigem Kunden
+        on_page: Optional - Callback(customer, users) je geladener Seite
+        priority: Optional - Reihenfolge der Kunden (siehe plan_customer_pages)
+        time_limit: Optional - Sekunden, nach denen laufende Requests abgebrochen werden
+
+    Returns:
+        {customer_index: Liste der User (in Seitenreihenfolge) oder Exception}
+        - Kunden ohne User (userUsed == 0) sind mit leerer Liste enthalten
+        - Kunden, die bis zum Ablauf von time_limit nicht vollständig geladen wurden, fehlen
+    """
+    pages, skipped = plan_customer_pages(customers, page_size, priority)
+
+    results: Dict[int, object] = {index: [] for index in skipped}
+    if on_customer_done:
+        for index in skipped:
+            on_customer_done(customers[index], [])
+
+    # Zustand je Kunde: geladene Seiten, ausstehende Seiten, Fehler
+    received: Dict[int, Dict[int, list]] = {}
+    outstanding: Dict[int, int] = {}
+    errors: Dict[int, Exception] = {}
+    planned: Dict[int, set] = {}
+
+    # Priorität = Rang des Kunden im Plan, nachgereichte Seiten behalten den Rang ihres Kunden
+    rank: Dict[int, int] = {}
+    queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+    for index, offset in pages:
+        rank.setdefault(index, len(rank))
+        outstanding[index] = outstanding.get(index, 0) + 1
+        planned.setdefault(index, set()).add(offset)
+        queue.put_nowait((rank[index], offset, index))
+
+    def _finish(index: int):
+        if index in errors:
+            results[index] = errors[index]
+        else:
+            customer_pages = received.get(index, {})
+            results[index] = [user for offset in sorted(customer_pages) for user in customer_pages[offset]]
+        if on_customer_done:
+            on_customer_done(customers[index], results[index])
+
+    async def _worker():
+        while True:
+            _, offset, index = await queue.get()
+            try:
+                if index not in errors:
+                    page = await prov_client.get_customer_users(
+                        customer_id=customers[index].get('id'), offset=offset, limit=page_size
+                    )
+                    received.setdefault(index, {})[offset] = page.get('items', [])
+                    if on_page:
+                        on_page(customers[index], received[index][offset])
+
+                    # Schätzung aus der Kundenliste zu niedrig: fehlende Seiten nachreichen
+                    total = page.get('range', {}).get('total', 0)
+                    for extra in range(0, total, page_size):
+                        if extra not in planned[index]:
+                            planned[index].add(extra)
+                            outstanding[index] += 1
+                            queue.put_nowait((rank[index], extra, index))
+            except Exception as e:
+                errors[index] = e
+
+            # Abbruch (CancelledError) läuft hier nicht durch - der Kunde bleibt unvollständig
+            outstanding[index] -= 1
+            if outstanding[index] == 0:
+                _finish(index)
+            queue.task_done()
+
+    workers = [asyncio.create_task(_worker()) for _ in range(max(1, concurrency))]
+    try:
+        await asyncio.wait_for(queue.join(), time_limit)
+    except asyncio.TimeoutError:
+        # Zeitbudget abgelaufen: nur vollständig geladene Kunden zurückgeben
+        pass
+    finally:
+        for worker in workers:
+            worker.cancel()
+        # Abgebrochene Worker brechen ihre laufenden Requests ab - erst danach zurückkehren
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    return results
@@ -0,0 +1,145 @@
+"""
+Dracoon Pyclient - E-Mail-Deduplizierung
+Findet Adressen, die bei mehreren Kunden vorkommen: Hash-Index im Speicher, ab
+DEDUP_MEMORY_LIMIT Vorkommen External Sort mit anschließender Gruppierung
+"""
+
+import csv
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .external_sort import ExternalSorter
+
+
+# Vorkommen (Zeilen) im Hash-Index, danach wird auf Platte sortiert - maßgeblich für den
+# Speicher ist die Zahl der gehaltenen Tupel, nicht die der verschiedenen Adressen
+DEDUP_MEMORY_LIMIT = 2_000_000
+
+UNIQUE_HEADERS = ['Email', 'First Name', 'Last Name', 'Username', 'Customer ID', 'Customer Name', 'Customer Count']
+DUPLICATE_HEADERS = ['Email', 'Customer Count', 'Customer ID', 'Customer Name', 'User ID', 'Username', 'Is Locked']
+
+# Felder eines Vorkommens (Tupel statt Dict - kompakt und direkt sortierbar)
+KEY, CUSTOMER_NAME, CUSTOMER_ID, USER_ID, EMAIL, FIRST_NAME, LAST_NAME, USERNAME, IS_LOCKED = range(9)
+
+
+def normalize_email(email: str) -> str:
+    """Vergleichsform einer Adresse (Groß-/Kleinschreibung und Leerzeichen ignoriert)"""
+    return email.strip().lower()
+
+
+def occurrence(row: Dict) -> tuple:
+    """Vorkommen einer Adresse aus einer Zeile des E-Mail-Exports"""
+    return (
+        normalize_email(row['email']),
+        row.get('customer_name') or '',
+        row.get('customer_id') or 0,
+        row.get('user_id') or 0,
+        row['email'],
+        row.get('first_name') or '',
+        row.get('last_name') or '',
+        row.get('username') or '',
+        bool(row.get('is_locked')),
+    )
+
+
+class EmailIndex:
+    """Gruppiert die Vorkommen je Adresse - im Speicher oder per External Sort"""
+
+    def __init__(self, memory_limit: int = DEDUP_MEMORY_LIMIT, directory: Optional[str] = None):
+        """
+        Args:
+            memory_limit: Maximale Anzahl Vorkommen im Hash-Index
+            directory: Optional - Verzeichnis für temporäre Sortier-Runs
+        """
+        self.memory_limit = memory_limit
+        self.directory = directory
+        self.index: Dict[str, List[tuple]] = {}
+        self.sorter: Optional[ExternalSorter] = None
+        self.rows = 0
+
+    @property
+    def external(self) -> bool:
+        return self.sorter is not None
+
+    def add_rows(self, rows: Iterable[Dict]):
+        index = self.index
+        for row in rows:
+            if not row.get('email'):
+                continue
+            item = occurrence(row)
+            self.rows += 1
+
+            if self.sorter:
+                self.sorter.add(item)
+                continue
+
+            items = index.get(item[KEY])
+            if items is None:
+                index[item[KEY]] = [item]
+            else:
+                items.append(item)
+            if self.rows > self.memory_limit:
+                self._spill()
+
+    def _spill(self):
+        """Index zu groß: alle Vorkommen an den External Sort übergeben"""
+        self.sorter = ExternalSorter(key=itemgetter(KEY, CUSTOMER_NAME, CUSTOMER_ID), directory=self.directory)
+        for items in self.index.values():
+            self.sorter.extend(items)
+        self.index = {}
+
+    def groups(self) -> Iterator[Tuple[str, List[tuple]]]:
+        """(Adresse, Vorkommen sortiert nach Kunde) - Adressen aufsteigend"""
+        if self.sorter:
+            for key, items in groupby(self.sorter, key=itemgetter(KEY)):
+                yield key, list(items)
+        else:
+            by_customer = itemgetter(CUSTOMER_NAME, CUSTOMER_ID)
+            for key in sorted(self.index):
+                items = self.index[key]
+                if len(items) > 1:
+                    items.sort(key=by_customer)
+                yield key, items
+
+    def close(self):
+        if self.sorter:
+            self.sorter.close()
+        self.index = {}
+
+
+def write_dedup_reports(index: EmailIndex, unique_path: str, duplicates_path: str) -> Dict[str, int]:
+    """
+    Schreibt die Export-Datei mit eindeutigen Adressen und den Duplikat-Report (zeilenweise)
+
+    Returns:
+        {'rows', 'unique', 'duplicate_addresses', 'duplicate_rows'}
+    """
+    stats = {'rows': index.rows, 'unique': 0, 'duplicate_addresses': 0, 'duplicate_rows': 0}
+
+    with open(unique_path, 'w', newline='', encoding='utf-8') as unique_file, \
+         open(duplicates_path, 'w', newline='', encoding='utf-8') as duplicates_file:
+        unique_writer = csv.writer(unique_file)
+        duplicates_writer = csv.writer(duplicates_file)
+        unique_writer.writerow(UNIQUE_HEADERS)
+        duplicates_writer.writerow(DUPLICATE_HEADERS)
+
+        for _, items in index.groups():
+            customer_count = 1 if len(items) == 1 else len({item[CUSTOMER_ID] for item in items})
+            first = items[0]
+            unique_writer.writerow([
+                first[EMAIL], first[FIRST_NAME], first[LAST_NAME], first[USERNAME],
+                first[CUSTOMER_ID], first[CUSTOMER_NAME], customer_count
+            ])
+            stats['unique'] += 1
+
+            if customer_count > 1:
+                stats['duplicate_addresses'] += 1
+                stats['duplicate_rows'] += len(items)
+                duplicates_writer.writerows(
+                    [item[EMAIL], customer_count, item[CUSTOMER_ID], item[CUSTOMER_NAME], item[USER_ID],
+                     item[USERNAME], 'Yes' if item[IS_LOCKED] else 'No']
+                    for item in items
+                )
+
+    return stats
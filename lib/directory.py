@@ -0,0 +1,111 @@
+"""
+Dracoon Pyclient - Directory-Helfer
+Vollständiges Laden von Users, Groups und Gruppenmitgliedern (mit Pagination)
+sowie begrenzte Parallelität für viele gleichartige API-Aufrufe
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Iterable, List, Optional, Set
+
+from dracoon import DRACOON
+
+
+PAGE_SIZE = 500
+DEFAULT_CONCURRENCY = 5
+
+# Filter für echte Gruppenmitglieder (der Endpoint liefert sonst auch Nicht-Mitglieder)
+MEMBER_FILTER = "isMember:eq:true"
+
+
+async def gather_limited(items: Iterable, func: Callable[..., Awaitable],
+                         limit: int = DEFAULT_CONCURRENCY,
+                         on_done: Optional[Callable] = None) -> list:
+    """
+    Führt func(item) für alle Items mit begrenzter Parallelität aus
+
+    Args:
+        items: Eingabewerte
+        func: Async-Funktion, die pro Item aufgerufen wird
+        limit: Maximale Anzahl gleichzeitiger Aufrufe
+        on_done: Optional - Callback(item, result) nach jedem Aufruf (z.B. Progress)
+
+    Returns:
+        Ergebnisse in Reihenfolge der Items; Fehler werden als Exception-Objekt zurückgegeben
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def _run(item):
+        async with semaphore:
+            try:
+                result = await func(item)
+            except Exception as e:
+                result = e
+        if on_done:
+            on_done(item, result)
+        return result
+
+    return await asyncio.gather(*(_run(item) for item in items))
+
+
+def chunked(values: list, size: int) -> List[list]:
+    """Teilt eine Liste in Blöcke der Größe size"""
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+async def get_all_pages(fetch_page: Callable[[int], Awaitable],
+                        concurrency: int = DEFAULT_CONCURRENCY) -> list:
+    """
+    Lädt alle Seiten eines paginierten SDK-Endpoints
+
+    Die erste Seite liefert range.total, die restlichen Seiten werden parallel geladen.
+    """
+    first = await fetch_page(0)
+    items = list(first.items)
+    total = first.range.total if first.range else len(items)
+
+    offsets = list(range(PAGE_SIZE, total, PAGE_SIZE))
+    if not offsets:
+        return items
+
+    pages = await gather_limited(offsets, fetch_page, concurrency)
+    for page in pages:
+        if isinstance(page, Exception):
+            raise page
+        items.extend(page.items)
+
+    return items
+
+
+async def get_all_users(dracoon: DRACOON, filter_str: Optional[str] = None,
+                        concurrency: int = DEFAULT_CONCURRENCY) -> list:
+    """Holt ALLE User (mit automatischer Pagination)"""
+    return await get_all_pages(
+        lambda offset: dracoon.users.get_users(offset=offset, filter=filter_str, limit=PAGE_SIZE),
+        concurrency
+    )
+
+
+async def get_all_groups(dracoon: DRACOON, concurrency: int = DEFAULT_CONCURRENCY) -> list:
+    """Holt ALLE Groups (mit automatischer Pagination)"""
+    return await get_all_pages(
+        lambda offset: dracoon.groups.get_groups(offset=offset, limit=PAGE_SIZE),
+        concurrency
+    )
+
+
+async def get_all_group_members(dracoon: DRACOON, group_id: int,
+                                concurrency: int = DEFAULT_CONCURRENCY) -> list:
+    """Holt ALLE Members einer Group (mit automatischer Pagination)"""
+    return await get_all_pages(
+        lambda offset: dracoon.groups.get_group_users(
+            group_id=group_id, offset=offset, filter=MEMBER_FILTER, limit=PAGE_SIZE
+        ),
+        concurrency
+    )
+
+
+async def get_group_member_ids(dracoon: DRACOON, group_id: int,
+                               concurrency: int = DEFAULT_CONCURRENCY) -> Set[int]:
+    """Holt die User-IDs aller Members einer Group"""
+    members = await get_all_group_members(dracoon, group_id, concurrency)
+    return {m.userInfo.id for m in members if getattr(m, 'userInfo', None)}
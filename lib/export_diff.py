@@ -0,0 +1,154 @@
+"""
+Dracoon Pyclient - Export Diff
+Vergleicht zwei E-Mail-Exporte (CSV) bzw. Snapshots je (Kunden-ID, User-ID): neue, entfernte
+und geänderte User (E-Mail, Sperre, Rollen). Beide Seiten werden sortiert gestreamt und per
+Merge-Join verglichen - der Speicherbedarf hängt nicht von der Größe der Exporte ab.
+"""
+
+import csv
+import sqlite3
+from collections import Counter
+from typing import Dict, Iterator, Optional, Tuple
+
+from .external_sort import ExternalSorter
+from .snapshot import SnapshotStore, TABLE_CUSTOMER_USERS
+
+
+# Verglichene Flags: (Spalte im Snapshot, Spalte im CSV-Export, Bezeichnung im Report)
+DIFF_FLAGS = [
+    ('is_locked', 'Is Locked', "Locked"),
+    ('is_admin', 'Is Tenant Admin', "Tenant Admin"),
+    ('is_config_manager', 'Is Config Manager', "Config Manager"),
+    ('is_user_manager', 'Is User Manager', "User Manager"),
+    ('is_group_manager', 'Is Group Manager', "Group Manager"),
+    ('is_room_manager', 'Is Room Manager', "Room Manager"),
+    ('is_audit_log', 'Is Audit Log', "Audit Log"),
+]
+FIELD_EMAIL = "Email"
+
+CHANGE_ADDED = "added"
+CHANGE_REMOVED = "removed"
+CHANGE_CHANGED = "changed"
+
+REPORT_HEADERS = ['Change', 'Customer ID', 'Customer Name', 'User ID', 'Email', 'Field', 'Old', 'New']
+
+# Datensatz: (customer_id, user_id, email, customer_name, flags) - flags als Bitmaske über DIFF_FLAGS
+Record = Tuple[int, int, str, str, int]
+
+
+def _flag_mask(values) -> int:
+    mask = 0
+    for bit, value in enumerate(values):
+        if value:
+            mask |= 1 << bit
+    return mask
+
+
+def read_export_csv(file_path: str) -> Iterator[Record]:
+    """Datensätze eines E-Mail-Exports, sortiert nach (Kunden-ID, User-ID) per External Sort"""
+    with open(file_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        headers = next(reader, [])
+        try:
+            customer_id, user_id, email, customer_name = (
+                headers.index(name) for name in ('Customer ID', 'User ID', 'Email', 'Customer Name')
+            )
+        except ValueError:
+            raise ValueError(f"Not an email export: {file_path}")
+        flag_columns = [headers.index(column) for _, column, _ in DIFF_FLAGS if column in headers]
+
+        with ExternalSorter() as sorter:
+            for row in reader:
+                if not row:
+                    continue
+                sorter.add((
+                    int(row[customer_id] or 0), int(row[user_id] or 0), row[email], row[customer_name],
+                    _flag_mask(row[column] == 'Yes' for column in flag_columns),
+                ))
+            yield from sorter
+
+
+def read_snapshot(file_path: str) -> Iterator[Record]:
+    """Datensätze eines Snapshots - bereits über den Primärschlüssel sortiert"""
+    # Nur lesend: ein archivierter Snapshot darf durch den Vergleich nicht verändert werden
+    store = SnapshotStore(file_path, read_only=True)
+    try:
+        try:
+            has_users = store.has(TABLE_CUSTOMER_USERS)
+        except sqlite3.Error:
+            raise ValueError(f"Not a snapshot: {file_path}")
+        if not has_users:
+            raise ValueError(f"No customer users in snapshot: {file_path}")
+        columns = ['customer_id', 'user_id', 'email', 'customer_name'] + [column for column, _, _ in DIFF_FLAGS]
+        for row in store.iter_customer_users(columns):
+            yield row[0], row[1], row[2] or '', row[3] or '', _flag_mask(row[4:])
+    finally:
+        store.close()
+
+
+def read_source(file_path: str) -> Iterator[Record]:
+    """Snapshot (.sqlite) oder CSV-Export"""
+    if file_path.endswith(('.sqlite', '.db')):
+        return read_snapshot(file_path)
+    return read_export_csv(file_path)
+
+
+def merge_join(old: Iterator[Record], new: Iterator[Record]) -> Iterator[Tuple[str, Optional[Record], Optional[Record]]]:
+    """
+    Vergleicht zwei nach (Kunden-ID, User-ID) sortierte Ströme
+
+    Yields:
+        (CHANGE_ADDED | CHANGE_REMOVED | CHANGE_CHANGED, alter Datensatz, neuer Datensatz)
+    """
+    old_record = next(old, None)
+    new_record = next(new, None)
+
+    while old_record is not None or new_record is not None:
+        if new_record is None or (old_record is not None and old_record[:2] < new_record[:2]):
+            yield CHANGE_REMOVED, old_record, None
+            old_record = next(old, None)
+        elif old_record is None or new_record[:2] < old_record[:2]:
+            yield CHANGE_ADDED, None, new_record
+            new_record = next(new, None)
+        else:
+            # E-Mail ohne Groß-/Kleinschreibung, Kundenname wird nicht verglichen
+            if old_record[4] != new_record[4] or old_record[2].lower() != new_record[2].lower():
+                yield CHANGE_CHANGED, old_record, new_record
+            old_record = next(old, None)
+            new_record = next(new, None)
+
+
+def changed_fields(old: Record, new: Record) -> Iterator[Tuple[str, str, str]]:
+    """(Feld, alt, neu) für jede Änderung eines Users"""
+    if old[2].lower() != new[2].lower():
+        yield FIELD_EMAIL, old[2], new[2]
+    differing = old[4] ^ new[4]
+    for bit, (_, _, label) in enumerate(DIFF_FLAGS):
+        if differing & (1 << bit):
+            yield label, 'Yes' if old[4] & (1 << bit) else 'No', 'Yes' if new[4] & (1 << bit) else 'No'
+
+
+def write_diff_report(old_path: str, new_path: str, report_path: str) -> Dict:
+    """
+    Vergleicht zwei Exporte/Snapshots und schreibt den Report (eine Zeile je Änderung)
+
+    Returns:
+        {'added', 'removed', 'changed', 'fields': Counter je Feld}
+    """
+    stats = {CHANGE_ADDED: 0, CHANGE_REMOVED: 0, CHANGE_CHANGED: 0, 'fields': Counter()}
+
+    with open(report_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_HEADERS)
+
+        for change, old, new in merge_join(read_source(old_path), read_source(new_path)):
+            stats[change] += 1
+            if change == CHANGE_CHANGED:
+                for field, old_value, new_value in changed_fields(old, new):
+                    stats['fields'][field] += 1
+                    writer.writerow([change, new[0], new[3], new[1], new[2], field, old_value, new_value])
+            else:
+                record = new or old
+                writer.writerow([change, record[0], record[3], record[1], record[2], '', '', ''])
+
+    return stats
@@ -0,0 +1,208 @@
+"""
+Dracoon Pyclient - External Sort
+Sortiert beliebig viele Tupel mit begrenztem Speicher: sortierte Runs auf Platte, danach
+k-Wege-Merge (heapq.merge). Passt alles in einen Run, wird nur im Speicher sortiert.
+Für CSV-Exporte gibt es eine Variante mit Text-Runs (write_sorted_csv).
+"""
+
+import csv
+import heapq
+import os
+import pickle
+import shutil
+import tempfile
+from typing import Callable, Iterable, Iterator, List, Optional
+
+
+# Zeilen je Run (im Speicher sortiert) und je Pickle-Block in der Run-Datei
+RUN_SIZE = 500_000
+BLOCK_SIZE = 5_000
+
+
+def _read_run(path: str) -> Iterator[tuple]:
+    """Liest eine Run-Datei blockweise"""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            yield from block
+
+
+class ExternalSorter:
+    """
+    Sammelt Tupel und liefert sie sortiert zurück
+
+    Verwendung:
+        with ExternalSorter(key=itemgetter(0)) as sorter:
+            sorter.extend(rows)
+            for row in sorter:
+                ...
+    """
+
+    def __init__(self, key: Optional[Callable] = None, run_size: int = RUN_SIZE, directory: Optional[str] = None):
+        """
+        Args:
+            key: Sortierschlüssel wie bei sorted()
+            run_size: Maximale Anzahl Tupel im Speicher
+            directory: Optional - Verzeichnis für die temporären Runs (Standard: System-Temp)
+        """
+        self.key = key
+        self.run_size = run_size
+        self.directory = directory
+        self.buffer: List[tuple] = []
+        self.runs: List[str] = []
+        self.count = 0
+        self._tmp_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, row: tuple):
+        self.buffer.append(row)
+        self.count += 1
+        if len(self.buffer) >= self.run_size:
+            self._spill()
+
+    def extend(self, rows: Iterable[tuple]):
+        for row in rows:
+            self.add(row)
+
+    def _spill(self):
+        """Sortiert den Puffer und schreibt ihn als Run auf Platte"""
+        if not self.buffer:
+            return
+        if self._tmp_dir is None:
+            self._tmp_dir = tempfile.mkdtemp(prefix="dracoon-sort-", dir=self.directory)
+
+        self.buffer.sort(key=self.key)
+        path = os.path.join(self._tmp_dir, f"run_{len(self.runs):05d}.pickle")
+        with open(path, 'wb') as f:
+            for start in range(0, len(self.buffer), BLOCK_SIZE):
+                pickle.dump(self.buffer[start:start + BLOCK_SIZE], f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.runs.append(path)
+        self.buffer = []
+
+    def __iter__(self) -> Iterator[tuple]:
+        if not self.runs:
+            self.buffer.sort(key=self.key)
+            return iter(self.buffer)
+
+        self._spill()
+        return heapq.merge(*(_read_run(path) for path in self.runs), key=self.key)
+
+    def close(self):
+        """Löscht die temporären Runs"""
+        self.buffer = []
+        if self._tmp_dir:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+        self.runs = []
+
+
+def _escape(text: str) -> str:
+    """Macht eine CSV-Zeile einzeilig (Zeilenumbrüche in Feldern)"""
+    if '\\' in text or '\n' in text or '\r' in text:
+        text = text.replace('\\', '\\\\').replace('\n', '\\n').replace('\r', '\\r')
+    return text
+
+
+def _unescape(text: str) -> str:
+    if '\\' not in text:
+        return text
+    result = []
+    chars = iter(text)
+    for char in chars:
+        if char == '\\':
+            char = {'n': '\n', 'r': '\r'}.get(next(chars, ''), '\\')
+        result.append(char)
+    return ''.join(result)
+
+
+def _sort_part(value: str) -> str:
+    """Schlüsselteil ohne Trennzeichen (\\x00) und Zeilenumbrüche"""
+    return value.replace('\x00', '').replace('\n', ' ').replace('\r', ' ')
+
+
+def write_sorted_csv(file_path: str, headers: list, rows: Iterable[list], key: Callable,
+                     run_size: int = RUN_SIZE, directory: Optional[str] = None) -> int:
+    """
+    Schreibt Zeilen sortiert als CSV, ohne alle Zeilen im Speicher zu halten
+
+    Jede Zeile wird einmal als CSV formatiert und mit ihrem Schlüssel als Textzeile in einen
+    Run geschrieben. Der Merge vergleicht nur Strings (ohne key-Funktion) und schreibt die
+    bereits formatierten Zeilen direkt in die Zieldatei - kein Pickle, kein zweites Formatieren.
+    Gleiche Schlüssel behalten ihre ursprüngliche Reihenfolge.
+
+    Args:
+        file_path: Zieldatei
+        headers: Spaltenüberschriften
+        rows: Zeilen (Listen), z.B. ein Generator
+        key: Callback(row) -> Tupel von Strings
+        run_size: Zeilen je Run im Speicher
+        directory: Optional - Verzeichnis für die temporären Runs
+
+    Returns:
+        Anzahl geschriebener Zeilen
+    """
+    # csv.writer schreibt jede Zeile mit genau einem write()-Aufruf (inkl. "\r\n" - der
+    # Zeilenumbruch bleibt gesetzt, damit Felder mit Zeilenumbrüchen gequotet werden)
+    formatted: List[str] = []
+    writer = csv.writer(type('LineCapture', (), {'write': staticmethod(formatted.append)})())
+
+    tmp_dir = tempfile.mkdtemp(prefix="dracoon-sort-", dir=directory)
+    runs: List[str] = []
+    records: List[str] = []
+    count = 0
+    key_size = 0
+
+    def _spill():
+        records.sort()
+        path = os.path.join(tmp_dir, f"run_{len(runs):05d}.txt")
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.writelines(records)
+        runs.append(path)
+        records.clear()
+
+    try:
+        for row in rows:
+            writer.writerow(row)
+            parts = key(row)
+            key_size = len(parts)
+            joined = "\x00".join(parts)
+            if '\n' in joined or '\r' in joined or joined.count('\x00') != key_size - 1:
+                joined = "\x00".join(_sort_part(part) for part in parts)
+            records.append(f"{joined}\x00{count:012d}\x00{_escape(formatted.pop()[:-2])}\n")
+            count += 1
+            if len(records) >= run_size:
+                _spill()
+
+        with open(file_path, 'w', newline='', encoding='utf-8') as out:
+            csv.writer(out).writerow(headers)
+
+            if not runs:
+                # Alles passt in einen Run - kein Umweg über die Platte
+                records.sort()
+                merged = iter(records)
+            else:
+                if records:
+                    _spill()
+                files = [open(path, encoding='utf-8', newline='') for path in runs]
+                merged = heapq.merge(*files)
+
+            try:
+                # Schlüsselteile + laufende Nummer abtrennen, die Zeile selbst kann \x00 enthalten
+                for record in merged:
+                    out.write(_unescape(record.split('\x00', key_size + 1)[-1][:-1]) + '\r\n')
+            finally:
+                if runs:
+                    for f in files:
+                        f.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return count
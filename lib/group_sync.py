@@ -0,0 +1,138 @@
+"""
+Dracoon Pyclient - Group Membership Sync
+Gleicht Gruppenmitgliedschaften mit einem Soll-Zustand ab
+("Group X enthält genau diese User") - Set-Arithmetik, gebündelte und parallele Requests
+"""
+
+from typing import Callable, Dict, List, Optional, Set
+
+from dracoon import DRACOON
+
+from .directory import get_group_member_ids, gather_limited, chunked
+
+
+# User-IDs pro add/delete-Request und gleichzeitige Requests
+SYNC_BATCH_SIZE = 500
+SYNC_CONCURRENCY = 5
+
+ACTION_ADD = "add"
+ACTION_REMOVE = "remove"
+
+
+async def build_sync_plan(dracoon: DRACOON, desired: Dict[int, Set[int]], remove: bool = True,
+                          concurrency: int = SYNC_CONCURRENCY,
+                          on_group_loaded: Optional[Callable] = None) -> List[Dict]:
+    """
+    Berechnet den Sync-Plan aus Soll- und Ist-Zustand
+
+    Args:
+        dracoon: Verbundener DRACOON-Client
+        desired: Soll-Zustand {group_id: set(user_ids)}
+        remove: False = nur hinzufügen (überzählige Members bleiben)
+        concurrency: Gleichzeitige Requests beim Laden der Members
+        on_group_loaded: Optional - Callback(group_id, result) je geladener Group
+
+    Returns:
+        Liste von Plan-Einträgen je Group mit 'to_add' / 'to_remove' (sortierte User-IDs)
+    """
+    group_ids = list(desired)
+    results = await gather_limited(
+        group_ids,
+        lambda group_id: get_group_member_ids(dracoon, group_id),
+        concurrency,
+        on_done=on_group_loaded
+    )
+
+    plan = []
+    for group_id, current in zip(group_ids, results):
+        if isinstance(current, Exception):
+            raise Exception(f"Could not load members of group {group_id}: {current}")
+
+        target = desired[group_id]
+        plan.append({
+            'group_id': group_id,
+            'requested': len(target),
+            'current': len(current),
+            'already_member': len(target & current),
+            'to_add': sorted(target - current),
+            'to_remove': sorted(current - target) if remove else [],
+        })
+
+    return plan
+
+
+def plan_requests(plan: List[Dict], batch_size: int = SYNC_BATCH_SIZE) -> List[tuple]:
+    """
+    Zerlegt einen Plan in einzelne API-Requests
+
+    Returns:
+        Liste von (action, group_id, user_ids) - Gruppen ohne Änderung erzeugen keinen Request
+    """
+    requests = []
+    for entry in plan:
+        for batch in chunked(entry['to_remove'], batch_size):
+            requests.append((ACTION_REMOVE, entry['group_id'], batch))
+        for batch in chunked(entry['to_add'], batch_size):
+            requests.append((ACTION_ADD, entry['group_id'], batch))
+    return requests
+
+
+async def _apply_batch(dracoon: DRACOON, action: str, group_id: int, user_ids: list) -> list:
+    """
+    Führt einen add/remove-Request aus
+
+    Returns:
+        Liste von (user_id, error) für User, die nicht geändert werden konnten
+    """
+    call = dracoon.groups.add_group_users if action == ACTION_ADD else dracoon.groups.delete_group_users
+
+    try:
+        await call(group_id=group_id, user_list=user_ids, raise_on_err=True)
+        return []
+    except Exception as e:
+        # Pydantic-Fehler ignorieren (Änderung wurde trotzdem durchgeführt)
+        if "validation error" in str(e).lower():
+            return []
+        if len(user_ids) == 1:
+            return [(user_ids[0], str(e)[:100])]
+
+    # Batch fehlgeschlagen: halbieren, um die fehlerhaften User mit wenigen Requests zu finden
+    middle = len(user_ids) // 2
+    failed = await _apply_batch(dracoon, action, group_id, user_ids[:middle])
+    failed.extend(await _apply_batch(dracoon, action, group_id, user_ids[middle:]))
+    return failed
+
+
+async def apply_sync_plan(dracoon: DRACOON, plan: List[Dict], batch_size: int = SYNC_BATCH_SIZE,
+                          concurrency: int = SYNC_CONCURRENCY,
+                          on_request_done: Optional[Callable] = None) -> List[Dict]:
+    """
+    Wendet einen Sync-Plan an (gebündelte Requests mit begrenzter Parallelität)
+
+    Args:
+        dracoon: Verbundener DRACOON-Client
+        plan: Ergebnis von build_sync_plan()
+        batch_size: User-IDs pro Request
+        concurrency: Gleichzeitige Requests
+        on_request_done: Optional - Callback((action, group_id, user_ids), result) je Request
+
+    Returns:
+        Liste fehlgeschlagener Änderungen {'action', 'group_id', 'user_id', 'error'}
+    """
+    requests = plan_requests(plan, batch_size)
+
+    results = await gather_limited(
+        requests,
+        lambda request: _apply_batch(dracoon, *request),
+        concurrency,
+        on_done=on_request_done
+    )
+
+    failures = []
+    for (action, group_id, user_ids), result in zip(requests, results):
+        if isinstance(result, Exception):
+            result = [(user_id, str(result)[:100]) for user_id in user_ids]
+        for user_id, error in result:
+            failures.append({'action': action, 'group_id': group_id, 'user_id': user_id, 'error': error})
+
+    return failures
@@ -0,0 +1,145 @@
+"""
+Dracoon Pyclient - Membership Matrix
+Dünn besetzte User×Group-Mitgliedschaften mit Index in beide Richtungen
+(User → Groups, Group → Users)
+"""
+
+from typing import Callable, Dict, List, Optional, Set
+
+from dracoon import DRACOON
+
+from .directory import get_all_group_members, gather_limited, DEFAULT_CONCURRENCY
+
+
+SET_UNION = "union"
+SET_INTERSECTION = "intersection"
+SET_DIFFERENCE = "difference"
+
+
+class MembershipMatrix:
+    """Sparse User×Group-Matrix"""
+
+    def __init__(self):
+        # group_id -> Name
+        self.groups: Dict[int, str] = {}
+        # user_id -> {'id', 'userName', 'firstName', 'lastName', 'email'}
+        self.users: Dict[int, Dict] = {}
+        # user_id -> set(group_ids)
+        self.user_groups: Dict[int, Set[int]] = {}
+        # group_id -> set(user_ids)
+        self.group_users: Dict[int, Set[int]] = {}
+        # group_id -> Fehlertext für Groups, deren Members nicht geladen werden konnten
+        self.failed_groups: Dict[int, str] = {}
+
+    def add_group(self, group_id: int, name: str):
+        """Nimmt eine Group auf (auch ohne Members)"""
+        self.groups[group_id] = name
+        self.group_users.setdefault(group_id, set())
+
+    def add_member(self, group_id: int, member):
+        """Nimmt ein Gruppenmitglied (SDK GroupUser) auf"""
+        info = getattr(member, 'userInfo', None)
+        if not info:
+            return
+
+        self.users.setdefault(info.id, {
+            'id': info.id,
+            'userName': getattr(info, 'userName', '') or '',
+            'firstName': getattr(info, 'firstName', '') or '',
+            'lastName': getattr(info, 'lastName', '') or '',
+            'email': getattr(info, 'email', '') or '',
+        })
+        self.group_users.setdefault(group_id, set()).add(info.id)
+        self.user_groups.setdefault(info.id, set()).add(group_id)
+
+    @property
+    def membership_count(self) -> int:
+        """Anzahl belegter Zellen (Mitgliedschaften)"""
+        return sum(len(users) for users in self.group_users.values())
+
+    def combine(self, group_ids: List[int], operation: str) -> Set[int]:
+        """
+        Verknüpft die Members mehrerer Groups per Mengenoperation
+
+        Args:
+            group_ids: Groups in Reihenfolge (bei 'difference' zählt die erste Group)
+            operation: 'union', 'intersection' oder 'difference' (erste Group minus alle weiteren)
+
+        Returns:
+            Menge der User-IDs
+        """
+        member_sets = [self.group_users.get(group_id, set()) for group_id in group_ids]
+        if not member_sets:
+            return set()
+
+        if operation == SET_UNION:
+            return set().union(*member_sets)
+        if operation == SET_INTERSECTION:
+            # Kleinste Menge zuerst - hält die Zwischenergebnisse klein
+            smallest, *others = sorted(member_sets, key=len)
+            return set(smallest).intersection(*others)
+        if operation == SET_DIFFERENCE:
+            return set(member_sets[0]).difference(*member_sets[1:])
+
+        raise ValueError(f"Unknown set operation: {operation}")
+
+    def long_rows(self) -> List[list]:
+        """Long-Format: eine Zeile je Mitgliedschaft (sortiert nach Group, dann User)"""
+        rows = []
+        for group_id in sorted(self.group_users, key=lambda gid: self.groups.get(gid, '').lower()):
+            group_name = self.groups.get(group_id, '')
+            for user_id in sorted(self.group_users[group_id]):
+                user = self.users[user_id]
+                rows.append([
+                    group_id, group_name, user_id,
+                    user['userName'], user['firstName'], user['lastName'], user['email'],
+                ])
+        return rows
+
+    def user_summary_rows(self) -> List[list]:
+        """Zusammenfassung je User: Anzahl Groups und Group-Namen"""
+        rows = []
+        for user_id in sorted(self.user_groups, key=lambda uid: self.users[uid]['userName'].lower()):
+            user = self.users[user_id]
+            group_names = sorted(self.groups.get(gid, str(gid)) for gid in self.user_groups[user_id])
+            rows.append([
+                user_id, user['userName'], user['firstName'], user['lastName'], user['email'],
+                len(group_names), "; ".join(group_names),
+            ])
+        return rows
+
+
+async def load_membership_matrix(dracoon: DRACOON, groups: list, concurrency: int = DEFAULT_CONCURRENCY,
+                                 on_group_done: Optional[Callable] = None) -> MembershipMatrix:
+    """
+    Lädt die Members aller übergebenen Groups parallel (vollständige Pagination)
+
+    Args:
+        dracoon: Verbundener DRACOON-Client
+        groups: SDK-Groups (mit id und name)
+        concurrency: Maximale Anzahl gleichzeitiger Requests
+        on_group_done: Optional - Callback(group, result) je geladener Group
+
+    Returns:
+        Gefüllte MembershipMatrix (fehlgeschlagene Groups stehen in failed_groups)
+    """
+    matrix = MembershipMatrix()
+    for group in groups:
+        matrix.add_group(group.id, group.name)
+
+    # Seiten einer Group nacheinander, damit die Obergrenze für Requests insgesamt gilt
+    results = await gather_limited(
+        groups,
+        lambda group: get_all_group_members(dracoon, group.id, concurrency=1),
+        concurrency,
+        on_done=on_group_done
+    )
+
+    for group, members in zip(groups, results):
+        if isinstance(members, Exception):
+            matrix.failed_groups[group.id] = str(members)[:200]
+            continue
+        for member in members:
+            matrix.add_member(group.id, member)
+
+    return matrix
@@ -0,0 +1,86 @@
+"""
+Dracoon Pyclient - Background Prefetch
+Lädt Users, Groups und die erste Kundenseite spekulativ im Hintergrund,
+während der Operator an Prompts wartet
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from dracoon import DRACOON
+
+from .provisioning import ProvisioningClient
+
+
+def _silence_task_exception(task: asyncio.Task):
+    """Markiert Fehler als abgerufen - nicht abgeholte Prefetches sollen keine Warnungen erzeugen"""
+    if not task.cancelled():
+        task.exception()
+
+
+class DataPrefetcher:
+    """Startet spekulative Ladevorgänge und übergibt die Ergebnisse an die Module"""
+
+    def __init__(self, dracoon: Optional[DRACOON] = None, prov_client: Optional[ProvisioningClient] = None):
+        """
+        Initialisiert den Prefetcher
+
+        Args:
+            dracoon: Verbundener DRACOON-Client (None = keine Users/Groups)
+            prov_client: Provisioning Client (None = keine Kunden)
+        """
+        self.dracoon = dracoon
+        self.prov_client = prov_client
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _loaders(self) -> Dict:
+        """Liefert die Ladefunktionen je Schlüssel"""
+        loaders = {}
+
+        if self.dracoon is not None:
+            loaders['groups'] = self.dracoon.groups.get_groups
+            loaders['users'] = self.dracoon.users.get_users
+
+        if self.prov_client is not None:
+            loaders['customers_first_page'] = lambda: self.prov_client.get_customers(offset=0, limit=500)
+
+        return loaders
+
+    def start(self):
+        """Startet alle Ladevorgänge, die nicht bereits laufen oder bereitliegen"""
+        for key, loader in self._loaders().items():
+            if key not in self._tasks:
+                task = asyncio.create_task(loader())
+                task.add_done_callback(_silence_task_exception)
+                self._tasks[key] = task
+
+    def matches_provisioning(self, base_url: str, service_token: str) -> bool:
+        """Prüft ob der vorgeladene Provisioning-Zugang zu den Modul-Credentials passt"""
+        if self.prov_client is None or not base_url:
+            return False
+        return (self.prov_client.base_url == base_url.rstrip('/')
+                and self.prov_client.service_token == service_token)
+
+    async def take(self, key: str) -> Optional[Any]:
+        """
+        Übernimmt ein vorgeladenes Ergebnis (wartet falls noch in Arbeit)
+
+        Das Ergebnis wird dabei verbraucht; der nächste start() lädt es neu.
+
+        Returns:
+            Ergebnis des Ladevorgangs oder None wenn nicht gestartet / fehlgeschlagen
+        """
+        task = self._tasks.pop(key, None)
+        if task is None:
+            return None
+
+        try:
+            return await task
+        except Exception:
+            return None
+
+    def cancel(self):
+        """Bricht alle offenen Ladevorgänge ab"""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
@@ -0,0 +1,219 @@
+"""
+Dracoon Pyclient - Profiling
+Führt einen Modullauf unter cProfile und tracemalloc aus (--profile) und schreibt Stats-Datei
+und Kurzreport: Zeit je Bereich (Netzwerk, JSON, Rich, SDK, ...), heißeste Funktionen und
+größte Allokationsstellen
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sysconfig
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Awaitable, Dict, List
+
+from rich.console import Console
+from rich.table import Table
+
+from .utils import COLOR_PRIMARY, COLOR_SUCCESS, COLOR_DIM, TABLE_BOX
+
+
+PROFILE_DIR = "exports"
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 15
+
+# Bereiche für die Zeitaufteilung: (Bereich, Teilstrings in Dateipfad bzw. Funktionsname)
+# Die erste passende Regel gewinnt - Reihenfolge ist wichtig
+AREAS = [
+    ("User input", ["builtins.input", "/rich/prompt.py", "getpass"]),
+    ("Event loop idle (waiting for network / threads)", ["select.epoll", "select.select", "select.kqueue", "/selectors.py"]),
+    ("Network (httpx/TLS/sockets)", ["/httpx/", "/httpcore/", "/h11/", "/h2/", "/anyio/", "/ssl.py", "_ssl.", "socket"]),
+    ("JSON", ["/json/", "_json."]),
+    ("Rich rendering", ["/rich/"]),
+    ("DRACOON SDK", ["/dracoon/"]),
+    ("SQLite", ["sqlite3"]),
+    ("numpy", ["/numpy/", "numpy."]),
+    ("asyncio", ["/asyncio/", "_asyncio."]),
+]
+AREA_APP = "Pyclient code"
+AREA_OTHER = "Other"
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STDLIB_DIR = sysconfig.get_paths()['stdlib']
+
+
+def _area(filename: str, function: str) -> str:
+    """Ordnet einen pstats-Eintrag einem Bereich zu"""
+    location = f"{filename.replace(os.sep, '/')}:{function}"
+    for area, needles in AREAS:
+        if any(needle in location for needle in needles):
+            return area
+    if filename.startswith(APP_DIR) and "site-packages" not in filename:
+        return AREA_APP
+    return AREA_OTHER
+
+
+def _function_label(filename: str, line: int, function: str) -> str:
+    """Kurzer Name wie 'lib/provisioning.py:120(get_customers)'"""
+    if filename == '~':
+        return function
+    if filename.startswith(APP_DIR):
+        filename = os.path.relpath(filename, APP_DIR)
+    elif "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    elif filename.startswith(STDLIB_DIR):
+        filename = os.path.relpath(filename, STDLIB_DIR)
+    return f"{filename}:{line}({function})"
+
+
+class ModuleProfiler:
+    """cProfile + tracemalloc um einen Modullauf"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.profile = cProfile.Profile()
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_memory = 0
+        self.allocations = None
+        self._started = (0.0, 0.0)
+
+    def start(self):
+        tracemalloc.start()
+        self._started = (time.perf_counter(), time.process_time())
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        self.wall_time = time.perf_counter() - self._started[0]
+        self.cpu_time = time.process_time() - self._started[1]
+        self.allocations = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        self.peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    def stats(self) -> pstats.Stats:
+        return pstats.Stats(self.profile)
+
+    def area_times(self) -> List[tuple]:
+        """Eigenzeit (tottime) je Bereich, absteigend: [(Bereich, Sekunden, Anteil)]"""
+        totals: Dict[str, float] = {}
+        for (filename, _, function), (_, _, tottime, _, _) in self.stats().stats.items():
+            area = _area(filename, function)
+            totals[area] = totals.get(area, 0.0) + tottime
+
+        measured = sum(totals.values()) or 1.0
+        return sorted(
+            ((area, seconds, seconds / measured) for area, seconds in totals.items()),
+            key=lambda item: -item[1]
+        )
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> List[tuple]:
+        """Funktionen mit der höchsten Eigenzeit: [(Funktion, Aufrufe, tottime, cumtime)]"""
+        entries = sorted(self.stats().stats.items(), key=lambda item: -item[1][2])[:limit]
+        return [
+            (_function_label(*key), calls, tottime, cumtime)
+            for key, (_, calls, tottime, cumtime, _) in entries
+        ]
+
+    def top_allocations(self, limit: int = TOP_ALLOCATIONS) -> List[tuple]:
+        """Allokationsstellen mit dem meisten noch belegten Speicher: [(Stelle, KiB, Blöcke)]"""
+        if self.allocations is None:
+            return []
+        return [
+            (_function_label(stat.traceback[0].filename, stat.traceback[0].lineno, "")[:-2],
+             stat.size / 1024, stat.count)
+            for stat in self.allocations.statistics('lineno')[:limit]
+        ]
+
+    def write(self, directory: str = PROFILE_DIR) -> tuple:
+        """
+        Schreibt Stats-Datei (pstats, z.B. für snakeviz) und Textreport
+
+        Returns:
+            (stats_path, report_path)
+        """
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        base = os.path.join(directory, f"profile_{self.name}_{timestamp}")
+        stats_path = f"{base}.prof"
+        report_path = f"{base}.txt"
+
+        self.profile.dump_stats(stats_path)
+
+        lines = [
+            f"Profile: {self.name} ({timestamp})",
+            f"Wall time: {self.wall_time:.2f} s | CPU time: {self.cpu_time:.2f} s | "
+            f"Peak traced memory: {self.peak_memory / 1024 ** 2:.1f} MiB",
+            "",
+            "Time by area (own time):",
+        ]
+        lines += [f"  {area:<50} {seconds:>9.3f} s {share:>7.1%}" for area, seconds, share in self.area_times()]
+
+        lines += ["", f"Top {TOP_FUNCTIONS} functions by own time:"]
+        lines += [
+            f"  {tottime:>9.3f} s {cumtime:>9.3f} s cum {calls:>10,} calls  {label}"
+            for label, calls, tottime, cumtime in self.top_functions()
+        ]
+
+        lines += ["", f"Top {TOP_ALLOCATIONS} allocation sites (memory still held at the end):"]
+        lines += [f"  {size:>10,.1f} KiB {count:>9,} blocks  {site}" for site, size, count in self.top_allocations()]
+
+        # Vollständige Liste nach kumulierter Zeit für die Detailsuche
+        buffer = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=buffer)
+        stats.sort_stats('cumulative').print_stats(40)
+        lines += ["", "Top 40 by cumulative time:", buffer.getvalue()]
+
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines))
+
+        return stats_path, report_path
+
+    def show(self, console: Console):
+        """Kurzfassung im Terminal: Zeit je Bereich und die zehn heißesten Funktionen"""
+        console.print(f"\n[bold {COLOR_PRIMARY}]Profile: {self.name}[/bold {COLOR_PRIMARY}]")
+        console.print(f"[{COLOR_DIM}]Wall {self.wall_time:.2f} s | CPU {self.cpu_time:.2f} s | "
+                      f"Peak memory {self.peak_memory / 1024 ** 2:.1f} MiB[/{COLOR_DIM}]")
+
+        table = Table(show_header=True, header_style=f"bold {COLOR_PRIMARY}", box=TABLE_BOX)
+        table.add_column("Area")
+        table.add_column("Own time", justify="right", no_wrap=True)
+        table.add_column("Share", justify="right", no_wrap=True)
+        for area, seconds, share in self.area_times():
+            table.add_row(area, f"{seconds:.2f} s", f"{share:.0%}")
+        console.print(table)
+
+        table = Table(show_header=True, header_style=f"bold {COLOR_PRIMARY}", box=TABLE_BOX)
+        table.add_column("Function", overflow="fold")
+        table.add_column("Calls", justify="right", no_wrap=True)
+        table.add_column("Own", justify="right", no_wrap=True)
+        table.add_column("Cum.", justify="right", no_wrap=True)
+        for label, calls, tottime, cumtime in self.top_functions(10):
+            table.add_row(label, f"{calls:,}", f"{tottime:.2f} s", f"{cumtime:.2f} s")
+        console.print(table)
+
+
+async def profile_run(console: Console, name: str, run: Awaitable):
+    """
+    Wartet auf run (z.B. module.main(...)) unter dem Profiler und schreibt den Report
+
+    Returns:
+        Ergebnis von run
+    """
+    profiler = ModuleProfiler(name)
+    profiler.start()
+    try:
+        return await run
+    finally:
+        profiler.stop()
+        stats_path, report_path = profiler.write()
+        profiler.show(console)
+        console.print(f"[{COLOR_SUCCESS}]✓ Profile written:[/{COLOR_SUCCESS}] [{COLOR_PRIMARY}]{stats_path}[/{COLOR_PRIMARY}]")
+        console.print(f"  [{COLOR_PRIMARY}]{report_path}[/{COLOR_PRIMARY}]\n")
@@ -3,14 +3,125 @@ Dracoon Pyclient - Provisioning API Client
 Zugriff auf Multi-Tenant/Reseller Provisioning API
 """
 
+import asyncio
+import time
 import httpx
+from collections import deque
+from datetime import datetime
 from typing import List, Dict, Optional
 from rich.console import Console
 
 
+# Endpoints mit fester Obergrenze für das Timeout (bisherige feste Werte)
+ENDPOINT_CUSTOMERS = "customers"
+ENDPOINT_CUSTOMER = "customer"
+ENDPOINT_CUSTOMER_USERS = "customer_users"
+TIMEOUT_CEILING = {
+    ENDPOINT_CUSTOMERS: 120.0,
+    ENDPOINT_CUSTOMER: 60.0,
+    ENDPOINT_CUSTOMER_USERS: 120.0,
+}
+
+# Adaptives Timeout: Vielfaches der beobachteten p99-Latenz, nicht unter TIMEOUT_FLOOR
+LATENCY_WINDOW = 200
+LATENCY_MIN_SAMPLES = 20
+TIMEOUT_P99_FACTOR = 3.0
+TIMEOUT_FLOOR = 10.0
+
+# Hedging: zweiter identischer Request, wenn der erste länger als p95 braucht
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_DELAY = 1.0
+
+
+class LatencyTracker:
+    """Latenzen der letzten Requests je Endpoint - Basis für Timeouts und Hedging"""
+    
+    def __init__(self):
+        self.samples: Dict[str, deque] = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.timeout_retries = 0
+        # Zähler für die Live-Anzeige: gesendete, laufende und fehlgeschlagene HTTP-Requests
+        self.requests = 0
+        self.in_flight = 0
+        self.errors = 0
+    
+    def record(self, endpoint: str, seconds: float):
+        """Merkt die Dauer eines erfolgreichen Requests"""
+        self.samples.setdefault(endpoint, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+    
+    def percentile(self, endpoint: str, percent: float) -> Optional[float]:
+        """Perzentil der Latenz (None, solange zu wenige Messwerte vorliegen)"""
+        samples = self.samples.get(endpoint)
+        if not samples or len(samples) < LATENCY_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+    
+    def timeout(self, endpoint: str) -> float:
+        """Timeout: TIMEOUT_P99_FACTOR × p99, begrenzt auf [TIMEOUT_FLOOR, Obergrenze des Endpoints]"""
+        ceiling = TIMEOUT_CEILING[endpoint]
+        p99 = self.percentile(endpoint, 99)
+        if p99 is None:
+            return ceiling
+        return min(ceiling, max(TIMEOUT_FLOOR, p99 * TIMEOUT_P99_FACTOR))
+    
+    def hedge_delay(self, endpoint: str) -> Optional[float]:
+        """Wartezeit bis zum Hedge-Request (None = noch keine Statistik)"""
+        p95 = self.percentile(endpoint, HEDGE_PERCENTILE)
+        if p95 is None:
+            return None
+        return max(HEDGE_MIN_DELAY, p95)
+
+
+def customer_user_row(customer: Dict, user: Dict) -> Dict:
+    """
+    Kombiniert Kunde und User zu einer Zeile des E-Mail-Exports
+    
+    Args:
+        customer: Kunde aus get_customers()
+        user: User aus get_customer_users()
+    
+    Returns:
+        Dictionary mit Kunden- und User-Feldern
+    """
+    quota_max_bytes = customer.get('quotaMax', 0)
+    created_at_raw = customer.get('createdAt', '')
+    created_at = ''
+    if created_at_raw:
+        try:
+            created_at = datetime.fromisoformat(created_at_raw.replace('Z', '+00:00')).strftime('%d.%m.%Y')
+        except Exception:
+            created_at = created_at_raw
+    
+    return {
+        'customer_id': customer.get('id'),
+        'customer_name': customer.get('companyName', 'Unknown'),
+        'contract_type': customer.get('customerContractType', ''),
+        'user_max': customer.get('userMax', 0),
+        'quota_gb': round(quota_max_bytes / (1024 ** 3), 1) if quota_max_bytes else 0,
+        'created_at': created_at,
+        'user_id': user.get('id'),
+        'first_name': user.get('firstName', ''),
+        'last_name': user.get('lastName', ''),
+        'email': user.get('email'),
+        'username': user.get('userName', ''),
+        'is_locked': user.get('isLocked', False),
+        'is_admin': user.get('isAdmin', False),
+        'is_config_manager': user.get('isConfigManager', False),
+        'is_user_manager': user.get('isUserManager', False),
+        'is_group_manager': user.get('isGroupManager', False),
+        'is_room_manager': user.get('isRoomManager', False),
+        'is_audit_log': user.get('isAuditLog', False),
+    }
+
+
 class ProvisioningClient:
     """Client für die Dracoon Provisioning API (Multi-Tenant)"""
     
+    # Optionaler httpx-Transport für alle Instanzen (Aufnahme/Wiedergabe, siehe lib/cassette.py)
+    transport: Optional[httpx.AsyncBaseTransport] = None
+    
     def __init__(self, base_url: str, service_token: str, debug: bool = False):
         """
         Initialisiert den Provisioning Client
@@ -27,6 +138,11 @@ class ProvisioningClient:
             'X-SDS-Service-Token': service_token,
             'Content-Type': 'application/json'
         }
+        # Laufende Requests je (Methode, URL, Parameter) - identische Anfragen teilen sich einen Request
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        # Wartende Aufrufer je Schlüssel - ohne Wartende wird der Request abgebrochen
+        self._waiters: Dict[tuple, int] = {}
+        self.latency = LatencyTracker()
     
     def _debug_print(self, message: str):
         """Debug-Ausgabe wenn Debug-Modus aktiv"""
@@ -34,6 +150,122 @@ class ProvisioningClient:
             console = Console()
             console.print(f"[dim][DEBUG] {message}[/dim]")
     
+    async def _fetch_once(self, url: str, params: Optional[Dict], endpoint: str, timeout: float) -> Dict:
+        """Führt einen GET-Request aus und liefert die JSON-Antwort (wirft httpx-Fehler)"""
+        start = time.perf_counter()
+        self.latency.requests += 1
+        self.latency.in_flight += 1
+        try:
+            async with httpx.AsyncClient(timeout=timeout, transport=self.transport) as client:
+                response = await client.get(url, headers=self.headers, params=params)
+                self._debug_print(f"Response: {response.status_code}")
+                response.raise_for_status()
+                data = response.json()
+        except Exception:
+            # Abgebrochene Hedge-Requests (CancelledError) zählen nicht als Fehler
+            self.latency.errors += 1
+            raise
+        finally:
+            self.latency.in_flight -= 1
+        self.latency.record(endpoint, time.perf_counter() - start)
+        return data
+    
+    async def _fetch_hedged(self, url: str, params: Optional[Dict], endpoint: str, timeout: float) -> Dict:
+        """Startet nach hedge_delay einen zweiten identischen Request - die erste Antwort gewinnt"""
+        delay = self.latency.hedge_delay(endpoint)
+        if delay is None:
+            return await self._fetch_once(url, params, endpoint, timeout)
+        
+        primary = asyncio.ensure_future(self._fetch_once(url, params, endpoint, timeout))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            
+            self._debug_print(f"Hedging GET {url} after {delay:.1f}s")
+            self.latency.hedged += 1
+            hedge = asyncio.ensure_future(self._fetch_once(url, params, endpoint, timeout))
+            pending.add(hedge)
+            
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.latency.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _fetch_json(self, url: str, params: Optional[Dict], endpoint: str, hedge: bool) -> Dict:
+        """
+        GET mit adaptivem Timeout (und optional Hedging)
+        
+        Läuft das adaptive Timeout ab, wird einmal mit der Restzeit bis zur festen Obergrenze
+        wiederholt - echte langsame Seiten scheitern so nicht an einem zu knappen Timeout, und
+        der Aufruf dauert insgesamt nie länger als die Obergrenze.
+        """
+        timeout = self.latency.timeout(endpoint)
+        ceiling = TIMEOUT_CEILING[endpoint]
+        start = time.monotonic()
+        
+        try:
+            if hedge:
+                return await self._fetch_hedged(url, params, endpoint, timeout)
+            return await self._fetch_once(url, params, endpoint, timeout)
+        except httpx.TimeoutException:
+            remaining = ceiling - (time.monotonic() - start)
+            if timeout >= ceiling or remaining <= 0:
+                raise
+        
+        self._debug_print(f"Timeout after {timeout:.1f}s - retrying GET {url} with {remaining:.1f}s")
+        self.latency.timeout_retries += 1
+        return await self._fetch_once(url, params, endpoint, remaining)
+    
+    async def _get_json(self, url: str, params: Optional[Dict] = None, endpoint: str = ENDPOINT_CUSTOMERS,
+                        hedge: bool = False) -> Dict:
+        """
+        GET mit Request-Coalescing: solange ein identischer Request läuft, wird kein
+        zweiter gesendet - alle Aufrufer erhalten dasselbe Ergebnis bzw. denselben Fehler
+        
+        Das Ergebnis wird geteilt und darf von Aufrufern nicht verändert werden. Bricht der
+        letzte wartende Aufrufer ab (z.B. abgelaufenes Zeitbudget), wird der Request abgebrochen.
+        """
+        key = ('GET', url, tuple(sorted((params or {}).items())))
+        
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_json(url, params, endpoint, hedge))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._request_done(key, done))
+        else:
+            self._debug_print(f"Coalesced GET {url} {params or ''}")
+        
+        # shield: bricht ein Aufrufer ab, laufen die übrigen weiter
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                if not future.done():
+                    # Niemand wartet mehr - Request (inkl. Hedge) abbrechen und Abschluss abwarten
+                    future.cancel()
+                    await asyncio.wait([future])
+    
+    def _request_done(self, key: tuple, future: asyncio.Future):
+        """Entfernt einen abgeschlossenen Request (Fehler gelten als abgerufen)"""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()
+    
     async def get_customers(self, offset: int = 0, limit: int = 500, 
                            filter_str: Optional[str] = None) -> Dict:
         """
@@ -58,21 +290,17 @@ class ProvisioningClient:
         
         self._debug_print(f"GET {url} (offset={offset}, limit={limit})")
         
-        # Längeres Timeout (2 Minuten) für große Instanzen
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            try:
-                response = await client.get(url, headers=self.headers, params=params)
-                self._debug_print(f"Response: {response.status_code}")
-                response.raise_for_status()
-                data = response.json()
-                self._debug_print(f"Received {len(data.get('items', []))} customers")
-                return data
-            except httpx.TimeoutException:
-                raise Exception(f"Request timeout after 120 seconds. The server might be overloaded or the API is slow.")
-            except httpx.HTTPStatusError as e:
-                raise Exception(f"HTTP Error {e.response.status_code}: {e.response.text}")
-            except Exception as e:
-                raise Exception(f"Request failed: {str(e)}")
+        # Adaptives Timeout (höchstens 2 Minuten), langsame Seiten werden gehedged
+        try:
+            data = await self._get_json(url, params, endpoint=ENDPOINT_CUSTOMERS, hedge=True)
+            self._debug_print(f"Received {len(data.get('items', []))} customers")
+            return data
+        except httpx.TimeoutException:
+            raise Exception(f"Request timeout. The server might be overloaded or the API is slow.")
+        except httpx.HTTPStatusError as e:
+            raise Exception(f"HTTP Error {e.response.status_code}: {e.response.text}")
+        except Exception as e:
+            raise Exception(f"Request failed: {str(e)}")
     
     async def get_all_customers(self, filter_str: Optional[str] = None) -> List[Dict]:
         """
@@ -120,10 +348,12 @@ class ProvisioningClient:
         
         self._debug_print(f"GET {url}")
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+        try:
+            return await self._get_json(url, endpoint=ENDPOINT_CUSTOMER)
+        except httpx.TimeoutException:
+            raise Exception(f"Customer request timeout for customer {customer_id}")
+        except Exception as e:
+            raise Exception(f"Failed to get customer {customer_id}: {str(e)}")
     
     async def get_customer_users(self, customer_id: int, offset: int = 0, 
                                 limit: int = 500, filter_str: Optional[str] = None) -> Dict:
@@ -150,19 +380,15 @@ class ProvisioningClient:
         
         self._debug_print(f"GET {url} (offset={offset}, limit={limit})")
         
-        # Längeres Timeout für User-Abfragen
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            try:
-                response = await client.get(url, headers=self.headers, params=params)
-                self._debug_print(f"Response: {response.status_code}")
-                response.raise_for_status()
-                data = response.json()
-                self._debug_print(f"Received {len(data.get('items', []))} users")
-                return data
-            except httpx.TimeoutException:
-                raise Exception(f"User request timeout for customer {customer_id}")
-            except Exception as e:
-                raise Exception(f"Failed to get users for customer {customer_id}: {str(e)}")
+        # Adaptives Timeout (höchstens 2 Minuten), langsame Seiten werden gehedged
+        try:
+            data = await self._get_json(url, params, endpoint=ENDPOINT_CUSTOMER_USERS, hedge=True)
+            self._debug_print(f"Received {len(data.get('items', []))} users")
+            return data
+        except httpx.TimeoutException:
+            raise Exception(f"User request timeout for customer {customer_id}")
+        except Exception as e:
+            raise Exception(f"Failed to get users for customer {customer_id}: {str(e)}")
     
     async def get_all_customer_users(self, customer_id: int, 
                                     filter_str: Optional[str] = None) -> List[Dict]:
@@ -0,0 +1,359 @@
+"""
+Dracoon Pyclient - Query Service
+Lokaler, nur lesender HTTP/JSON-Dienst über den Snapshot (--serve): andere Tools fragen z.B.
+"Bei welchem Kunden kommt diese E-Mail vor?" oder "Ist dieser User irgendwo letzter Room-Admin?"
+und erhalten die Antwort in Millisekunden aus den SQLite-Indizes. Nur Standardbibliothek (asyncio).
+
+Endpoints:
+    GET  /health                      Dienst läuft
+    GET  /snapshot                    Tabellen mit Abrufzeitpunkt und Zeilenzahl, Stand der Aktualisierung
+    GET  /customers/by-email?email=   Kunden, bei denen die Adresse vorkommt
+    GET  /users/last-admin?user=      Räume, in denen der User (ID, E-Mail oder Username) letzter Room-Admin ist (mit Alter)
+    GET  /users/groups?user=          Groups des Users
+    GET  /metrics                     Requests, Status-Codes und Latenzen je Endpoint
+    POST /refresh[?full=1]            Aktualisierung des Snapshots im Hintergrund anstoßen
+"""
+
+import asyncio
+import json
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .snapshot import (
+    SnapshotStore, SNAPSHOT_FILE, TABLE_CUSTOMER_USERS, TABLE_USERS, TABLE_MEMBERSHIPS, TABLE_LAST_ADMIN_ROOMS
+)
+from .snapshot_watch import SnapshotWatcher
+
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+# Obergrenze für Request-Zeile + Header und Leerlaufzeit einer Keep-Alive-Verbindung
+MAX_HEADER_SIZE = 16 * 1024
+KEEP_ALIVE_TIMEOUT = 30.0
+# Latenzen je Endpoint für die Perzentile in /metrics
+METRICS_WINDOW = 1000
+
+STATUS_TEXT = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 431: "Request Header Fields Too Large", 500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HttpError(Exception):
+    """Fehlerantwort mit Status-Code"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    """Sets (z.B. fehlgeschlagene IDs im Refresh-Bericht) als sortierte Liste"""
+    if isinstance(value, set):
+        return sorted(value)
+    return str(value)
+
+
+class ServiceMetrics:
+    """Requests, Status-Codes und Latenzen je Endpoint seit dem Start"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self.latencies: Dict[str, deque] = {}
+
+    def record(self, route: str, status: int, seconds: float):
+        self.requests[route] += 1
+        self.statuses[status] += 1
+        self.latencies.setdefault(route, deque(maxlen=METRICS_WINDOW)).append(seconds)
+
+    def as_dict(self) -> Dict:
+        routes = {}
+        for route, samples in self.latencies.items():
+            ordered = sorted(samples)
+            routes[route] = {
+                'requests': self.requests[route],
+                'p50_ms': round(ordered[len(ordered) // 2] * 1000, 3),
+                'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+                'max_ms': round(ordered[-1] * 1000, 3),
+            }
+        return {
+            'uptime_s': round(time.monotonic() - self.started, 1),
+            'requests_total': sum(self.requests.values()),
+            'errors_total': sum(count for status, count in self.statuses.items() if status >= 500),
+            'status': {str(status): count for status, count in sorted(self.statuses.items())},
+            'routes': routes,
+        }
+
+
+class QueryService:
+    """HTTP/JSON-Abfragen über den Snapshot, optional mit Aktualisierung im Hintergrund"""
+
+    def __init__(self, file_path: str = SNAPSHOT_FILE, watcher: Optional[SnapshotWatcher] = None,
+                 interval: Optional[float] = None, on_refresh: Optional[Callable] = None):
+        """
+        Args:
+            file_path: Snapshot-Datei (muss existieren; gelesen wird über eine eigene Read-only-Verbindung)
+            watcher: Optional - SnapshotWatcher für POST /refresh und die periodische Aktualisierung
+            interval: Optional - Sekunden zwischen zwei automatischen Aktualisierungen
+            on_refresh: Optional - Callback(report) nach jeder Aktualisierung
+        """
+        self.store = SnapshotStore(file_path, read_only=True)
+        self.watcher = watcher
+        self.interval = interval
+        self.on_refresh = on_refresh
+        self.metrics = ServiceMetrics()
+        self.refresh_task: Optional[asyncio.Task] = None
+        self.last_refresh: Optional[Dict] = None
+
+        self.routes = {
+            '/health': ('GET', self._health),
+            '/snapshot': ('GET', self._snapshot),
+            '/customers/by-email': ('GET', self._customers_by_email),
+            '/users/last-admin': ('GET', self._last_admin),
+            '/users/groups': ('GET', self._user_groups),
+            '/metrics': ('GET', self._metrics),
+            '/refresh': ('POST', self._refresh),
+        }
+
+    def close(self):
+        self.store.close()
+
+    # --- Aktualisierung ---
+
+    @property
+    def refreshing(self) -> bool:
+        return self.refresh_task is not None and not self.refresh_task.done()
+
+    def start_refresh(self, full: Optional[bool] = None) -> bool:
+        """Startet eine Aktualisierung im Hintergrund (False, wenn bereits eine läuft)"""
+        if self.refreshing:
+            return False
+        self.refresh_task = asyncio.create_task(self._run_refresh(full))
+        return True
+
+    async def _run_refresh(self, full: Optional[bool]):
+        started_at = datetime.now().isoformat(timespec='seconds')
+        report = await self.watcher.run_cycle(full)
+        self.last_refresh = dict(report, started_at=started_at,
+                                 finished_at=datetime.now().isoformat(timespec='seconds'))
+        if self.on_refresh:
+            self.on_refresh(report)
+
+    async def _refresh_loop(self):
+        """Periodische Aktualisierung - ein laufender manueller Refresh zählt als Durchlauf"""
+        while True:
+            started = time.monotonic()
+            self.start_refresh()
+            await self.refresh_task
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    # --- Endpoints ---
+
+    def _require(self, *tables: str):
+        missing = [table for table in tables if not self.store.fetched_at(table)]
+        if missing:
+            raise HttpError(503, f"Not in snapshot yet: {', '.join(missing)}")
+
+    @staticmethod
+    def _param(query: Dict, name: str) -> str:
+        value = (query.get(name) or [''])[0].strip()
+        if not value:
+            raise HttpError(400, f"Missing query parameter '{name}'")
+        return value
+
+    def _find_user(self, query: Dict) -> Dict:
+        self._require(TABLE_USERS)
+        identifier = self._param(query, 'user')
+        user = self.store.find_user(identifier)
+        if not user:
+            raise HttpError(404, f"Unknown user: {identifier}")
+        return user
+
+    def _health(self, query: Dict) -> Tuple[int, Dict]:
+        return 200, {'status': 'ok', 'refreshing': self.refreshing}
+
+    def _snapshot(self, query: Dict) -> Tuple[int, Dict]:
+        return 200, {
+            'file': self.store.file_path,
+            'tables': self.store.fetch_info(),
+            'refreshing': self.refreshing,
+            'last_refresh': self.last_refresh,
+        }
+
+    def _customers_by_email(self, query: Dict) -> Tuple[int, Dict]:
+        self._require(TABLE_CUSTOMER_USERS)
+        email = self._param(query, 'email')
+        rows = self.store.customer_users_by_email(email)
+        return 200, {
+            'email': email,
+            'count': len(rows),
+            'customers': [
+                {
+                    'customer_id': row['customer_id'], 'customer_name': row['customer_name'],
+                    'user_id': row['user_id'], 'username': row['username'], 'email': row['email'],
+                    'is_locked': row['is_locked'], 'is_admin': row['is_admin'],
+                }
+                for row in rows
+            ],
+            'fetched_at': self.store.fetched_at(TABLE_CUSTOMER_USERS),
+        }
+
+    def _last_admin(self, query: Dict) -> Tuple[int, Dict]:
+        self._require(TABLE_LAST_ADMIN_ROOMS)
+        user = self._find_user(query)
+        rooms = self.store.last_admin_rooms(user['id'])
+        return 200, {
+            'user': user,
+            'is_last_admin': bool(rooms),
+            'rooms': rooms,
+            'fetched_at': self.store.fetched_at(TABLE_LAST_ADMIN_ROOMS),
+            # Nur Vollläufe crawlen die Räume neu - inkrementelle Durchläufe lassen sie unverändert
+            'age_seconds': round(self.store.age(TABLE_LAST_ADMIN_ROOMS)),
+        }
+
+    def _user_groups(self, query: Dict) -> Tuple[int, Dict]:
+        self._require(TABLE_MEMBERSHIPS)
+        user = self._find_user(query)
+        return 200, {
+            'user': user,
+            'groups': self.store.user_groups(user['id']),
+            'fetched_at': self.store.fetched_at(TABLE_MEMBERSHIPS),
+        }
+
+    def _metrics(self, query: Dict) -> Tuple[int, Dict]:
+        metrics = self.metrics.as_dict()
+        metrics['refresh'] = {
+            'configured': self.watcher is not None,
+            'running': self.refreshing,
+            'cycles': self.watcher.cycle if self.watcher else 0,
+            'last': self.last_refresh,
+        }
+        return 200, metrics
+
+    def _refresh(self, query: Dict) -> Tuple[int, Dict]:
+        if not self.watcher:
+            raise HttpError(503, "Refresh not configured (no OAuth connection and no DRACOON_SERVICE_TOKEN)")
+        full = (query.get('full') or ['0'])[0].lower() in ('1', 'true', 'yes')
+        if not self.start_refresh(True if full else None):
+            raise HttpError(409, "A refresh is already running")
+        return 202, {'status': 'started', 'full': full}
+
+    def dispatch(self, method: str, target: str) -> Tuple[int, Dict, str]:
+        """
+        Beantwortet einen Request
+
+        Returns:
+            (Status, JSON-Body, Route für die Metriken)
+        """
+        parts = urlsplit(target)
+        path = parts.path.rstrip('/') or '/'
+        route = self.routes.get(path)
+        if not route:
+            return 404, {'error': f"Unknown endpoint: {path}", 'endpoints': sorted(self.routes)}, 'other'
+
+        allowed, handler = route
+        if method != allowed and not (allowed == 'GET' and method == 'HEAD'):
+            return 405, {'error': f"{path} only supports {allowed}"}, path
+
+        try:
+            status, body = handler(parse_qs(parts.query))
+        except HttpError as e:
+            status, body = e.status, {'error': str(e)}
+        except Exception as e:
+            status, body = 500, {'error': str(e)[:200]}
+        return status, body, path
+
+    # --- HTTP ---
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Keep-Alive-Verbindung: Requests nacheinander, bis der Client schließt"""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {'error': "Request header too large"}, False, False)
+                    return
+
+                start = time.perf_counter()
+                lines = head.decode('latin-1').split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {'error': "Malformed request line"}, False, False)
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                # Request-Body wird nicht ausgewertet (nur POST /refresh mit Query-Parametern)
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {'error': "Malformed Content-Length"}, False, False)
+                    return
+                if length:
+                    await reader.readexactly(length)
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                status, body, route = self.dispatch(method.upper(), target)
+                await self._respond(writer, status, body, keep_alive, method.upper() == 'HEAD')
+                self.metrics.record(route, status, time.perf_counter() - start)
+
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, body: Dict, keep_alive: bool, head_only: bool):
+        payload = json.dumps(body, ensure_ascii=False, default=_json_default).encode('utf-8')
+        header = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Cache-Control: no-store\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(header.encode('latin-1') + (b"" if head_only else payload))
+        await writer.drain()
+
+    async def serve(self, host: str = SERVICE_HOST, port: int = SERVICE_PORT, on_ready: Optional[Callable] = None):
+        """
+        Beantwortet Requests, bis der Task abgebrochen wird
+
+        Args:
+            host: Adresse (Standard: nur lokal)
+            port: Port (0 = beliebiger freier Port)
+            on_ready: Optional - Callback(host, port) sobald der Server lauscht
+        """
+        server = await asyncio.start_server(self._handle_connection, host, port, limit=MAX_HEADER_SIZE)
+        refresher = None
+        if self.watcher and self.interval:
+            refresher = asyncio.create_task(self._refresh_loop())
+
+        try:
+            async with server:
+                if on_ready:
+                    on_ready(*server.sockets[0].getsockname()[:2])
+                await server.serve_forever()
+        finally:
+            for task in (refresher, self.refresh_task):
+                if task and not task.done():
+                    task.cancel()
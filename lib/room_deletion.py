@@ -0,0 +1,152 @@
+"""
+Dracoon Pyclient - Room Deletion Executor
+Löscht Datenräume gebündelt (delete_nodes mit mehreren IDs) und mit begrenzter Parallelität,
+protokolliert Plan und Ergebnis als JSON und unterstützt einen Dry-Run
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from dracoon import DRACOON
+
+from .directory import gather_limited, chunked
+
+
+# Räume pro delete_nodes-Request und gleichzeitige Requests
+DELETE_BATCH_SIZE = 50
+DELETE_CONCURRENCY = 4
+
+STATUS_PLANNED = "planned"
+STATUS_DELETED = "deleted"
+STATUS_FAILED = "failed"
+
+
+def build_deletion_plan(rooms: List[Dict], batch_size: int = DELETE_BATCH_SIZE) -> List[Dict]:
+    """
+    Erstellt den Lösch-Plan
+
+    Args:
+        rooms: Räume als Dict mit 'id', 'name', 'parentPath'
+        batch_size: Räume pro Request
+
+    Returns:
+        Plan-Einträge je Raum (mit Batch-Nummer und Status 'planned')
+    """
+    plan = []
+    unique_ids = list(dict.fromkeys(room['id'] for room in rooms))
+    rooms_by_id = {room['id']: room for room in rooms}
+
+    for batch_no, batch in enumerate(chunked(unique_ids, batch_size), 1):
+        for room_id in batch:
+            room = rooms_by_id[room_id]
+            parent_path = room.get('parentPath', '/') or '/'
+            plan.append({
+                'id': room_id,
+                'name': room.get('name', ''),
+                'path': f"{parent_path}{room.get('name', '')}",
+                'batch': batch_no,
+                'status': STATUS_PLANNED,
+                'error': None,
+            })
+
+    return plan
+
+
+async def _delete_batch(dracoon: DRACOON, room_ids: list) -> Dict[int, Optional[str]]:
+    """
+    Löscht einen Batch von Räumen
+
+    Returns:
+        {room_id: Fehlertext oder None}
+    """
+    try:
+        await dracoon.nodes.delete_nodes(node_list=room_ids, raise_on_err=True)
+        return {room_id: None for room_id in room_ids}
+    except Exception as e:
+        if len(room_ids) == 1:
+            return {room_ids[0]: str(e)[:200]}
+
+    # Batch fehlgeschlagen: halbieren, um die fehlerhaften Räume zu finden
+    middle = len(room_ids) // 2
+    result = await _delete_batch(dracoon, room_ids[:middle])
+    result.update(await _delete_batch(dracoon, room_ids[middle:]))
+    return result
+
+
+async def execute_deletion_plan(dracoon: DRACOON, plan: List[Dict], dry_run: bool = False,
+                                concurrency: int = DELETE_CONCURRENCY,
+                                on_batch_done: Optional[Callable] = None) -> List[Dict]:
+    """
+    Führt den Lösch-Plan aus
+
+    Args:
+        dracoon: Verbundener DRACOON-Client
+        plan: Ergebnis von build_deletion_plan()
+        dry_run: True = nichts löschen, nur Plan zurückgeben
+        concurrency: Gleichzeitige delete_nodes-Requests
+        on_batch_done: Optional - Callback(room_ids, result) je Batch
+
+    Returns:
+        Plan-Einträge mit aktualisiertem Status ('deleted' / 'failed')
+    """
+    if dry_run:
+        return plan
+
+    batches = {}
+    for entry in plan:
+        batches.setdefault(entry['batch'], []).append(entry['id'])
+
+    results = await gather_limited(
+        list(batches.values()),
+        lambda room_ids: _delete_batch(dracoon, room_ids),
+        concurrency,
+        on_done=on_batch_done
+    )
+
+    errors = {}
+    for room_ids, result in zip(batches.values(), results):
+        if isinstance(result, Exception):
+            result = {room_id: str(result)[:200] for room_id in room_ids}
+        errors.update(result)
+
+    for entry in plan:
+        error = errors.get(entry['id'])
+        entry['status'] = STATUS_FAILED if error else STATUS_DELETED
+        entry['error'] = error
+
+    return plan
+
+
+def write_deletion_log(plan: List[Dict], context: Dict, exports_dir: str = "exports") -> str:
+    """
+    Schreibt Plan bzw. Ergebnis als JSON-Protokoll
+
+    Args:
+        plan: Plan-Einträge (nach execute_deletion_plan mit Status)
+        context: Zusätzliche Angaben (z.B. User, Modus)
+        exports_dir: Zielverzeichnis
+
+    Returns:
+        Pfad der geschriebenen Datei
+    """
+    if not os.path.exists(exports_dir):
+        os.makedirs(exports_dir)
+
+    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+    filepath = os.path.join(exports_dir, f"room_deletion_{timestamp}.json")
+
+    log = dict(context)
+    log['created_at'] = datetime.now().isoformat(timespec='seconds')
+    log['batches'] = len({entry['batch'] for entry in plan})
+    log['summary'] = {
+        status: sum(1 for entry in plan if entry['status'] == status)
+        for status in (STATUS_PLANNED, STATUS_DELETED, STATUS_FAILED)
+    }
+    log['rooms'] = plan
+
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(log, f, indent=2, ensure_ascii=False)
+
+    return filepath
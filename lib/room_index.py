@@ -0,0 +1,242 @@
+"""
+Dracoon Pyclient - Room Permission Index
+Crawlt den Node-Baum (Breitensuche, begrenzte Parallelität) und baut einen lokalen
+invertierten Index: User → Räume mit Rolle, Raum → Admins
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from dracoon import DRACOON
+
+from .directory import get_all_pages, PAGE_SIZE, DEFAULT_CONCURRENCY
+
+
+ROOM_FILTER = "type:eq:room"
+GRANTED_FILTER = "isGranted:eq:true"
+
+ROLE_ADMIN = "admin"
+ROLE_EDIT = "edit"
+ROLE_READ = "read"
+
+
+def permission_role(permissions) -> str:
+    """Leitet die Rolle aus den Raum-Berechtigungen ab"""
+    if permissions is None:
+        return ROLE_READ
+    if getattr(permissions, 'manage', False):
+        return ROLE_ADMIN
+    if getattr(permissions, 'change', False) or getattr(permissions, 'create', False):
+        return ROLE_EDIT
+    return ROLE_READ
+
+
+class RoomPermissionIndex:
+    """Lokaler Index der Raumberechtigungen - nach einem Crawl offline abfragbar"""
+
+    def __init__(self):
+        self.crawled_at = None
+        # room_id -> {'id', 'name', 'parentPath', 'parentId'}
+        self.rooms: Dict[int, Dict] = {}
+        # user_id -> {'id', 'userName', 'firstName', 'lastName', 'email'}
+        self.users: Dict[int, Dict] = {}
+        # user_id -> {room_id: role}
+        self.user_rooms: Dict[int, Dict[int, str]] = {}
+        # room_id -> set(user_ids) mit Admin-Rolle
+        self.room_admins: Dict[int, set] = {}
+        # room_id -> set(group_ids) mit Admin-Rolle
+        self.room_admin_groups: Dict[int, set] = {}
+        # room_id -> Fehlertext für Räume, die nicht gecrawlt werden konnten
+        self.failed_rooms: Dict[int, str] = {}
+
+    def add_room(self, node):
+        """Nimmt einen Raum (SDK-Node) auf"""
+        self.rooms[node.id] = {
+            'id': node.id,
+            'name': node.name,
+            'parentPath': getattr(node, 'parentPath', '/') or '/',
+            'parentId': getattr(node, 'parentId', None),
+        }
+        self.room_admins.setdefault(node.id, set())
+        self.room_admin_groups.setdefault(node.id, set())
+
+    def add_room_user(self, room_id: int, room_user):
+        """Nimmt einen berechtigten User eines Raums (SDK RoomUser) auf"""
+        info = room_user.userInfo
+        self.users.setdefault(info.id, {
+            'id': info.id,
+            'userName': getattr(info, 'userName', '') or '',
+            'firstName': getattr(info, 'firstName', '') or '',
+            'lastName': getattr(info, 'lastName', '') or '',
+            'email': getattr(info, 'email', '') or '',
+        })
+
+        role = permission_role(room_user.permissions)
+        self.user_rooms.setdefault(info.id, {})[room_id] = role
+        if role == ROLE_ADMIN:
+            self.room_admins[room_id].add(info.id)
+
+    def add_room_group(self, room_id: int, room_group):
+        """Nimmt eine berechtigte Group eines Raums (SDK RoomGroup) auf"""
+        if permission_role(room_group.permissions) == ROLE_ADMIN:
+            self.room_admin_groups[room_id].add(room_group.id)
+
+    def room_path(self, room_id: int) -> str:
+        """Vollständiger Pfad eines Raums"""
+        room = self.rooms.get(room_id, {})
+        return f"{room.get('parentPath', '/')}{room.get('name', '')}"
+
+    def rooms_of_user(self, user_id: int) -> Dict[int, str]:
+        """Alle Räume eines Users mit Rolle"""
+        return self.user_rooms.get(user_id, {})
+
+    def admin_rooms(self, user_id: int) -> List[int]:
+        """Räume, in denen der User Room-Admin ist"""
+        return [room_id for room_id, role in self.rooms_of_user(user_id).items() if role == ROLE_ADMIN]
+
+    def is_last_admin(self, user_id: int, room_id: int) -> bool:
+        """True wenn der User der einzige Admin des Raums ist (keine weiteren User- oder Group-Admins)"""
+        return self.room_admins.get(room_id) == {user_id} and not self.room_admin_groups.get(room_id)
+
+    def last_admin_rooms(self, user_id: int) -> List[int]:
+        """Räume, in denen der User LETZTER Room-Admin ist"""
+        return [room_id for room_id in self.admin_rooms(user_id) if self.is_last_admin(user_id, room_id)]
+
+    def admins(self, room_id: int) -> List[int]:
+        """User-IDs aller Admins eines Raums"""
+        return sorted(self.room_admins.get(room_id, set()))
+
+    def save(self, file_path: str):
+        """Speichert den Index als JSON"""
+        data = {
+            'crawled_at': self.crawled_at,
+            'rooms': list(self.rooms.values()),
+            'users': list(self.users.values()),
+            'user_rooms': {str(uid): {str(rid): role for rid, role in rooms.items()}
+                           for uid, rooms in self.user_rooms.items()},
+            'room_admin_groups': {str(rid): sorted(gids) for rid, gids in self.room_admin_groups.items() if gids},
+            'failed_rooms': {str(rid): error for rid, error in self.failed_rooms.items()},
+        }
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, file_path: str) -> 'RoomPermissionIndex':
+        """Lädt einen gespeicherten Index"""
+        with open(file_path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        index = cls()
+        index.crawled_at = data.get('crawled_at')
+        for room in data.get('rooms', []):
+            index.rooms[room['id']] = room
+            index.room_admins[room['id']] = set()
+            index.room_admin_groups[room['id']] = set()
+        for user in data.get('users', []):
+            index.users[user['id']] = user
+        for uid, rooms in data.get('user_rooms', {}).items():
+            for rid, role in rooms.items():
+                index.user_rooms.setdefault(int(uid), {})[int(rid)] = role
+                if role == ROLE_ADMIN:
+                    index.room_admins.setdefault(int(rid), set()).add(int(uid))
+        for rid, gids in data.get('room_admin_groups', {}).items():
+            index.room_admin_groups[int(rid)] = set(gids)
+        for rid, error in data.get('failed_rooms', {}).items():
+            index.failed_rooms[int(rid)] = error
+
+        return index
+
+
+async def crawl_room_permissions(dracoon: DRACOON, concurrency: int = DEFAULT_CONCURRENCY,
+                                 on_progress: Optional[Callable] = None) -> RoomPermissionIndex:
+    """
+    Crawlt alle Räume (Breitensuche) und deren berechtigte User/Groups
+
+    Args:
+        dracoon: Verbundener DRACOON-Client
+        concurrency: Anzahl paralleler Requests über alle Worker
+        on_progress: Optional - Callback(processed, discovered) nach jedem Raum
+
+    Returns:
+        Gefüllter RoomPermissionIndex (nicht crawlbare Räume stehen in failed_rooms)
+    """
+    index = RoomPermissionIndex()
+    queue: asyncio.Queue = asyncio.Queue()
+    state = {'discovered': 0, 'processed': 0}
+    # Gemeinsames Limit aller Worker - sonst liefen bis zu 3x concurrency Requests
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    def _limited(fetch_page: Callable) -> Callable:
+        async def _fetch(offset: int):
+            async with semaphore:
+                return await fetch_page(offset)
+        return _fetch
+
+    async def _list_rooms(parent_id: int) -> list:
+        return await get_all_pages(
+            _limited(lambda offset: dracoon.nodes.get_nodes(
+                room_manager=True, parent_id=parent_id, offset=offset,
+                filter=ROOM_FILTER, limit=PAGE_SIZE, raise_on_err=True
+            )),
+            concurrency=1
+        )
+
+    def _enqueue(rooms: list):
+        for room in rooms:
+            index.add_room(room)
+            queue.put_nowait(room.id)
+        state['discovered'] += len(rooms)
+
+    async def _process(room_id: int):
+        # Unterräume, User und Groups eines Raums gleichzeitig laden
+        sub_rooms, room_users, room_groups = await asyncio.gather(
+            _list_rooms(room_id),
+            get_all_pages(
+                _limited(lambda offset: dracoon.nodes.get_room_users(
+                    room_id=room_id, offset=offset, filter=GRANTED_FILTER, limit=PAGE_SIZE, raise_on_err=True
+                )),
+                concurrency=1
+            ),
+            get_all_pages(
+                _limited(lambda offset: dracoon.nodes.get_room_groups(
+                    room_id=room_id, offset=offset, filter=GRANTED_FILTER, limit=PAGE_SIZE, raise_on_err=True
+                )),
+                concurrency=1
+            )
+        )
+
+        for room_user in room_users:
+            index.add_room_user(room_id, room_user)
+        for room_group in room_groups:
+            index.add_room_group(room_id, room_group)
+
+        _enqueue(sub_rooms)
+
+    async def _worker():
+        while True:
+            room_id = await queue.get()
+            try:
+                await _process(room_id)
+            except Exception as e:
+                index.failed_rooms[room_id] = str(e)[:200]
+            finally:
+                state['processed'] += 1
+                if on_progress:
+                    on_progress(state['processed'], state['discovered'])
+                queue.task_done()
+
+    _enqueue(await _list_rooms(0))
+    if on_progress:
+        on_progress(0, state['discovered'])
+
+    workers = [asyncio.create_task(_worker()) for _ in range(max(1, concurrency))]
+    try:
+        await queue.join()
+    finally:
+        for worker in workers:
+            worker.cancel()
+
+    index.crawled_at = datetime.now().isoformat(timespec='seconds')
+    return index
@@ -0,0 +1,519 @@
+"""
+Dracoon Pyclient - Lokaler Snapshot
+Speichert Kunden, User, Groups, Mitgliedschaften und Letzte-Admin-Räume in einer
+indizierten SQLite-Datenbank - Reports können offline darauf laufen
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+from dracoon import DRACOON
+
+from .directory import get_all_users, get_all_groups, gather_limited, DEFAULT_CONCURRENCY
+from .membership import MembershipMatrix, load_membership_matrix
+from .provisioning import ProvisioningClient, customer_user_row
+from .room_index import crawl_room_permissions
+
+
+SNAPSHOT_FILE = os.path.join("exports", "snapshot.sqlite")
+
+TABLE_CUSTOMERS = "customers"
+TABLE_CUSTOMER_USERS = "customer_users"
+TABLE_USERS = "users"
+TABLE_GROUPS = "groups"
+TABLE_MEMBERSHIPS = "memberships"
+TABLE_LAST_ADMIN_ROOMS = "last_admin_rooms"
+
+# Spalten der Kunden-User (entspricht den Zeilen des E-Mail-Exports)
+CUSTOMER_USER_COLUMNS = [
+    'customer_id', 'customer_name', 'contract_type', 'user_max', 'quota_gb', 'created_at',
+    'user_id', 'first_name', 'last_name', 'email', 'username',
+    'is_locked', 'is_admin', 'is_config_manager', 'is_user_manager',
+    'is_group_manager', 'is_room_manager', 'is_audit_log',
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fetch_info (
+    table_name TEXT PRIMARY KEY,
+    fetched_at TEXT NOT NULL,
+    row_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS customers (
+    id INTEGER PRIMARY KEY,
+    company_name TEXT,
+    contract_type TEXT,
+    user_max INTEGER,
+    user_used INTEGER,
+    quota_max INTEGER,
+    quota_used INTEGER,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS customer_users (
+    customer_id INTEGER NOT NULL,
+    customer_name TEXT,
+    contract_type TEXT,
+    user_max INTEGER,
+    quota_gb REAL,
+    created_at TEXT,
+    user_id INTEGER NOT NULL,
+    first_name TEXT,
+    last_name TEXT,
+    email TEXT,
+    username TEXT,
+    is_locked INTEGER,
+    is_admin INTEGER,
+    is_config_manager INTEGER,
+    is_user_manager INTEGER,
+    is_group_manager INTEGER,
+    is_room_manager INTEGER,
+    is_audit_log INTEGER,
+    PRIMARY KEY (customer_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_customer_users_email ON customer_users (email);
+CREATE INDEX IF NOT EXISTS idx_customer_users_email_nocase ON customer_users (email COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    email TEXT,
+    is_locked INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_users_email ON users (email);
+CREATE INDEX IF NOT EXISTS idx_users_username ON users (username);
+CREATE INDEX IF NOT EXISTS idx_users_email_nocase ON users (email COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_users_username_nocase ON users (username COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS groups (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    cnt_users INTEGER
+);
+CREATE TABLE IF NOT EXISTS memberships (
+    group_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    PRIMARY KEY (group_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_memberships_user ON memberships (user_id);
+CREATE TABLE IF NOT EXISTS customer_details (
+    id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS customer_exports (
+    id INTEGER PRIMARY KEY,
+    exported_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS last_admin_rooms (
+    user_id INTEGER NOT NULL,
+    room_id INTEGER NOT NULL,
+    name TEXT,
+    parent_path TEXT,
+    PRIMARY KEY (user_id, room_id)
+);
+"""
+
+
+class SnapshotStore:
+    """SQLite-Snapshot der Tenant-Daten mit Abrufzeitpunkt je Tabelle"""
+
+    def __init__(self, file_path: str = SNAPSHOT_FILE, read_only: bool = False):
+        """
+        Args:
+            file_path: SQLite-Datei (wird bei Bedarf angelegt)
+            read_only: Nur lesend öffnen - die Datei muss existieren, das Schema wird nicht angelegt
+        """
+        self.file_path = file_path
+
+        if read_only:
+            self.db = sqlite3.connect(f"file:{os.path.abspath(file_path)}?mode=ro", uri=True)
+            self.db.row_factory = sqlite3.Row
+            return
+
+        directory = os.path.dirname(file_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # Die Refresh-Funktionen schreiben per asyncio.to_thread aus Worker-Threads (nacheinander,
+        # nie gleichzeitig) - die Event-Loop beantwortet derweil weiter Requests bzw. zeichnet
+        self.db = sqlite3.connect(file_path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _replace(self, table: str, columns: List[str], rows: List[tuple]):
+        """Ersetzt den Inhalt einer Tabelle in einer Transaktion und merkt den Abrufzeitpunkt"""
+        placeholders = ", ".join("?" for _ in columns)
+        with self.db:
+            self.db.execute(f"DELETE FROM {table}")
+            self.db.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO fetch_info (table_name, fetched_at, row_count) VALUES (?, ?, ?)",
+                (table, datetime.now().isoformat(timespec='seconds'), len(rows))
+            )
+
+    def _update(self, table: str, key_column: str, keys: List[int], columns: List[str], rows: List[tuple]):
+        """Ersetzt nur die Zeilen der übergebenen Schlüssel (z.B. geänderte Kunden) und merkt den Abrufzeitpunkt"""
+        placeholders = ", ".join("?" for _ in columns)
+        with self.db:
+            # In Blöcken löschen (SQLite begrenzt die Anzahl der Parameter)
+            for start in range(0, len(keys), 500):
+                block = keys[start:start + 500]
+                self.db.execute(f"DELETE FROM {table} WHERE {key_column} IN ({', '.join('?' for _ in block)})", block)
+            self.db.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows
+            )
+            row_count = self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            self.db.execute(
+                "INSERT OR REPLACE INTO fetch_info (table_name, fetched_at, row_count) VALUES (?, ?, ?)",
+                (table, datetime.now().isoformat(timespec='seconds'), row_count)
+            )
+
+    def enable_concurrent_reads(self):
+        """WAL-Journal: Module können lesen, während ein Hintergrundprozess schreibt (bleibt in der Datei gesetzt)"""
+        self.db.execute("PRAGMA journal_mode=WAL")
+
+    # --- Schreiben ---
+
+    def replace_customers(self, customers: List[Dict]):
+        """Kunden aus der Provisioning API"""
+        self._replace(TABLE_CUSTOMERS, [
+            'id', 'company_name', 'contract_type', 'user_max', 'user_used', 'quota_max', 'quota_used', 'created_at'
+        ], [
+            (
+                c.get('id'), c.get('companyName', ''), c.get('customerContractType', ''),
+                c.get('userMax', 0), c.get('userUsed', 0), c.get('quotaMax', 0), c.get('quotaUsed', 0),
+                c.get('createdAt', ''),
+            )
+            for c in customers
+        ])
+
+    def replace_customer_users(self, rows: List[Dict]):
+        """Kunden-User im Format des E-Mail-Exports (siehe customer_user_row)"""
+        self._replace(TABLE_CUSTOMER_USERS, CUSTOMER_USER_COLUMNS, [
+            tuple(row.get(column) for column in CUSTOMER_USER_COLUMNS) for row in rows
+        ])
+
+    def update_customer_users(self, customer_ids: List[int], rows: List[Dict]):
+        """Ersetzt die Kunden-User der übergebenen Kunden (ohne Zeilen = Kunde entfernt)"""
+        self._update(TABLE_CUSTOMER_USERS, 'customer_id', customer_ids, CUSTOMER_USER_COLUMNS, [
+            tuple(row.get(column) for column in CUSTOMER_USER_COLUMNS) for row in rows
+        ])
+
+    def replace_users(self, users: list):
+        """User aus dem SDK"""
+        self._replace(TABLE_USERS, ['id', 'username', 'first_name', 'last_name', 'email', 'is_locked'], [
+            (
+                u.id, getattr(u, 'userName', '') or '', getattr(u, 'firstName', '') or '',
+                getattr(u, 'lastName', '') or '', getattr(u, 'email', '') or '', bool(getattr(u, 'isLocked', False)),
+            )
+            for u in users
+        ])
+
+    def replace_groups(self, groups: list):
+        """Groups aus dem SDK"""
+        self._replace(TABLE_GROUPS, ['id', 'name', 'cnt_users'], [
+            (g.id, g.name, getattr(g, 'cntUsers', 0) or 0) for g in groups
+        ])
+
+    def replace_memberships(self, matrix: MembershipMatrix):
+        """Mitgliedschaften aus einer MembershipMatrix"""
+        self._replace(TABLE_MEMBERSHIPS, ['group_id', 'user_id'], [
+            (group_id, user_id)
+            for group_id, user_ids in matrix.group_users.items()
+            for user_id in user_ids
+        ])
+
+    def update_memberships(self, group_ids: List[int], matrix: MembershipMatrix):
+        """Ersetzt die Mitgliedschaften der übergebenen Groups (fehlt eine Group in matrix: entfernt)"""
+        self._update(TABLE_MEMBERSHIPS, 'group_id', group_ids, ['group_id', 'user_id'], [
+            (group_id, user_id)
+            for group_id in group_ids
+            for user_id in matrix.group_users.get(group_id, ())
+        ])
+
+    def replace_last_admin_rooms(self, index):
+        """Letzte-Admin-Räume aus einem RoomPermissionIndex"""
+        self._replace(TABLE_LAST_ADMIN_ROOMS, ['user_id', 'room_id', 'name', 'parent_path'], [
+            (user_id, room_id, index.rooms[room_id]['name'], index.rooms[room_id]['parentPath'])
+            for user_id in index.user_rooms
+            for room_id in index.last_admin_rooms(user_id)
+        ])
+
+    def put_customer_details(self, details: Dict[int, Dict]):
+        """Kundendetails (get_customer) mit Abrufzeitpunkt je Kunde - ergänzt statt ersetzt"""
+        now = time.time()
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO customer_details (id, data, fetched_at) VALUES (?, ?, ?)",
+                [(customer_id, json.dumps(data), now) for customer_id, data in details.items()]
+            )
+
+    def put_customer_exports(self, customer_ids: List[int]):
+        """Merkt den Zeitpunkt des letzten E-Mail-Exports je Kunde"""
+        now = time.time()
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO customer_exports (id, exported_at) VALUES (?, ?)",
+                [(customer_id, now) for customer_id in customer_ids]
+            )
+
+    # --- Lesen ---
+
+    def customer_details(self, customer_ids: List[int], max_age: float) -> Dict[int, Dict]:
+        """Kundendetails, die jünger als max_age Sekunden sind"""
+        oldest = time.time() - max_age
+        details = {}
+        # In Blöcken abfragen (SQLite begrenzt die Anzahl der Parameter)
+        for start in range(0, len(customer_ids), 500):
+            block = customer_ids[start:start + 500]
+            query = (f"SELECT id, data FROM customer_details "
+                     f"WHERE fetched_at >= ? AND id IN ({', '.join('?' for _ in block)})")
+            for row in self.db.execute(query, (oldest, *block)):
+                details[row['id']] = json.loads(row['data'])
+        return details
+
+    def customer_exports(self) -> Dict[int, float]:
+        """{customer_id: Zeitpunkt des letzten E-Mail-Exports (Unix-Zeit)}"""
+        return {row['id']: row['exported_at'] for row in self.db.execute("SELECT id, exported_at FROM customer_exports")}
+
+    def fetch_info(self) -> Dict[str, Dict]:
+        """{table_name: {'fetched_at', 'row_count'}} für alle bereits befüllten Tabellen"""
+        return {
+            row['table_name']: {'fetched_at': row['fetched_at'], 'row_count': row['row_count']}
+            for row in self.db.execute("SELECT table_name, fetched_at, row_count FROM fetch_info")
+        }
+
+    def fetched_at(self, table: str) -> Optional[str]:
+        """Abrufzeitpunkt einer Tabelle oder None, wenn sie noch nie befüllt wurde"""
+        row = self.db.execute("SELECT fetched_at FROM fetch_info WHERE table_name = ?", (table,)).fetchone()
+        return row['fetched_at'] if row else None
+
+    def age(self, table: str) -> Optional[float]:
+        """Alter einer Tabelle in Sekunden oder None, wenn sie noch nie befüllt wurde"""
+        fetched_at = self.fetched_at(table)
+        if not fetched_at:
+            return None
+        return (datetime.now() - datetime.fromisoformat(fetched_at)).total_seconds()
+
+    def has(self, *tables: str) -> bool:
+        """True wenn alle Tabellen befüllt wurden"""
+        return all(self.fetched_at(table) for table in tables)
+
+    def customers(self) -> List[Dict]:
+        """Kunden im Format der Provisioning API"""
+        return [
+            {
+                'id': row['id'], 'companyName': row['company_name'],
+                'customerContractType': row['contract_type'], 'userMax': row['user_max'],
+                'userUsed': row['user_used'], 'quotaMax': row['quota_max'],
+                'quotaUsed': row['quota_used'], 'createdAt': row['created_at'],
+            }
+            for row in self.db.execute("SELECT * FROM customers ORDER BY id")
+        ]
+
+    def customer_email_rows(self) -> List[Dict]:
+        """Kunden-User im Format des E-Mail-Exports (Reihenfolge wie beim Abruf)"""
+        rows = []
+        for row in self.db.execute(f"SELECT {', '.join(CUSTOMER_USER_COLUMNS)} FROM customer_users ORDER BY rowid"):
+            entry = dict(row)
+            for column in CUSTOMER_USER_COLUMNS:
+                if column.startswith('is_'):
+                    entry[column] = bool(entry[column])
+            rows.append(entry)
+        return rows
+
+    def iter_customer_users(self, columns: List[str]) -> Iterator[tuple]:
+        """Kunden-User sortiert nach (customer_id, user_id) - gestreamt über den Primärschlüssel"""
+        cursor = self.db.execute(f"SELECT {', '.join(columns)} FROM customer_users ORDER BY customer_id, user_id")
+        cursor.row_factory = None
+        while True:
+            rows = cursor.fetchmany(10_000)
+            if not rows:
+                return
+            yield from rows
+
+    def customer_users_by_email(self, email: str) -> List[Dict]:
+        """Kunden-User mit dieser E-Mail (ohne Groß-/Kleinschreibung) über alle Kunden"""
+        rows = []
+        for row in self.db.execute(
+            f"SELECT {', '.join(CUSTOMER_USER_COLUMNS)} FROM customer_users "
+            f"WHERE email = ? COLLATE NOCASE ORDER BY customer_name, customer_id",
+            (email.strip(),)
+        ):
+            entry = dict(row)
+            for column in CUSTOMER_USER_COLUMNS:
+                if column.startswith('is_'):
+                    entry[column] = bool(entry[column])
+            rows.append(entry)
+        return rows
+
+    def find_user(self, identifier: str) -> Optional[Dict]:
+        """User nach ID, E-Mail oder Username (ohne Groß-/Kleinschreibung) - None wenn unbekannt"""
+        identifier = identifier.strip()
+        if identifier.isdigit():
+            row = self.db.execute("SELECT * FROM users WHERE id = ?", (int(identifier),)).fetchone()
+        else:
+            row = self.db.execute(
+                "SELECT * FROM users WHERE email = ? COLLATE NOCASE OR username = ? COLLATE NOCASE "
+                "ORDER BY username = ? DESC LIMIT 1",
+                (identifier, identifier, identifier)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            'id': row['id'], 'userName': row['username'], 'firstName': row['first_name'],
+            'lastName': row['last_name'], 'email': row['email'], 'isLocked': bool(row['is_locked']),
+        }
+
+    def user_groups(self, user_id: int) -> List[Dict]:
+        """Groups, in denen der User Mitglied ist ('id', 'name')"""
+        return [
+            {'id': row['id'], 'name': row['name']}
+            for row in self.db.execute(
+                "SELECT g.id, g.name FROM memberships m JOIN groups g ON g.id = m.group_id "
+                "WHERE m.user_id = ? ORDER BY g.name COLLATE NOCASE",
+                (user_id,)
+            )
+        ]
+
+    def users(self) -> List[Dict]:
+        """User als Dict mit 'id', 'userName', 'firstName', 'lastName', 'email', 'isLocked'"""
+        return [
+            {
+                'id': row['id'], 'userName': row['username'], 'firstName': row['first_name'],
+                'lastName': row['last_name'], 'email': row['email'], 'isLocked': bool(row['is_locked']),
+            }
+            for row in self.db.execute("SELECT * FROM users ORDER BY last_name, first_name")
+        ]
+
+    def groups(self) -> List[Dict]:
+        """Groups als Dict mit 'id', 'name', 'cntUsers'"""
+        return [
+            {'id': row['id'], 'name': row['name'], 'cntUsers': row['cnt_users']}
+            for row in self.db.execute("SELECT * FROM groups ORDER BY name COLLATE NOCASE")
+        ]
+
+    def membership_matrix(self, group_ids: Optional[List[int]] = None) -> MembershipMatrix:
+        """MembershipMatrix aus dem Snapshot (optional nur für bestimmte Groups)"""
+        matrix = MembershipMatrix()
+
+        group_filter = ""
+        params: tuple = ()
+        if group_ids is not None:
+            group_filter = f"WHERE g.id IN ({', '.join('?' for _ in group_ids)})"
+            params = tuple(group_ids)
+
+        for row in self.db.execute(f"SELECT g.id, g.name FROM groups g {group_filter}", params):
+            matrix.add_group(row['id'], row['name'])
+
+        query = f"""
+            SELECT m.group_id, u.id, u.username, u.first_name, u.last_name, u.email
+            FROM memberships m JOIN groups g ON g.id = m.group_id JOIN users u ON u.id = m.user_id
+            {group_filter}
+        """
+        for row in self.db.execute(query, params):
+            user_id = row['id']
+            matrix.users.setdefault(user_id, {
+                'id': user_id, 'userName': row['username'], 'firstName': row['first_name'],
+                'lastName': row['last_name'], 'email': row['email'],
+            })
+            matrix.group_users[row['group_id']].add(user_id)
+            matrix.user_groups.setdefault(user_id, set()).add(row['group_id'])
+
+        return matrix
+
+    def last_admin_rooms(self, user_id: int) -> List[Dict]:
+        """Räume, in denen der User letzter Room-Admin ist (Format wie get_user_last_admin_rooms)"""
+        return [
+            {'id': row['room_id'], 'name': row['name'], 'parentPath': row['parent_path']}
+            for row in self.db.execute(
+                "SELECT room_id, name, parent_path FROM last_admin_rooms WHERE user_id = ? ORDER BY parent_path, name",
+                (user_id,)
+            )
+        ]
+
+
+def open_snapshot(file_path: str = SNAPSHOT_FILE) -> Optional[SnapshotStore]:
+    """Öffnet einen vorhandenen Snapshot (None, wenn noch keiner angelegt wurde)"""
+    if not os.path.exists(file_path):
+        return None
+    return SnapshotStore(file_path)
+
+
+async def refresh_directory(store: SnapshotStore, dracoon: DRACOON, concurrency: int = DEFAULT_CONCURRENCY,
+                            on_step: Optional[Callable] = None):
+    """
+    Aktualisiert Users, Groups, Mitgliedschaften und Letzte-Admin-Räume über das SDK
+
+    Args:
+        store: Ziel-Snapshot
+        dracoon: Verbundener DRACOON-Client
+        concurrency: Gleichzeitige Requests
+        on_step: Optional - Callback(table_name, row_count) nach jeder Tabelle
+    """
+    users = await get_all_users(dracoon, concurrency=concurrency)
+    await asyncio.to_thread(store.replace_users, users)
+    if on_step:
+        on_step(TABLE_USERS, len(users))
+
+    groups = await get_all_groups(dracoon, concurrency=concurrency)
+    await asyncio.to_thread(store.replace_groups, groups)
+    if on_step:
+        on_step(TABLE_GROUPS, len(groups))
+
+    matrix = await load_membership_matrix(dracoon, groups, concurrency=concurrency)
+    if matrix.failed_groups:
+        raise Exception(f"Members of {len(matrix.failed_groups)} group(s) could not be loaded")
+    await asyncio.to_thread(store.replace_memberships, matrix)
+    if on_step:
+        on_step(TABLE_MEMBERSHIPS, matrix.membership_count)
+
+    # Ein Crawl statt einer Abfrage je User
+    index = await crawl_room_permissions(dracoon, concurrency=concurrency)
+    if index.failed_rooms:
+        raise Exception(f"{len(index.failed_rooms)} room(s) could not be crawled")
+    await asyncio.to_thread(store.replace_last_admin_rooms, index)
+    if on_step:
+        on_step(TABLE_LAST_ADMIN_ROOMS, store.fetch_info()[TABLE_LAST_ADMIN_ROOMS]['row_count'])
+
+
+async def refresh_customers(store: SnapshotStore, prov_client: ProvisioningClient,
+                            concurrency: int = DEFAULT_CONCURRENCY, on_step: Optional[Callable] = None):
+    """
+    Aktualisiert Kunden und Kunden-User über die Provisioning API
+
+    Args:
+        store: Ziel-Snapshot
+        prov_client: Provisioning-Client
+        concurrency: Gleichzeitig abgefragte Kunden
+        on_step: Optional - Callback(table_name, row_count) nach jeder Tabelle
+    """
+    customers = await prov_client.get_all_customers()
+    await asyncio.to_thread(store.replace_customers, customers)
+    if on_step:
+        on_step(TABLE_CUSTOMERS, len(customers))
+
+    results = await gather_limited(
+        customers,
+        lambda customer: prov_client.get_all_customer_users(customer.get('id')),
+        concurrency
+    )
+
+    rows = []
+    for customer, users in zip(customers, results):
+        if isinstance(users, Exception):
+            raise Exception(f"Users of customer {customer.get('id')} could not be loaded: {users}")
+        rows.extend(customer_user_row(customer, user) for user in users if user.get('email'))
+
+    await asyncio.to_thread(store.replace_customer_users, rows)
+    if on_step:
+        on_step(TABLE_CUSTOMER_USERS, len(rows))
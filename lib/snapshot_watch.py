@@ -0,0 +1,226 @@
+"""
+Dracoon Pyclient - Snapshot Watch
+Hält den lokalen Snapshot im Hintergrund aktuell (--watch): in festen Abständen werden
+Kunden, User und Groups abgefragt, aber nur geänderte Kunden/Groups neu geladen.
+Interaktive Module und Reports lesen dann sofort aktuelle Daten statt neu herunterzuladen.
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, Optional, Set
+
+from dracoon import DRACOON
+
+from .customer_scheduler import collect_customer_users
+from .directory import get_all_users, get_all_groups
+from .membership import load_membership_matrix
+from .provisioning import ProvisioningClient, customer_user_row
+from .snapshot import (
+    SnapshotStore, refresh_directory, refresh_customers,
+    TABLE_CUSTOMERS, TABLE_CUSTOMER_USERS, TABLE_USERS, TABLE_GROUPS, TABLE_MEMBERSHIPS, TABLE_LAST_ADMIN_ROOMS
+)
+
+
+WATCH_INTERVAL = 15 * 60
+WATCH_CONCURRENCY = 8
+# Jeder n-te Durchlauf lädt alles neu (inkl. Letzte-Admin-Räume)
+WATCH_FULL_EVERY = 12
+
+# Änderungserkennung:
+# counts - Kunden-User nur bei geändertem userUsed, Members nur bei geändertem cntUsers neu laden;
+#          Änderungen ohne andere Anzahl (Sperre, Rollen, E-Mail) kommen mit dem nächsten Volllauf
+# full   - jeder Durchlauf lädt alles neu
+STRATEGY_COUNTS = "counts"
+STRATEGY_FULL = "full"
+STRATEGIES = [STRATEGY_COUNTS, STRATEGY_FULL]
+
+
+async def update_customers(store: SnapshotStore, prov_client: ProvisioningClient,
+                           concurrency: int = WATCH_CONCURRENCY, retry_ids: Set[int] = frozenset()) -> Dict:
+    """
+    Lädt die Kundenliste und die User neuer bzw. geänderter Kunden (userUsed)
+
+    Args:
+        store: Ziel-Snapshot (Kunden und Kunden-User müssen schon einmal geladen sein)
+        prov_client: Provisioning-Client
+        concurrency: Parallele Requests
+        retry_ids: Kunden, die im letzten Durchlauf fehlgeschlagen sind
+
+    Returns:
+        {'checked', 'changed', 'removed', 'failed': set der Kunden-IDs}
+    """
+    known = {customer['id']: customer['userUsed'] for customer in store.customers()}
+    customers = await prov_client.get_all_customers()
+    current = {customer.get('id') for customer in customers}
+
+    changed = [
+        customer for customer in customers
+        if customer.get('id') not in known or known[customer.get('id')] != customer.get('userUsed')
+        or customer.get('id') in retry_ids
+    ]
+    removed = [customer_id for customer_id in known if customer_id not in current]
+
+    results = await collect_customer_users(prov_client, changed, concurrency=concurrency)
+
+    rows = []
+    updated = list(removed)
+    failed = set()
+    for index, customer in enumerate(changed):
+        users = results.get(index)
+        if isinstance(users, Exception):
+            failed.add(customer.get('id'))
+            continue
+        updated.append(customer.get('id'))
+        rows.extend(customer_user_row(customer, user) for user in users if user.get('email'))
+
+    await asyncio.to_thread(store.replace_customers, customers)
+    await asyncio.to_thread(store.update_customer_users, updated, rows)
+
+    return {'checked': len(customers), 'changed': len(changed) - len(failed), 'removed': len(removed), 'failed': failed}
+
+
+async def update_directory(store: SnapshotStore, dracoon: DRACOON,
+                           concurrency: int = WATCH_CONCURRENCY, retry_ids: Set[int] = frozenset()) -> Dict:
+    """
+    Lädt User und Groups sowie die Members neuer bzw. geänderter Groups (cntUsers)
+
+    Die Userliste selbst wird immer vollständig geladen (die API kennt keinen Änderungsfilter),
+    die teuren Abfragen je Group entfallen für unveränderte Groups.
+
+    Returns:
+        {'checked', 'changed', 'removed', 'failed': set der Group-IDs}
+    """
+    known = {group['id']: group['cntUsers'] for group in store.groups()}
+
+    users = await get_all_users(dracoon, concurrency=concurrency)
+    await asyncio.to_thread(store.replace_users, users)
+
+    groups = await get_all_groups(dracoon, concurrency=concurrency)
+    current = {group.id for group in groups}
+
+    changed = [
+        group for group in groups
+        if group.id not in known or known[group.id] != (getattr(group, 'cntUsers', 0) or 0)
+        or group.id in retry_ids
+    ]
+    removed = [group_id for group_id in known if group_id not in current]
+
+    matrix = await load_membership_matrix(dracoon, changed, concurrency=concurrency)
+    failed = set(matrix.failed_groups)
+
+    await asyncio.to_thread(store.replace_groups, groups)
+    await asyncio.to_thread(
+        store.update_memberships, [group.id for group in changed if group.id not in failed] + removed, matrix
+    )
+
+    return {'checked': len(groups), 'changed': len(changed) - len(failed), 'removed': len(removed), 'failed': failed}
+
+
+class SnapshotWatcher:
+    """Aktualisiert den Snapshot in festen Abständen, bis der Task abgebrochen wird"""
+
+    def __init__(self, store: SnapshotStore, dracoon: Optional[DRACOON] = None,
+                 prov_client: Optional[ProvisioningClient] = None, interval: float = WATCH_INTERVAL,
+                 concurrency: int = WATCH_CONCURRENCY, strategy: str = STRATEGY_COUNTS,
+                 full_every: int = WATCH_FULL_EVERY, reconnect: Optional[Callable] = None,
+                 on_cycle: Optional[Callable] = None):
+        """
+        Args:
+            store: Ziel-Snapshot
+            dracoon: Optional - Verbundener DRACOON-Client (User, Groups, Mitgliedschaften, Räume)
+            prov_client: Optional - Provisioning-Client (Kunden und Kunden-User)
+            interval: Sekunden zwischen den Starts zweier Durchläufe
+            concurrency: Parallele Requests
+            strategy: STRATEGY_COUNTS oder STRATEGY_FULL
+            full_every: Bei STRATEGY_COUNTS jeder n-te Durchlauf vollständig (0 = nie)
+            reconnect: Optional - Async-Callback vor jedem OAuth-Durchlauf, liefert den (ggf. neu
+                verbundenen) DRACOON-Client
+            on_cycle: Optional - Callback(report) nach jedem Durchlauf
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown change detection strategy: {strategy}")
+        self.store = store
+        self.dracoon = dracoon
+        self.prov_client = prov_client
+        self.interval = interval
+        self.concurrency = concurrency
+        self.strategy = strategy
+        self.full_every = full_every
+        self.reconnect = reconnect
+        self.on_cycle = on_cycle
+        self.cycle = 0
+        # Fehlgeschlagene Kunden/Groups werden im nächsten Durchlauf erneut geladen
+        self.retry_customers: Set[int] = set()
+        self.retry_groups: Set[int] = set()
+
+    def _is_full(self) -> bool:
+        if self.strategy == STRATEGY_FULL:
+            return True
+        # Fehlende Tabellen werden unabhängig davon vollständig geladen (siehe run_cycle)
+        return self.full_every > 0 and self.cycle % self.full_every == 0
+
+    async def run_cycle(self, full: Optional[bool] = None) -> Dict:
+        """
+        Ein Durchlauf über alle konfigurierten Quellen (Fehler einer Quelle stoppen die andere nicht)
+
+        Args:
+            full: Optional - Volllauf erzwingen (True) bzw. verhindern (False), sonst nach Strategie
+
+        Returns:
+            {'cycle', 'full', 'seconds', 'customers': Ergebnis|None, 'directory': Ergebnis|None,
+             'last_admin_age': Sekunden|None, 'errors': [..]}
+        """
+        self.cycle += 1
+        if full is None:
+            full = self._is_full()
+        report = {'cycle': self.cycle, 'full': full, 'customers': None, 'directory': None, 'errors': []}
+        start = time.monotonic()
+
+        if self.prov_client:
+            try:
+                if full or not self.store.has(TABLE_CUSTOMERS, TABLE_CUSTOMER_USERS):
+                    await refresh_customers(self.store, self.prov_client, concurrency=self.concurrency)
+                    report['customers'] = {'full': True, 'rows': self.store.fetch_info()[TABLE_CUSTOMER_USERS]['row_count']}
+                    self.retry_customers = set()
+                else:
+                    result = await update_customers(self.store, self.prov_client, self.concurrency, self.retry_customers)
+                    self.retry_customers = result['failed']
+                    report['customers'] = result
+            except Exception as e:
+                report['errors'].append(f"Customers: {str(e)[:200]}")
+
+        if self.dracoon:
+            try:
+                if self.reconnect:
+                    self.dracoon = await self.reconnect()
+                if full or not self.store.has(TABLE_USERS, TABLE_GROUPS, TABLE_MEMBERSHIPS):
+                    await refresh_directory(self.store, self.dracoon, concurrency=self.concurrency)
+                    report['directory'] = {'full': True, 'rows': self.store.fetch_info()[TABLE_MEMBERSHIPS]['row_count']}
+                    self.retry_groups = set()
+                else:
+                    result = await update_directory(self.store, self.dracoon, self.concurrency, self.retry_groups)
+                    self.retry_groups = result['failed']
+                    report['directory'] = result
+            except Exception as e:
+                report['errors'].append(f"Directory: {str(e)[:200]}")
+
+        # Letzte-Admin-Räume werden nur mit Vollläufen neu gecrawlt - Alter im Bericht
+        report['last_admin_age'] = self.store.age(TABLE_LAST_ADMIN_ROOMS)
+        report['seconds'] = time.monotonic() - start
+        return report
+
+    async def run(self, cycles: Optional[int] = None):
+        """
+        Durchläufe im Abstand von interval (gemessen von Start zu Start)
+
+        Args:
+            cycles: Optional - Anzahl Durchläufe (Standard: bis zum Abbruch)
+        """
+        while cycles is None or self.cycle < cycles:
+            started = time.monotonic()
+            report = await self.run_cycle()
+            if self.on_cycle:
+                self.on_cycle(report)
+            if cycles is not None and self.cycle >= cycles:
+                break
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
@@ -0,0 +1,151 @@
+"""
+Dracoon Pyclient - Throughput
+Live-Kennzahlen während langer Läufe: Requests/s, User/s, laufende Requests, p95-Latenz,
+Wiederholungen, Fehler und ETA aus dem Durchsatz der letzten Sekunden. Gezeichnet wird
+mit fester Bildrate aus einem eigenen Task - die Callbacks der Sammelschleife zählen nur.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+
+from .provisioning import LatencyTracker, ENDPOINT_CUSTOMER_USERS
+from .utils import COLOR_PRIMARY, COLOR_SUCCESS, COLOR_ERROR, COLOR_WARNING, COLOR_DIM
+
+
+# Bilder pro Sekunde und Zeitfenster (Sekunden) für Raten und ETA
+FRAME_RATE = 4
+RATE_WINDOW = 15.0
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Dauer als m:ss bzw. h:mm:ss ('-' ohne Schätzung)"""
+    if seconds is None:
+        return "-"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class ThroughputMonitor:
+    """Zählt geladene User und Kunden und liest die Request-Zähler des Provisioning-Clients"""
+
+    def __init__(self, latency: LatencyTracker, total_customers: int, total_users: int = 0,
+                 endpoint: str = ENDPOINT_CUSTOMER_USERS, window: float = RATE_WINDOW):
+        """
+        Args:
+            latency: LatencyTracker des Provisioning-Clients
+            total_customers: Anzahl der Kunden im Lauf
+            total_users: Geschätzte Anzahl User (userUsed) - Basis der ETA
+            endpoint: Endpoint für die p95-Latenz
+            window: Zeitfenster für Raten und ETA in Sekunden
+        """
+        self.latency = latency
+        self.total_customers = total_customers
+        self.total_users = total_users
+        self.endpoint = endpoint
+        self.window = window
+        self.users = 0
+        self.customers = 0
+        self.failed_customers = 0
+        self.started = time.monotonic()
+        # (Zeitpunkt, Requests, User, Kunden) je Bild
+        self.samples: deque = deque()
+        # Zählerstände zu Beginn - der Client kann schon vorher Requests gesendet haben
+        self._base_requests = latency.requests
+        self._base_errors = latency.errors
+        self._base_retries = latency.timeout_retries + latency.hedged
+
+    def page_done(self, users: list):
+        self.users += len(users)
+
+    def customer_done(self, failed: bool = False):
+        self.customers += 1
+        if failed:
+            self.failed_customers += 1
+
+    @property
+    def requests(self) -> int:
+        return self.latency.requests - self._base_requests
+
+    @property
+    def errors(self) -> int:
+        return self.latency.errors - self._base_errors
+
+    @property
+    def retries(self) -> int:
+        return self.latency.timeout_retries + self.latency.hedged - self._base_retries
+
+    def sample(self, now: Optional[float] = None):
+        """Merkt die aktuellen Zählerstände, ältere Werte als das Zeitfenster fallen heraus"""
+        now = time.monotonic() if now is None else now
+        self.samples.append((now, self.requests, self.users, self.customers))
+        while len(self.samples) > 2 and now - self.samples[1][0] >= self.window:
+            self.samples.popleft()
+
+    def rates(self) -> tuple:
+        """(Requests/s, User/s, Kunden/s) im Zeitfenster"""
+        if len(self.samples) < 2:
+            return 0.0, 0.0, 0.0
+        first, last = self.samples[0], self.samples[-1]
+        elapsed = last[0] - first[0]
+        if elapsed <= 0:
+            return 0.0, 0.0, 0.0
+        return tuple((last[i] - first[i]) / elapsed for i in (1, 2, 3))
+
+    def eta(self) -> Optional[float]:
+        """Restzeit in Sekunden aus dem aktuellen Durchsatz (None ohne Schätzung)"""
+        if self.customers >= self.total_customers:
+            return 0.0
+        _, users_rate, customers_rate = self.rates()
+        remaining_users = self.total_users - self.users
+        if remaining_users > 0 and users_rate > 0:
+            return remaining_users / users_rate
+        if customers_rate > 0:
+            # Schätzung aus userUsed zu niedrig - nach verbleibenden Kunden
+            return (self.total_customers - self.customers) / customers_rate
+        return None
+
+    def __rich__(self) -> Panel:
+        requests_rate, users_rate, _ = self.rates()
+        p95 = self.latency.percentile(self.endpoint, 95)
+
+        grid = Table.grid(expand=True, padding=(0, 2))
+        for _ in range(4):
+            grid.add_column(style=COLOR_DIM, no_wrap=True)
+            grid.add_column(justify="right", no_wrap=True)
+
+        error_color = COLOR_ERROR if self.errors or self.failed_customers else COLOR_SUCCESS
+        grid.add_row(
+            "Requests/s", f"[{COLOR_PRIMARY}]{requests_rate:,.1f}[/{COLOR_PRIMARY}]",
+            "Users/s", f"[{COLOR_PRIMARY}]{users_rate:,.0f}[/{COLOR_PRIMARY}]",
+            "In flight", f"{self.latency.in_flight:,}",
+            "p95 latency", f"{p95:.2f} s" if p95 is not None else "-",
+        )
+        grid.add_row(
+            "Requests", f"{self.requests:,}",
+            "Users", f"{self.users:,}",
+            "Retries", f"[{COLOR_WARNING}]{self.retries:,}[/{COLOR_WARNING}]" if self.retries else "0",
+            "Errors", f"[{error_color}]{self.errors:,} / {self.failed_customers:,} cust.[/{error_color}]",
+        )
+        grid.add_row(
+            "Elapsed", format_duration(time.monotonic() - self.started),
+            "ETA", f"[{COLOR_PRIMARY}]{format_duration(self.eta())}[/{COLOR_PRIMARY}]",
+            "Customers", f"{self.customers:,}/{self.total_customers:,}",
+            "", "",
+        )
+        return Panel(grid, title=f"[bold {COLOR_PRIMARY}]Throughput[/bold {COLOR_PRIMARY}]", border_style=COLOR_DIM)
+
+
+async def render_loop(live: Live, monitor: ThroughputMonitor, frame_rate: float = FRAME_RATE):
+    """Zeichnet die Live-Anzeige mit fester Bildrate, bis der Task abgebrochen wird"""
+    interval = 1 / frame_rate
+    while True:
+        monitor.sample()
+        live.refresh()
+        await asyncio.sleep(interval)
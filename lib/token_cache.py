@@ -0,0 +1,110 @@
+"""
+Dracoon Pyclient - OAuth Token Cache
+Speichert den Refresh Token zwischen zwei Starts - im OS-Keyring (falls das Paket
+keyring installiert ist), sonst verschlüsselt in einer Datei im Home-Verzeichnis
+"""
+
+import base64
+import hashlib
+import json
+import os
+from typing import Optional
+
+
+KEYRING_SERVICE = "dracoon-pyclient"
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".dracoon-pyclient", "tokens.json")
+
+BACKEND_KEYRING = "keyring"
+BACKEND_FILE = "file"
+
+# PBKDF2-Runden für den Dateischlüssel
+KDF_ITERATIONS = 200_000
+
+
+class TokenCache:
+    """Refresh-Token-Cache je Instanz, OAuth-App und User"""
+
+    def __init__(self, base_url: str, client_id: str, client_secret: str, username: str,
+                 cache_file: str = CACHE_FILE):
+        self.cache_file = cache_file
+        self.client_secret = client_secret or ""
+        # Ein Eintrag je Kombination - ein Token passt nur zu genau dieser App und diesem User
+        self.key = hashlib.sha256(
+            f"{(base_url or '').rstrip('/')}|{client_id}|{username}".encode()
+        ).hexdigest()
+        self.backend = BACKEND_KEYRING if self._keyring() else BACKEND_FILE
+
+    @staticmethod
+    def _keyring():
+        """keyring ist optional - None wenn nicht installiert oder ohne nutzbares Backend"""
+        try:
+            import keyring
+            from keyring.backends import fail
+        except ImportError:
+            return None
+        if isinstance(keyring.get_keyring(), fail.Keyring):
+            return None
+        return keyring
+
+    def _fernet(self):
+        """Dateischlüssel wird aus dem Client Secret abgeleitet (liegt nicht im Cache)"""
+        from cryptography.fernet import Fernet
+
+        raw = hashlib.pbkdf2_hmac('sha256', self.client_secret.encode(), self.key.encode(), KDF_ITERATIONS)
+        return Fernet(base64.urlsafe_b64encode(raw))
+
+    def _read_file(self) -> dict:
+        try:
+            with open(self.cache_file, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_file(self, entries: dict):
+        os.makedirs(os.path.dirname(self.cache_file), mode=0o700, exist_ok=True)
+        # Datei nur für den eigenen User lesbar anlegen
+        fd = os.open(self.cache_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+
+    def load(self) -> Optional[str]:
+        """Gespeicherter Refresh Token oder None"""
+        try:
+            if self.backend == BACKEND_KEYRING:
+                return self._keyring().get_password(KEYRING_SERVICE, self.key)
+
+            token = self._read_file().get(self.key)
+            if not token:
+                return None
+            return self._fernet().decrypt(token.encode()).decode()
+        except Exception:
+            # Unlesbarer Eintrag (z.B. Client Secret geändert) - wie kein Cache behandeln
+            return None
+
+    def save(self, refresh_token: str):
+        """Speichert den Refresh Token (Fehler werden ignoriert - der Cache ist optional)"""
+        if not refresh_token:
+            return
+        try:
+            if self.backend == BACKEND_KEYRING:
+                self._keyring().set_password(KEYRING_SERVICE, self.key, refresh_token)
+                return
+
+            entries = self._read_file()
+            entries[self.key] = self._fernet().encrypt(refresh_token.encode()).decode()
+            self._write_file(entries)
+        except Exception:
+            pass
+
+    def clear(self):
+        """Entfernt den Eintrag (z.B. nach abgelehntem Refresh)"""
+        try:
+            if self.backend == BACKEND_KEYRING:
+                self._keyring().delete_password(KEYRING_SERVICE, self.key)
+                return
+
+            entries = self._read_file()
+            if entries.pop(self.key, None) is not None:
+                self._write_file(entries)
+        except Exception:
+            pass
@@ -9,7 +9,9 @@ from rich.prompt import Prompt, Confirm
 from rich.table import Table
 from rich.align import Align
 from rich import box
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable, Any
+import asyncio
+import threading
 import os
 from dotenv import load_dotenv
 
@@ -35,9 +37,10 @@ def show_header(console: Console, title: str) -> None:
     console.print()
 
 
-def get_credentials() -> tuple:
+def get_credentials(ask_password: bool = True) -> tuple:
     """
     Loads credentials from .env or asks interactively
+    ask_password=False: password is None if not in .env (asked later only if needed)
     Returns: (base_url, client_id, client_secret, username, password)
     """
     console = Console()
@@ -70,7 +73,9 @@ def get_credentials() -> tuple:
         console.print(f"[{COLOR_DIM}]Username from .env: {username}[/{COLOR_DIM}]")
     
     password = os.getenv('DRACOON_PASSWORD')
-    if not password:
+    if not password and not ask_password:
+        password = None
+    elif not password:
         password = Prompt.ask(f"[{COLOR_PRIMARY}]Password[/{COLOR_PRIMARY}]", password=True)
     else:
         console.print(f"[{COLOR_DIM}]Password from .env: ********[/{COLOR_DIM}]")
@@ -131,6 +136,28 @@ def search_and_select_user(console: Console, all_users: List[Dict], prompt_text:
         return None
 
 
+def parse_selection(choice: str) -> set:
+    """
+    Parst eine Nummern-Auswahl wie '5', '1,3,5', '1-5' oder '1,3,5-8'
+    
+    Returns:
+        Menge der gewählten Nummern (ValueError bei ungültiger Eingabe)
+    """
+    selected_indices = set()
+    
+    for part in choice.split(','):
+        part = part.strip()
+        if '-' in part:
+            # Range
+            start, end = part.split('-')
+            selected_indices.update(range(int(start), int(end) + 1))
+        else:
+            # Single number
+            selected_indices.add(int(part))
+    
+    return selected_indices
+
+
 def export_to_csv(file_path: str, headers: list, rows: list) -> bool:
     """
     Exportiert Daten als CSV
@@ -156,6 +183,85 @@ def export_to_csv(file_path: str, headers: list, rows: list) -> bool:
         return False
 
 
+def read_table_file(file_path: str) -> List[Dict]:
+    """
+    Liest eine CSV- oder XLSX-Datei mit Kopfzeile
+    
+    Args:
+        file_path: Pfad zur Datei (.csv, .xlsx)
+    
+    Returns:
+        Liste von Zeilen als Dict (Spaltennamen klein geschrieben, Werte getrimmt)
+    """
+    if file_path.lower().endswith('.xlsx'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise Exception("XLSX import requires openpyxl (pip install openpyxl)")
+        
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        raw_rows = [["" if v is None else str(v) for v in row] for row in rows]
+        workbook.close()
+    else:
+        import csv
+        
+        with open(file_path, newline='', encoding='utf-8-sig') as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+            except csv.Error:
+                dialect = csv.excel
+            raw_rows = list(csv.reader(f, dialect))
+    
+    if not raw_rows:
+        return []
+    
+    headers = [h.strip().lower() for h in raw_rows[0]]
+    return [
+        {headers[i]: value.strip() for i, value in enumerate(row) if i < len(headers)}
+        for row in raw_rows[1:]
+        if any(value.strip() for value in row)
+    ]
+
+
 def pause(console: Console, message: str = "Press Enter to continue"):
     """Pauses and waits for Enter"""
-    Prompt.ask(f"\n[{COLOR_DIM}]{message}[/{COLOR_DIM}]")
\ No newline at end of file
+    Prompt.ask(f"\n[{COLOR_DIM}]{message}[/{COLOR_DIM}]")
+
+
+async def run_prompt(func: Callable, *args, **kwargs) -> Any:
+    """
+    Führt einen blockierenden Prompt in einem Daemon-Thread aus
+    
+    Der Event-Loop läuft währenddessen weiter, sodass Hintergrund-Tasks
+    (z.B. Prefetch) die Wartezeit des Operators nutzen können.
+    Daemon-Thread statt Executor, damit Strg+C nicht auf input() wartet.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def _resolve(result=None, error=None):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def _worker():
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            loop.call_soon_threadsafe(_resolve, None, e)
+        else:
+            loop.call_soon_threadsafe(_resolve, result)
+    
+    threading.Thread(target=_worker, daemon=True).start()
+    return await future
+
+
+async def apause(console: Console, message: str = "Press Enter to continue"):
+    """Wie pause(), blockiert aber nicht den Event-Loop"""
+    await run_prompt(pause, console, message)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Dracoon Pyclient - Customer Analytics
+Kennzahlen über alle Kunden eines Tenants (Reseller) aus Kundenliste und gesammelten Kunden-Usern
+"""
+
+import os
+from datetime import datetime
+from rich.console import Console
+from rich.table import Table
+from rich.prompt import Confirm
+
+from lib import (
+    show_header, pause, export_to_csv,
+    COLOR_PRIMARY, COLOR_SUCCESS, COLOR_ERROR, COLOR_WARNING, COLOR_DIM, TABLE_BOX
+)
+from lib.prefetch import DataPrefetcher
+from lib.snapshot import open_snapshot, TABLE_CUSTOMERS, TABLE_CUSTOMER_USERS
+
+
+class CustomerAnalytics:
+    def __init__(self, customers: list = None, rows: list = None):
+        """
+        Args:
+            customers: Kunden im Format der Provisioning API - ohne Angabe aus dem lokalen Snapshot
+            rows: Zeilen des E-Mail-Exports (User mit E-Mail) - ohne Angabe aus dem lokalen Snapshot
+        """
+        self.console = Console()
+        self.customers = customers
+        self.rows = rows
+
+    async def run(self):
+        """Hauptfunktion des Moduls"""
+        try:
+            self.console.clear()
+            show_header(self.console, "Dracoon Pyclient - Customer Analytics")
+
+            try:
+                from lib.analytics import CustomerColumns, compute_summary, customer_rows
+            except ImportError:
+                self.console.print(f"[{COLOR_ERROR}]✗ Analytics requires numpy (pip install numpy)[/{COLOR_ERROR}]\n")
+                pause(self.console)
+                return
+
+            if (self.customers is None or self.rows is None) and not self._load_from_snapshot():
+                pause(self.console)
+                return
+
+            if not self.customers:
+                self.console.print(f"[{COLOR_WARNING}]No customer data available![/{COLOR_WARNING}]\n")
+                pause(self.console)
+                return
+
+            self.console.print(f"[{COLOR_WARNING}]Computing analytics for {len(self.customers):,} customers and {len(self.rows):,} users with e-mail...[/{COLOR_WARNING}]\n")
+            columns = CustomerColumns(self.customers, self.rows)
+            summary = compute_summary(columns)
+
+            self._show_summary(summary)
+
+            if Confirm.ask("\nExport summary and per-customer figures as CSV?", default=True):
+                self._export(summary, customer_rows(columns))
+
+            self.console.print(f"\n[{COLOR_PRIMARY}]Back to main menu...[/{COLOR_PRIMARY}]\n")
+            pause(self.console)
+
+        except KeyboardInterrupt:
+            self.console.print(f"\n\n[{COLOR_WARNING}]Cancelled by user[/{COLOR_WARNING}]\n")
+        except Exception as e:
+            self.console.print(f"\n[{COLOR_ERROR}]Error: {str(e)}[/{COLOR_ERROR}]\n")
+            pause(self.console)
+
+    def _load_from_snapshot(self) -> bool:
+        """Lädt Kunden und Kunden-User aus dem lokalen Snapshot"""
+        store = open_snapshot()
+        if not store or not store.has(TABLE_CUSTOMERS, TABLE_CUSTOMER_USERS):
+            if store:
+                store.close()
+            self.console.print(f"[{COLOR_ERROR}]✗ No customer data in the local snapshot.[/{COLOR_ERROR}]")
+            self.console.print(f"[{COLOR_DIM}]Refresh it via 'Local Snapshot' or run the Customer Email Export first.[/{COLOR_DIM}]\n")
+            return False
+
+        self.console.print(f"[{COLOR_DIM}]Local snapshot: customer users fetched {store.fetched_at(TABLE_CUSTOMER_USERS)}[/{COLOR_DIM}]")
+        self.customers = store.customers()
+        self.rows = store.customer_email_rows()
+        store.close()
+        return True
+
+    def _show_summary(self, summary: dict):
+        """Zeigt je Abschnitt eine Tabelle"""
+        for section, metrics in summary.items():
+            table = Table(title=f"[bold {COLOR_PRIMARY}]{section}[/bold {COLOR_PRIMARY}]", show_header=False, box=TABLE_BOX)
+            table.add_column("Metric", width=36)
+            table.add_column("Value", justify="right", width=16)
+
+            for metric, value in metrics:
+                table.add_row(metric, f"{value:,}" if isinstance(value, int) else str(value))
+
+            self.console.print(table)
+
+    def _export(self, summary: dict, rows: list):
+        """Exportiert die Zusammenfassung und die Kennzahlen je Kunde"""
+        exports_dir = "exports"
+        if not os.path.exists(exports_dir):
+            os.makedirs(exports_dir)
+
+        timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        summary_path = os.path.join(exports_dir, f"customer_analytics_{timestamp}.csv")
+        customers_path = os.path.join(exports_dir, f"customer_analytics_per_customer_{timestamp}.csv")
+
+        summary_rows = [
+            [section, metric, value]
+            for section, metrics in summary.items()
+            for metric, value in metrics
+        ]
+        customer_headers = [
+            "Customer ID", "Customer Name", "Contract Type", "Users", "User Max", "Utilization %",
+            "Users With Email", "Locked Users With Email", "Locked % (With Email)", "Tenant Admins With Email",
+            "Quota GB", "Created Year"
+        ]
+
+        if export_to_csv(summary_path, ["Section", "Metric", "Value"], summary_rows) and \
+           export_to_csv(customers_path, customer_headers, rows):
+            self.console.print(f"\n[{COLOR_SUCCESS}]✓ CSV exported to:[/{COLOR_SUCCESS}]")
+            self.console.print(f"  [{COLOR_PRIMARY}]{summary_path}[/{COLOR_PRIMARY}]")
+            self.console.print(f"  [{COLOR_PRIMARY}]{customers_path}[/{COLOR_PRIMARY}] ({len(rows):,} customers)")
+        else:
+            self.console.print(f"\n[{COLOR_ERROR}]✗ Error during CSV export[/{COLOR_ERROR}]")
+
+
+async def main(dracoon=None, prefetch: DataPrefetcher = None):
+    """Entry Point für das Modul"""
+    # Arbeitet nur auf lokal vorhandenen Daten (Snapshot)
+    analytics = CustomerAnalytics()
+    await analytics.run()
@@ -5,28 +5,52 @@ Exportiert E-Mail-Adressen aller User über alle Kunden eines Tenants (Reseller)
 """
 
 import os
+import time
+import asyncio
 from datetime import datetime
-from rich.console import Console
+from rich.console import Console, Group
 from rich.table import Table
 from rich.prompt import Prompt, Confirm, IntPrompt
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 from rich.live import Live
-from rich.panel import Panel
 from dotenv import load_dotenv
 
 from lib import (
-    show_header, pause, export_to_csv,
+    show_header, pause, apause, export_to_csv,
     COLOR_PRIMARY, COLOR_SUCCESS, COLOR_ERROR, COLOR_WARNING, COLOR_DIM, TABLE_BOX
 )
-from lib.provisioning import ProvisioningClient
+from lib.provisioning import ProvisioningClient, customer_user_row
+from lib.snapshot import SnapshotStore, open_snapshot, TABLE_CUSTOMER_USERS
+from lib.customer_scheduler import collect_customer_users, estimated_users, EXPORT_CONCURRENCY
+from lib.customer_details import load_customer_details, merge_customer_details, DETAIL_COLUMNS
+from lib.dedup import EmailIndex, write_dedup_reports
+from lib.external_sort import write_sorted_csv
+from lib.prefetch import DataPrefetcher
+from lib.throughput import ThroughputMonitor, render_loop
+from modules.customer_analytics import CustomerAnalytics
 
 
 class CustomerEmailExport:
-    def __init__(self):
+    def __init__(self, prefetch: DataPrefetcher = None, time_budget: float = None):
+        """
+        Args:
+            prefetch: Optional - vorgeladene erste Kundenseite
+            time_budget: Optional - Zeitbudget in Sekunden (--time-budget)
+        """
         self.console = Console()
         self.prov_client = None
+        self.prefetch = prefetch
+        self.first_page = None
         self.all_emails = []
+        # Kunden des Laufs (Kunden-Kennzahlen der Analytics)
+        self.customers = []
         self.customer_limit = None
+        self.time_budget = time_budget
+        self.enriched = False
+        # Für den Nachweis nach dem Export: vollständig gesammelte und offene Kunden
+        self.exported_customer_ids = []
+        self.remaining = []
+        self.last_export = {}
         
     async def run(self):
         """Main function of the module"""
@@ -34,6 +58,17 @@ class CustomerEmailExport:
             self.console.clear()
             show_header(self.console, "Dracoon Pyclient - Customer Email Export")
             
+            # Lokaler Snapshot statt API (falls vorhanden)
+            if self._load_from_snapshot():
+                self._show_results()
+                if self.all_emails:
+                    await self._export_emails()
+                    self._offer_dedup()
+                    await self._offer_analytics()
+                self.console.print(f"\n[{COLOR_PRIMARY}]Back to main menu...[/{COLOR_PRIMARY}]\n")
+                pause(self.console)
+                return
+            
             # Provisioning Token laden
             if not await self._load_provisioning_credentials():
                 return
@@ -42,7 +77,7 @@ class CustomerEmailExport:
             if not await self._test_connection():
                 return
             
-            pause(self.console)
+            await apause(self.console)
             
             # Kunden laden und E-Mails sammeln
             await self._collect_all_emails()
@@ -53,6 +88,8 @@ class CustomerEmailExport:
             # Export anbieten
             if self.all_emails:
                 await self._export_emails()
+                self._offer_dedup()
+                await self._offer_analytics()
             
             self.console.print(f"\n[{COLOR_PRIMARY}]Back to main menu...[/{COLOR_PRIMARY}]\n")
             pause(self.console)
@@ -66,6 +103,28 @@ class CustomerEmailExport:
             traceback.print_exc()
             pause(self.console)
     
+    def _load_from_snapshot(self) -> bool:
+        """Übernimmt die Kunden-User aus dem lokalen Snapshot, wenn vorhanden und gewünscht"""
+        store = open_snapshot()
+        if not store:
+            return False
+        
+        try:
+            info = store.fetch_info().get(TABLE_CUSTOMER_USERS)
+            if not info:
+                return False
+            
+            self.console.print(f"[{COLOR_DIM}]Local snapshot: {info['row_count']:,} users, fetched {info['fetched_at']}[/{COLOR_DIM}]")
+            if not Confirm.ask("Use local snapshot instead of the Provisioning API?", default=False):
+                self.console.print()
+                return False
+            
+            self.all_emails = store.customer_email_rows()
+            self.customers = store.customers()
+            return True
+        finally:
+            store.close()
+    
     async def _load_provisioning_credentials(self) -> bool:
         """Lädt Provisioning Token aus .env oder fragt interaktiv ab"""
         load_dotenv()
@@ -89,6 +148,10 @@ class CustomerEmailExport:
             pause(self.console)
             return False
         
+        # Vorgeladene erste Kundenseite nur bei identischem Zugang übernehmen
+        if self.prefetch and not self.prefetch.matches_provisioning(base_url, service_token):
+            self.prefetch = None
+        
         # DEBUG-MODUS AKTIVIERT!
         self.prov_client = ProvisioningClient(base_url, service_token, debug=True)
         return True
@@ -97,6 +160,13 @@ class CustomerEmailExport:
         """Testet die Verbindung zur Provisioning API"""
         self.console.print(f"\n[{COLOR_WARNING}]Testing connection to Provisioning API...[/{COLOR_WARNING}]")
         
+        # Erfolgreich vorgeladene erste Seite belegt bereits die Verbindung
+        if self.prefetch:
+            self.first_page = await self.prefetch.take('customers_first_page')
+            if self.first_page is not None:
+                self.console.print(f"[{COLOR_SUCCESS}]✓ Connection successful![/{COLOR_SUCCESS}]")
+                return True
+        
         try:
             if await self.prov_client.test_connection():
                 self.console.print(f"[{COLOR_SUCCESS}]✓ Connection successful![/{COLOR_SUCCESS}]")
@@ -120,8 +190,10 @@ class CustomerEmailExport:
             # Alle Kunden laden
             self.console.print(f"[{COLOR_WARNING}]Loading customers (fetching first page to count)...[/{COLOR_WARNING}]")
             
-            # Erst mal nur erste Page holen um Anzahl zu sehen
-            first_page = await self.prov_client.get_customers(offset=0, limit=500)
+            # Erst mal nur erste Page holen um Anzahl zu sehen (ggf. bereits vorgeladen)
+            first_page = self.first_page
+            if first_page is None:
+                first_page = await self.prov_client.get_customers(offset=0, limit=500)
             total_available = first_page.get('range', {}).get('total', 0)
             
             self.console.print(f"[{COLOR_SUCCESS}]✓ Found {total_available:,} total customers in tenant[/{COLOR_SUCCESS}]\n")
@@ -135,12 +207,27 @@ class CustomerEmailExport:
             self.console.print(f"[bold {COLOR_PRIMARY}]Limit Options:[/bold {COLOR_PRIMARY}]")
             self.console.print(f"  [{COLOR_DIM}]1. Process ALL customers ({total_available:,})[/{COLOR_DIM}]")
             self.console.print(f"  [{COLOR_DIM}]2. Limit to first N customers[/{COLOR_DIM}]")
-            self.console.print(f"  [{COLOR_DIM}]3. Cancel[/{COLOR_DIM}]\n")
+            self.console.print(f"  [{COLOR_DIM}]3. Time budget (least recently exported customers first)[/{COLOR_DIM}]")
+            self.console.print(f"  [{COLOR_DIM}]4. Cancel[/{COLOR_DIM}]\n")
             
-            choice = Prompt.ask("Your choice", choices=["1", "2", "3"], default="2")
+            choice = Prompt.ask("Your choice", choices=["1", "2", "3", "4"], default="2")
             
-            if choice == "3":
+            deadline = None
+            if choice == "4":
                 return
+            elif choice == "3":
+                while True:
+                    minutes = IntPrompt.ask(
+                        f"[{COLOR_PRIMARY}]Time budget in minutes[/{COLOR_PRIMARY}]",
+                        default=60
+                    )
+                    if minutes > 0:
+                        self.time_budget = minutes * 60
+                        break
+                    self.console.print(f"[{COLOR_ERROR}]Please enter a positive number of minutes[/{COLOR_ERROR}]")
+                # Das Budget umfasst auch das Laden der Kundenliste
+                deadline = time.monotonic() + self.time_budget
+                self.customer_limit = None
             elif choice == "2":
                 while True:
                     limit_input = IntPrompt.ask(
@@ -174,6 +261,16 @@ class CustomerEmailExport:
                         break
                     
                     offset += len(page_customers)
+            elif deadline is not None:
+                # Die Kundenliste zählt zum Zeitbudget
+                try:
+                    customers = await asyncio.wait_for(
+                        self.prov_client.get_all_customers(), max(0, deadline - time.monotonic())
+                    )
+                except asyncio.TimeoutError:
+                    self.console.print(f"[{COLOR_ERROR}]✗ Time budget exhausted while loading the customer list[/{COLOR_ERROR}]")
+                    pause(self.console)
+                    return
             else:
                 # Ohne Limit: Alle holen
                 customers = await self.prov_client.get_all_customers()
@@ -183,110 +280,11 @@ class CustomerEmailExport:
                 pause(self.console)
                 return
             
-            total_customers = len(customers)
-            self.console.print(f"[{COLOR_SUCCESS}]✓ Processing {total_customers:,} customer(s)[/{COLOR_SUCCESS}]\n")
+            enrich = False
+            if deadline is None:
+                enrich = Confirm.ask("Enrich export with customer details (current user/quota usage)?", default=False)
             
-            # E-Mails von allen Kunden sammeln mit detaillierter Progress-Anzeige
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                BarColumn(),
-                TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-                console=self.console,
-                expand=True
-            ) as progress:
-                
-                # Hauptaufgabe: Kunden durchlaufen
-                main_task = progress.add_task(
-                    f"[{COLOR_PRIMARY}]Overall Progress",
-                    total=total_customers
-                )
-                
-                # Detail-Aufgabe: Aktueller Kunde
-                detail_task = progress.add_task(
-                    f"[{COLOR_DIM}]Initializing...",
-                    total=None
-                )
-                
-                for idx, customer in enumerate(customers, 1):
-                    customer_id = customer.get('id')
-                    customer_name = customer.get('companyName', 'Unknown')
-
-                    # Kunden-Namen kürzen für bessere Anzeige
-                    display_name = customer_name[:40] + "..." if len(customer_name) > 40 else customer_name
-
-                    # Detail-Task aktualisieren
-                    progress.update(
-                        detail_task,
-                        description=f"[{COLOR_WARNING}]Processing ({idx}/{total_customers}): {display_name}"
-                    )
-
-                    # Neue Kunden-Felder extrahieren
-                    contract_type = customer.get('customerContractType', '')
-                    user_max = customer.get('userMax', 0)
-                    quota_max_bytes = customer.get('quotaMax', 0)
-                    quota_gb = round(quota_max_bytes / (1024 ** 3), 1) if quota_max_bytes else 0
-                    created_at_raw = customer.get('createdAt', '')
-                    if created_at_raw:
-                        try:
-                            from datetime import timezone
-                            dt = datetime.fromisoformat(created_at_raw.replace('Z', '+00:00'))
-                            created_at = dt.strftime('%d.%m.%Y')
-                        except Exception:
-                            created_at = created_at_raw
-                    else:
-                        created_at = ''
-
-                    try:
-                        # Alle User des Kunden laden
-                        users = await self.prov_client.get_all_customer_users(customer_id)
-
-                        user_count = 0
-                        # E-Mails extrahieren
-                        for user in users:
-                            email = user.get('email')
-                            if email:
-                                self.all_emails.append({
-                                    'customer_id': customer_id,
-                                    'customer_name': customer_name,
-                                    'contract_type': contract_type,
-                                    'user_max': user_max,
-                                    'quota_gb': quota_gb,
-                                    'created_at': created_at,
-                                    'user_id': user.get('id'),
-                                    'first_name': user.get('firstName', ''),
-                                    'last_name': user.get('lastName', ''),
-                                    'email': email,
-                                    'username': user.get('userName', ''),
-                                    'is_locked': user.get('isLocked', False),
-                                    'is_admin': user.get('isAdmin', False),
-                                    'is_config_manager': user.get('isConfigManager', False),
-                                    'is_user_manager': user.get('isUserManager', False),
-                                    'is_group_manager': user.get('isGroupManager', False),
-                                    'is_room_manager': user.get('isRoomManager', False),
-                                    'is_audit_log': user.get('isAuditLog', False),
-                                })
-                                user_count += 1
-                        
-                        # Detail-Task mit Ergebnis aktualisieren
-                        progress.update(
-                            detail_task,
-                            description=f"[{COLOR_SUCCESS}]✓ {display_name}: {user_count} emails | Total: {len(self.all_emails):,}"
-                        )
-                        
-                    except Exception as e:
-                        error_msg = str(e)[:50]
-                        progress.update(
-                            detail_task,
-                            description=f"[{COLOR_ERROR}]✗ {display_name}: {error_msg}[/{COLOR_ERROR}]"
-                        )
-                    
-                    # Haupt-Task fortschritt
-                    progress.update(main_task, advance=1)
-            
-            # Abschluss-Meldung
-            self.console.print(f"\n[{COLOR_SUCCESS}]✓ Collection complete![/{COLOR_SUCCESS}]")
-            self.console.print(f"[{COLOR_PRIMARY}]Collected {len(self.all_emails):,} email addresses from {total_customers:,} customer(s)[/{COLOR_PRIMARY}]")
+            await self._collect_customers(customers, deadline, enrich)
             
             if self.customer_limit and total_available > self.customer_limit:
                 self.console.print(f"[{COLOR_DIM}]Note: {total_available - self.customer_limit:,} customers were skipped (limit applied)[/{COLOR_DIM}]\n")
@@ -297,6 +295,173 @@ class CustomerEmailExport:
             traceback.print_exc()
             pause(self.console)
     
+    async def _collect_customers(self, customers: list, deadline: float = None, enrich: bool = False):
+        """
+        Sammelt die E-Mails der übergebenen Kunden parallel mit Progress-Anzeige
+        
+        Args:
+            customers: Kunden aus get_customers()
+            deadline: Optional - Ende des Zeitbudgets (time.monotonic()); länger nicht
+                exportierte Kunden kommen zuerst, offene Kunden landen in self.remaining
+            enrich: Kundendetails parallel laden und ergänzen
+        """
+        total_customers = len(customers)
+        self.customers = customers
+        self.console.print(f"[{COLOR_SUCCESS}]✓ Processing {total_customers:,} customer(s)[/{COLOR_SUCCESS}]")
+        skipped_empty = sum(1 for customer in customers if estimated_users(customer) == 0)
+        
+        priority = None
+        time_limit = None
+        if deadline is not None:
+            # Zeitpunkt des letzten Exports je Kunde - nie exportierte Kunden zuerst
+            store = SnapshotStore()
+            self.last_export = store.customer_exports()
+            store.close()
+            priority = lambda customer: self.last_export.get(customer.get('id'), 0)
+            time_limit = max(0, deadline - time.monotonic())
+            self.console.print(f"[{COLOR_DIM}]Time budget: {time_limit / 60:.1f} min left, least recently exported customers first, {EXPORT_CONCURRENCY} parallel requests[/{COLOR_DIM}]\n")
+        else:
+            self.console.print(f"[{COLOR_DIM}]Largest customers first, {EXPORT_CONCURRENCY} parallel requests[/{COLOR_DIM}]\n")
+        
+        # Kundendetails laufen im Hintergrund parallel zum Sammeln der User
+        details_task = None
+        details_store = None
+        if enrich:
+            details_store = SnapshotStore()
+            details_task = asyncio.create_task(load_customer_details(
+                self.prov_client, [customer.get('id') for customer in customers], store=details_store
+            ))
+
+        # E-Mails von allen Kunden sammeln mit detaillierter Progress-Anzeige
+        progress = Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+            console=self.console,
+            expand=True,
+            auto_refresh=False
+        )
+        
+        # Hauptaufgabe: Kunden durchlaufen
+        main_task = progress.add_task(
+            f"[{COLOR_PRIMARY}]Overall Progress",
+            total=total_customers
+        )
+        
+        # Detail-Aufgabe: Aktueller Kunde
+        detail_task = progress.add_task(
+            f"[{COLOR_DIM}]Initializing...",
+            total=None
+        )
+        
+        # Durchsatz, Latenz, Fehler und ETA unter dem Fortschritt
+        monitor = ThroughputMonitor(
+            self.prov_client.latency, total_customers,
+            sum(estimated_users(customer) or 0 for customer in customers)
+        )
+        
+        finished = 0
+
+        def _customer_done(customer, result):
+            nonlocal finished
+            finished += 1
+            monitor.customer_done(failed=isinstance(result, Exception))
+            customer_name = customer.get('companyName', 'Unknown')
+
+            # Kunden-Namen kürzen für bessere Anzeige
+            display_name = customer_name[:40] + "..." if len(customer_name) > 40 else customer_name
+
+            if isinstance(result, Exception):
+                error_msg = str(result)[:50]
+                progress.update(
+                    detail_task,
+                    description=f"[{COLOR_ERROR}]✗ {display_name}: {error_msg}[/{COLOR_ERROR}]"
+                )
+            else:
+                user_count = sum(1 for user in result if user.get('email'))
+                progress.update(
+                    detail_task,
+                    description=f"[{COLOR_SUCCESS}]✓ ({finished}/{total_customers}) {display_name}: {user_count} emails[/{COLOR_SUCCESS}]"
+                )
+
+            # Haupt-Task fortschritt
+            progress.update(main_task, advance=1)
+
+        try:
+            # Gezeichnet wird nur im Render-Task mit fester Bildrate, die Callbacks zählen nur
+            with Live(Group(progress, monitor), console=self.console, auto_refresh=False) as live:
+                renderer = asyncio.create_task(render_loop(live, monitor))
+                try:
+                    # Seiten aller Kunden parallel laden - größte Kunden zuerst
+                    results = await collect_customer_users(
+                        self.prov_client, customers,
+                        concurrency=EXPORT_CONCURRENCY,
+                        on_customer_done=_customer_done,
+                        on_page=lambda customer, users: monitor.page_done(users),
+                        priority=priority,
+                        time_limit=time_limit
+                    )
+                finally:
+                    renderer.cancel()
+                    monitor.sample()
+                    live.refresh()
+        except BaseException:
+            # Fehler oder Abbruch: Kundendetails nicht weiter im Hintergrund laden
+            if details_task:
+                details_task.cancel()
+                details_store.close()
+            raise
+
+        # E-Mails in der Reihenfolge der Kundenliste übernehmen
+        failed = 0
+        for index, customer in enumerate(customers):
+            if index not in results:
+                self.remaining.append((customer, "Time budget exhausted"))
+                continue
+            users = results[index]
+            if isinstance(users, Exception):
+                failed += 1
+                self.remaining.append((customer, f"Error: {str(users)[:100]}"))
+                continue
+            for user in users:
+                if user.get('email'):
+                    self.all_emails.append(customer_user_row(customer, user))
+            self.exported_customer_ids.append(customer.get('id'))
+        
+        if details_task:
+            await self._merge_details(details_task, details_store)
+        
+        # Abschluss-Meldung
+        processed = total_customers - len(self.remaining)
+        self.console.print(f"\n[{COLOR_SUCCESS}]✓ Collection complete![/{COLOR_SUCCESS}]")
+        self.console.print(f"[{COLOR_PRIMARY}]Collected {len(self.all_emails):,} email addresses from {processed:,} customer(s)[/{COLOR_PRIMARY}]")
+        if skipped_empty:
+            self.console.print(f"[{COLOR_DIM}]{skipped_empty:,} customer(s) without users were not queried[/{COLOR_DIM}]")
+        if failed:
+            self.console.print(f"[{COLOR_ERROR}]✗ {failed:,} customer(s) could not be loaded[/{COLOR_ERROR}]")
+        if len(self.remaining) > failed:
+            self.console.print(f"[{COLOR_WARNING}]⏱ Time budget reached: {len(self.remaining) - failed:,} customer(s) remaining (listed in the remaining file after export)[/{COLOR_WARNING}]")
+    
+    async def _merge_details(self, details_task: asyncio.Task, store: SnapshotStore):
+        """Wartet auf die Kundendetails und ergänzt die gesammelten Zeilen"""
+        try:
+            if not details_task.done():
+                self.console.print(f"\n[{COLOR_WARNING}]Waiting for customer details...[/{COLOR_WARNING}]")
+            details = await details_task
+        except Exception as e:
+            self.console.print(f"[{COLOR_ERROR}]✗ Customer details could not be loaded: {str(e)}[/{COLOR_ERROR}]")
+            return
+        finally:
+            store.close()
+        
+        missing = merge_customer_details(self.all_emails, details)
+        self.enriched = True
+        
+        self.console.print(f"[{COLOR_SUCCESS}]✓ Customer details merged ({len(details):,} customers)[/{COLOR_SUCCESS}]")
+        if missing:
+            self.console.print(f"[{COLOR_WARNING}]⚠ No details for {missing:,} customer(s) - columns left empty[/{COLOR_WARNING}]")
+    
     def _show_results(self):
         """Zeigt eine Zusammenfassung der gesammelten E-Mails"""
         self.console.clear()
@@ -351,6 +516,46 @@ class CustomerEmailExport:
         if len(self.all_emails) > 10:
             self.console.print(f"\n[{COLOR_DIM}]... and {len(self.all_emails) - 10:,} more[/{COLOR_DIM}]")
     
+    def _offer_dedup(self):
+        """
+        Eindeutige Adressen über alle Kunden und Duplikat-Report anbieten
+        
+        Eingabe sind die bereits vollständig im Speicher liegenden Zeilen (self.all_emails);
+        DEDUP_MEMORY_LIMIT begrenzt nur den zusätzlichen Speicher des Index.
+        """
+        if not Confirm.ask("\nExport unique addresses and a report of addresses used by several customers?", default=False):
+            return
+        
+        exports_dir = "exports"
+        if not os.path.exists(exports_dir):
+            os.makedirs(exports_dir)
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        unique_path = os.path.join(exports_dir, f"dracoon_emails_unique_{timestamp}.csv")
+        duplicates_path = os.path.join(exports_dir, f"dracoon_emails_duplicates_{timestamp}.csv")
+        
+        self.console.print(f"[{COLOR_WARNING}]Deduplicating {len(self.all_emails):,} addresses...[/{COLOR_WARNING}]")
+        index = EmailIndex()
+        try:
+            index.add_rows(self.all_emails)
+            if index.external:
+                self.console.print(f"[{COLOR_DIM}]Too many rows for the in-memory index - sorting on disk[/{COLOR_DIM}]")
+            stats = write_dedup_reports(index, unique_path, duplicates_path)
+        except Exception as e:
+            self.console.print(f"[{COLOR_ERROR}]✗ Deduplication failed: {str(e)}[/{COLOR_ERROR}]")
+            return
+        finally:
+            index.close()
+        
+        self.console.print(f"[{COLOR_SUCCESS}]✓ {stats['unique']:,} unique addresses exported to: {unique_path}[/{COLOR_SUCCESS}]")
+        self.console.print(f"[{COLOR_PRIMARY}]{stats['duplicate_addresses']:,} address(es) occur in more than one customer "
+                           f"({stats['duplicate_rows']:,} rows): {duplicates_path}[/{COLOR_PRIMARY}]")
+    
+    async def _offer_analytics(self):
+        """Kennzahlen über die gesammelten Kunden-User anbieten"""
+        if Confirm.ask("\nShow cross-tenant analytics?", default=False):
+            await CustomerAnalytics(self.customers, self.all_emails).run()
+    
     async def _export_emails(self):
         """Exportiert die E-Mails als CSV"""
         self.console.print(f"\n[bold {COLOR_PRIMARY}]Export Options:[/bold {COLOR_PRIMARY}]")
@@ -370,6 +575,18 @@ class CustomerEmailExport:
         if not filename.endswith('.csv'):
             filename += '.csv'
         
+        sort = Confirm.ask("Sort by customer name and email?", default=False)
+        
+        self._write_export(filename, sort)
+    
+    def _write_export(self, filename: str, sort: bool = False) -> bool:
+        """
+        Schreibt die gesammelten E-Mails als CSV
+        
+        Args:
+            filename: Zieldatei
+            sort: Nach Kundenname und E-Mail sortieren (External Sort, begrenzter Speicher)
+        """
         # CSV Header
         headers = [
             'Customer ID',
@@ -391,9 +608,13 @@ class CustomerEmailExport:
             'Is Room Manager',
             'Is Audit Log',
         ]
+        if self.enriched:
+            headers += [header for _, header in DETAIL_COLUMNS]
 
-        # CSV Rows
-        rows = [
+        detail_keys = [key for key, _ in DETAIL_COLUMNS] if self.enriched else []
+        
+        # CSV Rows (Generator - werden beim Schreiben erzeugt)
+        rows = (
             [
                 email['customer_id'],
                 email['customer_name'],
@@ -413,24 +634,118 @@ class CustomerEmailExport:
                 'Yes' if email.get('is_group_manager') else 'No',
                 'Yes' if email.get('is_room_manager') else 'No',
                 'Yes' if email.get('is_audit_log') else 'No',
+            ] + [
+                ('Yes' if email[key] else 'No') if isinstance(email.get(key), bool) else email.get(key, '')
+                for key in detail_keys
             ]
             for email in self.all_emails
-        ]
+        )
         
         try:
-            if export_to_csv(filename, headers, rows):
-                self.console.print(f"\n[{COLOR_SUCCESS}]✓ Exported {len(rows):,} email addresses to: {filename}[/{COLOR_SUCCESS}]")
+            if sort:
+                # Sortierte Runs auf Platte, der k-Wege-Merge läuft beim Schreiben der CSV
+                write_sorted_csv(filename, headers, rows,
+                                 key=lambda row: ((row[1] or '').casefold(), (row[9] or '').casefold()))
+                written = True
+            else:
+                written = export_to_csv(filename, headers, rows)
+            
+            if written:
+                self.console.print(f"\n[{COLOR_SUCCESS}]✓ Exported {len(self.all_emails):,} email addresses to: {filename}[/{COLOR_SUCCESS}]")
+                self._record_export(filename)
+                return True
             else:
                 self.console.print(f"\n[{COLOR_ERROR}]✗ Export failed![/{COLOR_ERROR}]")
         except Exception as e:
             self.console.print(f"\n[{COLOR_ERROR}]✗ Error: {str(e)}[/{COLOR_ERROR}]")
+        return False
+    
+    def _record_export(self, filename: str):
+        """Merkt die exportierten Kunden im Snapshot und schreibt die offenen Kunden neben den Export"""
+        if self.exported_customer_ids:
+            store = SnapshotStore()
+            store.put_customer_exports(self.exported_customer_ids)
+            store.close()
+        
+        if not self.remaining:
+            return
+        
+        remaining_file = filename[:-4] + "_remaining.csv"
+        rows = [
+            [
+                customer.get('id'),
+                customer.get('companyName', ''),
+                customer.get('userUsed', ''),
+                datetime.fromtimestamp(self.last_export[customer.get('id')]).isoformat(timespec='seconds')
+                if customer.get('id') in self.last_export else 'never',
+                reason,
+            ]
+            for customer, reason in self.remaining
+        ]
+        if export_to_csv(remaining_file, ['Customer ID', 'Customer Name', 'User Used', 'Last Exported', 'Reason'], rows):
+            self.console.print(f"[{COLOR_WARNING}]⚠ {len(rows):,} customer(s) not included - listed in: {remaining_file}[/{COLOR_WARNING}]")
+        else:
+            self.console.print(f"[{COLOR_ERROR}]✗ Could not write the list of remaining customers[/{COLOR_ERROR}]")
+
+
+async def run_budgeted(time_budget: float, sort: bool = False) -> bool:
+    """
+    Zeitbudgetierter Export ohne Rückfragen (--time-budget)
+    
+    Verarbeitet so viele Kunden wie in das Budget passen - länger nicht exportierte zuerst -
+    und schreibt den Teil-Export nach exports/ samt Liste der offenen Kunden.
+    
+    Args:
+        time_budget: Zeitbudget in Sekunden
+        sort: Export nach Kundenname und E-Mail sortieren
+    
+    Returns:
+        True, wenn der Export geschrieben wurde
+    """
+    manager = CustomerEmailExport(time_budget=time_budget)
+    console = manager.console
+    deadline = time.monotonic() + time_budget
+    
+    show_header(console, "Dracoon Pyclient - Customer Email Export (time budget)")
+    
+    load_dotenv()
+    base_url = os.getenv('DRACOON_BASE_URL')
+    service_token = os.getenv('DRACOON_SERVICE_TOKEN')
+    if not base_url or not service_token:
+        console.print(f"[{COLOR_ERROR}]✗ DRACOON_BASE_URL and DRACOON_SERVICE_TOKEN must be set in .env[/{COLOR_ERROR}]")
+        return False
+    
+    manager.prov_client = ProvisioningClient(base_url, service_token)
+    
+    try:
+        console.print(f"[{COLOR_WARNING}]Loading customers...[/{COLOR_WARNING}]")
+        # Die Kundenliste zählt zum Zeitbudget
+        customers = await asyncio.wait_for(manager.prov_client.get_all_customers(), max(0, deadline - time.monotonic()))
+        if not customers:
+            console.print(f"[{COLOR_WARNING}]No customers found![/{COLOR_WARNING}]")
+            return False
+        
+        await manager._collect_customers(customers, deadline)
+    except asyncio.TimeoutError:
+        console.print(f"\n[{COLOR_ERROR}]✗ Time budget exhausted while loading the customer list - nothing exported[/{COLOR_ERROR}]")
+        return False
+    except Exception as e:
+        console.print(f"\n[{COLOR_ERROR}]Error during collection: {str(e)}[/{COLOR_ERROR}]")
+        return False
+    
+    exports_dir = "exports"
+    if not os.path.exists(exports_dir):
+        os.makedirs(exports_dir)
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return manager._write_export(os.path.join(exports_dir, f"dracoon_emails_{timestamp}.csv"), sort)
 
 
-async def main(dracoon=None):
+async def main(dracoon=None, prefetch: DataPrefetcher = None):
     """Entry point für das Modul"""
     # Dieses Modul benötigt keinen normalen DRACOON-Client
     # Es nutzt direkt die Provisioning API
-    manager = CustomerEmailExport()
+    manager = CustomerEmailExport(prefetch)
     await manager.run()
 
 
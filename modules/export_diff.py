@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Dracoon Pyclient - Export Diff
+Vergleicht zwei E-Mail-Exporte bzw. Snapshots: neue, entfernte und geänderte User je Kunde
+"""
+
+import glob
+import os
+import time
+from datetime import datetime
+from rich.console import Console
+from rich.table import Table
+from rich.prompt import Prompt
+
+from lib import (
+    show_header, pause,
+    COLOR_PRIMARY, COLOR_SUCCESS, COLOR_ERROR, COLOR_WARNING, COLOR_DIM, TABLE_BOX
+)
+from lib.prefetch import DataPrefetcher
+from lib.export_diff import write_diff_report, CHANGE_ADDED, CHANGE_REMOVED, CHANGE_CHANGED
+
+
+EXPORTS_DIR = "exports"
+# Nebenprodukte des E-Mail-Exports sind keine vollständigen Exporte
+SKIP_SUFFIXES = ('_remaining.csv',)
+SKIP_PREFIXES = ('dracoon_emails_unique_', 'dracoon_emails_duplicates_')
+
+
+def list_sources(directory: str = EXPORTS_DIR) -> list:
+    """E-Mail-Exporte und Snapshots in exports/, älteste zuerst"""
+    paths = glob.glob(os.path.join(directory, "dracoon_emails_*.csv")) + glob.glob(os.path.join(directory, "*.sqlite"))
+    paths = [
+        path for path in paths
+        if not path.endswith(SKIP_SUFFIXES) and not os.path.basename(path).startswith(SKIP_PREFIXES)
+    ]
+    return sorted(paths, key=os.path.getmtime)
+
+
+class ExportDiff:
+    def __init__(self):
+        self.console = Console()
+
+    async def run(self):
+        """Hauptfunktion des Moduls"""
+        try:
+            self.console.clear()
+            show_header(self.console, "Dracoon Pyclient - Export Diff")
+
+            sources = list_sources()
+            self._show_sources(sources)
+
+            old_path = self._ask_source("Old export/snapshot (number or path)", sources, len(sources) - 1)
+            if not old_path:
+                pause(self.console)
+                return
+            new_path = self._ask_source("New export/snapshot (number or path)", sources, len(sources))
+            if not new_path:
+                pause(self.console)
+                return
+
+            exports_dir = EXPORTS_DIR
+            if not os.path.exists(exports_dir):
+                os.makedirs(exports_dir)
+            timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+            report_path = os.path.join(exports_dir, f"diff_{timestamp}.csv")
+
+            self.console.print(f"\n[{COLOR_WARNING}]Comparing...[/{COLOR_WARNING}]")
+            start = time.perf_counter()
+            stats = write_diff_report(old_path, new_path, report_path)
+            elapsed = time.perf_counter() - start
+
+            self._show_stats(stats)
+            self.console.print(f"[{COLOR_DIM}]Compared in {elapsed:.1f} s[/{COLOR_DIM}]")
+            self.console.print(f"\n[{COLOR_SUCCESS}]✓ Diff exported to:[/{COLOR_SUCCESS}] [{COLOR_PRIMARY}]{report_path}[/{COLOR_PRIMARY}]")
+
+            self.console.print(f"\n[{COLOR_PRIMARY}]Back to main menu...[/{COLOR_PRIMARY}]\n")
+            pause(self.console)
+
+        except KeyboardInterrupt:
+            self.console.print(f"\n\n[{COLOR_WARNING}]Cancelled by user[/{COLOR_WARNING}]\n")
+        except Exception as e:
+            self.console.print(f"\n[{COLOR_ERROR}]Error: {str(e)}[/{COLOR_ERROR}]\n")
+            pause(self.console)
+
+    def _show_sources(self, sources: list):
+        """Nummerierte Liste der gefundenen Exporte und Snapshots"""
+        if not sources:
+            self.console.print(f"[{COLOR_DIM}]No email exports or snapshots found in {EXPORTS_DIR}/ - enter paths instead.[/{COLOR_DIM}]\n")
+            return
+
+        table = Table(show_header=True, header_style=f"bold {COLOR_PRIMARY}", box=TABLE_BOX)
+        table.add_column("#", justify="right", width=4)
+        table.add_column("File", width=50)
+        table.add_column("Size", justify="right", width=12)
+        table.add_column("Modified", width=20)
+
+        for number, path in enumerate(sources, 1):
+            table.add_row(
+                str(number), os.path.basename(path), f"{os.path.getsize(path) / 1024 ** 2:,.1f} MiB",
+                datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d %H:%M:%S')
+            )
+
+        self.console.print(table)
+        self.console.print()
+
+    def _ask_source(self, prompt: str, sources: list, default: int) -> str:
+        """Nummer aus der Liste oder Pfad - None bei ungültiger Eingabe"""
+        answer = Prompt.ask(prompt, default=str(default) if default > 0 else None)
+        if not answer:
+            return None
+
+        if answer.isdigit() and 1 <= int(answer) <= len(sources):
+            return sources[int(answer) - 1]
+        if os.path.isfile(answer):
+            return answer
+
+        self.console.print(f"[{COLOR_ERROR}]✗ Not found: {answer}[/{COLOR_ERROR}]")
+        return None
+
+    def _show_stats(self, stats: dict):
+        """Anzahl neuer, entfernter und geänderter User sowie Änderungen je Feld"""
+        table = Table(title=f"[bold {COLOR_PRIMARY}]Changes[/bold {COLOR_PRIMARY}]", show_header=False, box=TABLE_BOX)
+        table.add_column("Change", width=28)
+        table.add_column("Users", justify="right", width=12)
+
+        table.add_row(f"[{COLOR_SUCCESS}]Added users[/{COLOR_SUCCESS}]", f"{stats[CHANGE_ADDED]:,}")
+        table.add_row(f"[{COLOR_ERROR}]Removed users[/{COLOR_ERROR}]", f"{stats[CHANGE_REMOVED]:,}")
+        table.add_row(f"[{COLOR_WARNING}]Changed users[/{COLOR_WARNING}]", f"{stats[CHANGE_CHANGED]:,}")
+        for field, count in stats['fields'].most_common():
+            table.add_row(f"  {field}", f"{count:,}")
+
+        self.console.print(table)
+
+
+async def main(dracoon=None, prefetch: DataPrefetcher = None):
+    """Entry Point für das Modul"""
+    # Arbeitet nur auf lokalen Dateien
+    diff = ExportDiff()
+    await diff.run()
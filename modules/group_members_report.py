@@ -5,24 +5,40 @@ Zeigt alle Members einer Group an und exportiert optional als CSV
 """
 
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import (
+    Progress, SpinnerColumn, TextColumn, BarColumn, MofNCompleteColumn,
+    TimeElapsedColumn, TimeRemainingColumn
+)
 from rich.table import Table
 from rich.prompt import Prompt, Confirm
 from datetime import datetime
+from types import SimpleNamespace
+from typing import Optional
+import asyncio
 import os
 
 from dracoon import DRACOON
 
 from lib import (
-    show_header, pause,
+    show_header, pause, apause, parse_selection,
     COLOR_PRIMARY, COLOR_SUCCESS, COLOR_ERROR, COLOR_WARNING, COLOR_DIM, TABLE_BOX
 )
+from lib.directory import get_all_groups, MEMBER_FILTER, PAGE_SIZE
+from lib.membership import (
+    MembershipMatrix, load_membership_matrix, SET_UNION, SET_INTERSECTION, SET_DIFFERENCE
+)
+from lib.snapshot import SnapshotStore, open_snapshot, TABLE_USERS, TABLE_GROUPS, TABLE_MEMBERSHIPS
+
+
+# Gleichzeitige Requests beim Laden aller Groups
+MATRIX_CONCURRENCY = 8
 
 
 class GroupMembersReport:
     def __init__(self, dracoon: DRACOON):
         self.dracoon = dracoon
         self.console = Console()
+        self.prefetch = getattr(dracoon, "prefetch", None)
         self.all_groups = []
     
     async def run(self):
@@ -35,11 +51,22 @@ class GroupMembersReport:
             self.console.print(f"[{COLOR_DIM}]Optional with CSV export.[/{COLOR_DIM}]\n")
             
             self.console.print(f"[{COLOR_WARNING}]Loading groups...[/{COLOR_WARNING}]")
-            groups_response = await self.dracoon.groups.get_groups()
+            groups_response = await self.prefetch.take('groups') if self.prefetch else None
+            if groups_response is None:
+                groups_response = await self.dracoon.groups.get_groups()
             self.all_groups = groups_response.items
             self.console.print(f"[{COLOR_SUCCESS}]✓ {len(self.all_groups)} groups loaded[/{COLOR_SUCCESS}]\n")
             
-            pause(self.console)
+            await apause(self.console)
+            
+            mode = self._select_mode()
+            if mode in ("2", "3"):
+                if mode == "2":
+                    await self._membership_matrix_report()
+                else:
+                    await self._set_operation_report()
+                self.console.print(f"\n[{COLOR_PRIMARY}]Back to main menu...[/{COLOR_PRIMARY}]\n")
+                return
             
             while True:
                 self.console.clear()
@@ -62,17 +89,19 @@ class GroupMembersReport:
                 self.console.print(f"  Group-ID: [{COLOR_PRIMARY}]{group_id}[/{COLOR_PRIMARY}]\n")
                 
                 self.console.print(f"[{COLOR_WARNING}]Loading group members...[/{COLOR_WARNING}]")
-                self.console.print(f"[{COLOR_DIM}]This may take some time for large groups...[/{COLOR_DIM}]\n")
                 
-                members = await self._get_all_group_members(group_id)
+                # Nur die erste Seite laden: Vorschau + Gesamtzahl; der Export streamt den Rest
+                first_page = await self._get_member_page(group_id)
+                total = first_page.range.total
                 
-                if not members:
+                if not total:
                     self.console.print(f"\n[{COLOR_WARNING}]Group '{group_name}' has no members.[/{COLOR_WARNING}]\n")
                 else:
-                    self._display_results(group_name, members)
+                    self.console.print(f"[{COLOR_SUCCESS}]✓ {total} Members gefunden[/{COLOR_SUCCESS}]\n")
+                    self._display_results(group_name, first_page.items, total)
                     
                     if Confirm.ask("\nExport as CSV?"):
-                        self._export_csv(group_name, members)
+                        await self._export_csv(group_id, group_name, first_page)
                 
                 if not Confirm.ask("\nCheck another group?"):
                     break
@@ -85,6 +114,326 @@ class GroupMembersReport:
             self.console.print(f"\n[{COLOR_ERROR}]Error: {str(e)}[/{COLOR_ERROR}]\n")
             pause(self.console)
     
+    def _select_mode(self) -> str:
+        """Moduswahl (einzelne Group, alle Groups oder Mengenoperationen)"""
+        self.console.clear()
+        show_header(self.console, "Dracoon Pyclient - List Group Members")
+        
+        self.console.print(f"[bold {COLOR_PRIMARY}]Mode:[/bold {COLOR_PRIMARY}]")
+        self.console.print(f"  [{COLOR_PRIMARY}]1[/{COLOR_PRIMARY}] - Single group (search and select)")
+        self.console.print(f"  [{COLOR_PRIMARY}]2[/{COLOR_PRIMARY}] - All groups (membership matrix export)")
+        self.console.print(f"  [{COLOR_PRIMARY}]3[/{COLOR_PRIMARY}] - Several groups: union / intersection / difference\n")
+        
+        return Prompt.ask("Selection", choices=["1", "2", "3"], default="1")
+    
+    def _open_snapshot(self) -> SnapshotStore:
+        """Lokalen Snapshot verwenden, wenn Groups und Mitgliedschaften enthalten sind und gewünscht"""
+        store = open_snapshot()
+        if not store:
+            return None
+        
+        if not store.has(TABLE_USERS, TABLE_GROUPS, TABLE_MEMBERSHIPS):
+            store.close()
+            return None
+        
+        self.console.print(f"[{COLOR_DIM}]Local snapshot available (memberships fetched {store.fetched_at(TABLE_MEMBERSHIPS)})[/{COLOR_DIM}]")
+        if Confirm.ask("Use local snapshot instead of the API?", default=False):
+            return store
+        
+        store.close()
+        return None
+    
+    async def _membership_matrix_report(self):
+        """Lädt die Members aller Groups parallel und exportiert die Mitgliedschafts-Matrix"""
+        self.console.clear()
+        show_header(self.console, "Dracoon Pyclient - Group Membership Matrix")
+        
+        store = self._open_snapshot()
+        if store:
+            matrix = store.membership_matrix()
+            store.close()
+            self._show_matrix(matrix)
+            return
+        
+        self.console.print(f"[{COLOR_WARNING}]Loading all groups...[/{COLOR_WARNING}]")
+        groups = await get_all_groups(self.dracoon)
+        self.console.print(f"[{COLOR_SUCCESS}]✓ {len(groups):,} groups loaded[/{COLOR_SUCCESS}]\n")
+        
+        if not groups:
+            pause(self.console)
+            return
+        
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+            TimeRemainingColumn(),
+            console=self.console
+        ) as progress:
+            task = progress.add_task(f"[{COLOR_PRIMARY}]Loading members of all groups...[/{COLOR_PRIMARY}]", total=len(groups))
+            
+            matrix = await load_membership_matrix(
+                self.dracoon,
+                groups,
+                concurrency=MATRIX_CONCURRENCY,
+                on_group_done=lambda group, result: progress.update(task, advance=1)
+            )
+        
+        self._show_matrix(matrix)
+    
+    def _show_matrix(self, matrix: MembershipMatrix):
+        """Zusammenfassung der Matrix und CSV-Export"""
+        # Nicht geladene Groups sind nicht leer, sondern unbekannt
+        empty_groups = sum(
+            1 for group_id, users in matrix.group_users.items()
+            if not users and group_id not in matrix.failed_groups
+        )
+        
+        self.console.print(f"\n[bold {COLOR_PRIMARY}]Membership Matrix:[/bold {COLOR_PRIMARY}]")
+        self.console.print(f"  Groups: [{COLOR_PRIMARY}]{len(matrix.groups):,}[/{COLOR_PRIMARY}] ({empty_groups:,} without members)")
+        self.console.print(f"  Users in at least one group: [{COLOR_PRIMARY}]{len(matrix.users):,}[/{COLOR_PRIMARY}]")
+        self.console.print(f"  Memberships: [{COLOR_PRIMARY}]{matrix.membership_count:,}[/{COLOR_PRIMARY}]")
+        if matrix.failed_groups:
+            self.console.print(f"  Groups that could not be loaded: [{COLOR_ERROR}]{len(matrix.failed_groups):,}[/{COLOR_ERROR}]")
+            for group_id in list(matrix.failed_groups)[:10]:
+                self.console.print(f"    [{COLOR_DIM}]{matrix.groups.get(group_id, group_id)} ({group_id})[/{COLOR_DIM}]")
+            if len(matrix.failed_groups) > 10:
+                self.console.print(f"    [{COLOR_DIM}]... and {len(matrix.failed_groups) - 10:,} more[/{COLOR_DIM}]")
+            self.console.print(f"  [{COLOR_WARNING}]⚠ Their members are missing - per-user group counts may be too low[/{COLOR_WARNING}]")
+        
+        if Confirm.ask("\nExport as CSV (long format + per-user summary)?", default=True):
+            self._export_matrix(matrix)
+        
+        pause(self.console)
+    
+    def _export_matrix(self, matrix: MembershipMatrix):
+        """Exportiert die Matrix als Long-Format-CSV und als User-Zusammenfassung"""
+        exports_dir = "exports"
+        if not os.path.exists(exports_dir):
+            os.makedirs(exports_dir)
+        
+        timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        exports = [
+            (
+                os.path.join(exports_dir, f"Group_memberships_{timestamp}.csv"),
+                "Group Memberships (long format)",
+                ["Group-ID", "Group", "User-ID", "Username", "First Name", "Last Name", "Email"],
+                matrix.long_rows()
+            ),
+            (
+                os.path.join(exports_dir, f"Group_memberships_per_user_{timestamp}.csv"),
+                "Group Memberships per User",
+                ["User-ID", "Username", "First Name", "Last Name", "Email", "Group Count", "Groups"],
+                matrix.user_summary_rows()
+            ),
+        ]
+        
+        try:
+            import csv
+            
+            for filepath, title, headers, rows in exports:
+                header_rows = [
+                    [title],
+                    ["Groups", str(len(matrix.groups))],
+                    ["Memberships", str(matrix.membership_count)],
+                ]
+                if matrix.failed_groups:
+                    # Fehlende Members dürfen nicht wie leere Groups aussehen
+                    header_rows.append(["Failed groups", str(len(matrix.failed_groups)), "; ".join(
+                        f"{matrix.groups.get(group_id, group_id)} ({group_id})" for group_id in matrix.failed_groups
+                    )])
+                    header_rows.append(["Note", "Members of failed groups are missing - Group Count may be too low"])
+                header_rows += [
+                    ["Datum", datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+                    ["API-URL", self.dracoon.client.base_url],
+                    [],
+                    headers
+                ]
+                
+                with open(filepath, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    writer.writerows(header_rows)
+                    writer.writerows(rows)
+                
+                self.console.print(f"\n[{COLOR_SUCCESS}]✓ CSV exported to:[/{COLOR_SUCCESS}] [{COLOR_PRIMARY}]{filepath}[/{COLOR_PRIMARY}]")
+        except Exception as e:
+            self.console.print(f"\n[{COLOR_ERROR}]✗ Error during CSV export: {str(e)}[/{COLOR_ERROR}]")
+    
+    async def _select_groups(self, groups: list) -> list:
+        """Mehrfachauswahl von Groups mit Suche"""
+        self.console.print(f"[bold {COLOR_PRIMARY}]Select groups[/bold {COLOR_PRIMARY}]\n")
+        
+        search = Prompt.ask(f"[{COLOR_PRIMARY}]Search for group (Enter for all)[/{COLOR_PRIMARY}]", default="")
+        
+        filtered_groups = [g for g in groups if search.lower() in g.name.lower()]
+        
+        if not filtered_groups:
+            self.console.print(f"[{COLOR_ERROR}]No groups found![/{COLOR_ERROR}]\n")
+            return []
+        
+        display_groups = filtered_groups[:50]
+        
+        table = Table(show_header=True, header_style=f"bold {COLOR_PRIMARY}", box=TABLE_BOX)
+        table.add_column("#", style=COLOR_DIM, width=6)
+        table.add_column("Group-ID", width=12)
+        table.add_column("Name", width=50)
+        table.add_column("Members", justify="right", width=12)
+        
+        for idx, group in enumerate(display_groups, 1):
+            table.add_row(str(idx), str(group.id), group.name, str(group.cntUsers if group.cntUsers else 0))
+        
+        self.console.print(table)
+        
+        if len(filtered_groups) > 50:
+            self.console.print(f"\n[{COLOR_WARNING}]Note: {len(filtered_groups) - 50} additional groups not shown - refine search.[/{COLOR_WARNING}]")
+        
+        self.console.print()
+        self.console.print(f"[{COLOR_DIM}]Order matters for 'difference' (first group minus the others).[/{COLOR_DIM}]")
+        choice = Prompt.ask(f"[{COLOR_PRIMARY}]Select groups (e.g. '1,3,5-8')[/{COLOR_PRIMARY}]")
+        
+        try:
+            # Reihenfolge der Eingabe beibehalten (relevant für 'difference')
+            indices = []
+            for part in choice.split(','):
+                for idx in sorted(parse_selection(part)):
+                    if idx not in indices:
+                        indices.append(idx)
+        except ValueError:
+            self.console.print(f"[{COLOR_ERROR}]Invalid input![/{COLOR_ERROR}]\n")
+            return []
+        
+        return [display_groups[idx - 1] for idx in indices if 1 <= idx <= len(display_groups)]
+    
+    async def _set_operation_report(self):
+        """Union / Intersection / Difference der Members mehrerer Groups"""
+        self.console.clear()
+        show_header(self.console, "Dracoon Pyclient - Group Set Operations")
+        
+        store = self._open_snapshot()
+        
+        self.console.print(f"[{COLOR_WARNING}]Loading all groups...[/{COLOR_WARNING}]")
+        if store:
+            all_groups = [SimpleNamespace(**group) for group in store.groups()]
+        else:
+            all_groups = await get_all_groups(self.dracoon)
+        self.console.print(f"[{COLOR_SUCCESS}]✓ {len(all_groups):,} groups loaded[/{COLOR_SUCCESS}]\n")
+        
+        selected_groups = await self._select_groups(all_groups)
+        if len(selected_groups) < 2:
+            if store:
+                store.close()
+            self.console.print(f"[{COLOR_ERROR}]Please select at least two groups![/{COLOR_ERROR}]\n")
+            pause(self.console)
+            return
+        
+        self.console.print(f"\n[bold {COLOR_PRIMARY}]Operation:[/bold {COLOR_PRIMARY}]")
+        self.console.print(f"  [{COLOR_PRIMARY}]1[/{COLOR_PRIMARY}] - Union (member of ANY selected group)")
+        self.console.print(f"  [{COLOR_PRIMARY}]2[/{COLOR_PRIMARY}] - Intersection (member of ALL selected groups)")
+        self.console.print(f"  [{COLOR_PRIMARY}]3[/{COLOR_PRIMARY}] - Difference (member of '{selected_groups[0].name}' but of none of the others)\n")
+        
+        operation = {"1": SET_UNION, "2": SET_INTERSECTION, "3": SET_DIFFERENCE}[
+            Prompt.ask("Selection", choices=["1", "2", "3"], default="1")
+        ]
+        
+        if store:
+            matrix = store.membership_matrix([group.id for group in selected_groups])
+            store.close()
+        else:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                MofNCompleteColumn(),
+                console=self.console
+            ) as progress:
+                task = progress.add_task(f"[{COLOR_PRIMARY}]Loading members...[/{COLOR_PRIMARY}]", total=len(selected_groups))
+                
+                matrix = await load_membership_matrix(
+                    self.dracoon,
+                    selected_groups,
+                    concurrency=MATRIX_CONCURRENCY,
+                    on_group_done=lambda group, result: progress.update(task, advance=1)
+                )
+        
+        if matrix.failed_groups:
+            failed_names = ", ".join(matrix.groups[gid] for gid in matrix.failed_groups)
+            self.console.print(f"[{COLOR_ERROR}]✗ Members could not be loaded for: {failed_names}[/{COLOR_ERROR}]\n")
+            pause(self.console)
+            return
+        
+        group_ids = [group.id for group in selected_groups]
+        result_ids = matrix.combine(group_ids, operation)
+        
+        self.console.print(f"\n[bold {COLOR_PRIMARY}]Result ({operation}):[/bold {COLOR_PRIMARY}]")
+        for group in selected_groups:
+            self.console.print(f"  {group.name}: [{COLOR_DIM}]{len(matrix.group_users[group.id]):,} members[/{COLOR_DIM}]")
+        self.console.print(f"  → [{COLOR_SUCCESS}]{len(result_ids):,} users[/{COLOR_SUCCESS}]\n")
+        
+        result_users = sorted((matrix.users[uid] for uid in result_ids), key=lambda u: u['userName'].lower())
+        
+        if result_users:
+            table = Table(show_header=True, header_style=f"bold {COLOR_PRIMARY}", box=TABLE_BOX)
+            table.add_column("User-ID", style=COLOR_DIM, width=10)
+            table.add_column("Username", width=30)
+            table.add_column("Name", width=30)
+            table.add_column("Email", width=35)
+            
+            for user in result_users[:50]:
+                name = f"{user['firstName']} {user['lastName']}".strip()
+                table.add_row(str(user['id']), user['userName'], name if name else '-', user['email'])
+            
+            self.console.print(table)
+            
+            if len(result_users) > 50:
+                self.console.print(f"\n[{COLOR_WARNING}]⚠  Note: Only the first 50 of {len(result_users)} users are shown.[/{COLOR_WARNING}]")
+            
+            if Confirm.ask("\nExport as CSV?"):
+                self._export_set_operation(matrix, selected_groups, operation, result_users)
+        
+        pause(self.console)
+    
+    def _export_set_operation(self, matrix: MembershipMatrix, groups: list, operation: str, result_users: list):
+        """Exportiert das Ergebnis einer Mengenoperation als CSV"""
+        exports_dir = "exports"
+        if not os.path.exists(exports_dir):
+            os.makedirs(exports_dir)
+        
+        timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        filepath = os.path.join(exports_dir, f"Groups_{operation}_{timestamp}.csv")
+        
+        selected_ids = {group.id for group in groups}
+        header_rows = [
+            [f"Group Set Operation ({operation})"],
+            ["Groups"] + [group.name for group in groups],
+            ["Result", str(len(result_users))],
+            ["Datum", datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+            ["API-URL", self.dracoon.client.base_url],
+            [],
+            ["User-ID", "Username", "First Name", "Last Name", "Email", "Member Of"]
+        ]
+        
+        rows = [
+            [
+                user['id'], user['userName'], user['firstName'], user['lastName'], user['email'],
+                "; ".join(sorted(matrix.groups[gid] for gid in matrix.user_groups[user['id']] & selected_ids))
+            ]
+            for user in result_users
+        ]
+        
+        try:
+            import csv
+            
+            with open(filepath, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerows(header_rows)
+                writer.writerows(rows)
+            
+            self.console.print(f"\n[{COLOR_SUCCESS}]✓ CSV exported to:[/{COLOR_SUCCESS}] [{COLOR_PRIMARY}]{filepath}[/{COLOR_PRIMARY}]")
+        except Exception as e:
+            self.console.print(f"\n[{COLOR_ERROR}]✗ Error during CSV export: {str(e)}[/{COLOR_ERROR}]")
+    
     async def _select_group(self):
         """Groupnauswahl mit Suche"""
         self.console.print(f"[bold {COLOR_PRIMARY}]Group auswählen[/bold {COLOR_PRIMARY}]\n")
@@ -133,53 +482,36 @@ class GroupMembersReport:
             pause(self.console)
             return None
     
-    async def _get_all_group_members(self, group_id: int) -> list:
-        """Holt alle Members einer Group (mit Pagination)"""
-        all_members = []
-        
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=self.console
-        ) as progress:
-            
-            task = progress.add_task(f"[{COLOR_PRIMARY}]Lade Members...[/{COLOR_PRIMARY}]", total=None)
-            
-            group_filter = "isMember:eq:true"
-            
-            members_response = await self.dracoon.groups.get_group_users(
-                group_id=group_id,
-                filter=group_filter
-            )
-            
-            all_members.extend(members_response.items)
-            total = members_response.range.total
-            
-            if total > 500:
-                progress.update(task, total=total, completed=len(all_members))
-                
-                for offset in range(500, total, 500):
-                    members_response = await self.dracoon.groups.get_group_users(
-                        group_id=group_id,
-                        filter=group_filter,
-                        offset=offset
-                    )
-                    all_members.extend(members_response.items)
-                    progress.update(task, completed=len(all_members))
-            else:
-                progress.update(task, completed=True)
-        
-        self.console.print(f"[{COLOR_SUCCESS}]✓ {len(all_members)} Members geladen[/{COLOR_SUCCESS}]\n")
+    async def _get_member_page(self, group_id: int, offset: int = 0):
+        """Holt eine Seite Members einer Group"""
+        return await self.dracoon.groups.get_group_users(
+            group_id=group_id,
+            filter=MEMBER_FILTER,
+            offset=offset,
+            limit=PAGE_SIZE
+        )
+    
+    def _member_row(self, member) -> Optional[list]:
+        """CSV-Zeile für ein Mitglied (None ohne userInfo)"""
+        if not (hasattr(member, 'userInfo') and member.userInfo):
+            return None
         
-        return all_members
+        user_info = member.userInfo
+        return [
+            str(user_info.id),
+            getattr(user_info, 'userName', ''),
+            getattr(user_info, 'firstName', ''),
+            getattr(user_info, 'lastName', ''),
+            getattr(user_info, 'email', '')
+        ]
     
-    def _display_results(self, group_name: str, members: list):
-        """Zeigt die Members in einer Tabelle an"""
+    def _display_results(self, group_name: str, members: list, total: int):
+        """Zeigt die Members in einer Tabelle an (Vorschau aus der ersten Seite)"""
         self.console.print("\n" + "=" * 100)
         self.console.print(f"[bold {COLOR_PRIMARY}]Groupnmitglieder Report[/bold {COLOR_PRIMARY}]")
         self.console.print("=" * 100)
         self.console.print(f"Group:     {group_name}")
-        self.console.print(f"Members: {len(members)}")
+        self.console.print(f"Members: {total}")
         self.console.print(f"Date:      {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         self.console.print(f"API-URL:    {self.dracoon.client.base_url}")
         self.console.print("=" * 100 + "\n")
@@ -206,14 +538,19 @@ class GroupMembersReport:
         
         self.console.print(table)
         
-        if len(members) > display_count:
-            self.console.print(f"\n[{COLOR_WARNING}]⚠  Note: Only the first {display_count} of {len(members)} Membersn werden angezeigt.[/{COLOR_WARNING}]")
+        if total > display_count:
+            self.console.print(f"\n[{COLOR_WARNING}]⚠  Note: Only the first {display_count} of {total} Membersn werden angezeigt.[/{COLOR_WARNING}]")
             self.console.print(f"[{COLOR_WARNING}]For the complete list please export CSV.[/{COLOR_WARNING}]")
         
         self.console.print()
     
-    def _export_csv(self, group_name: str, members: list):
-        """Exportiert die Members als CSV"""
+    async def _export_csv(self, group_id: int, group_name: str, first_page):
+        """
+        Exportiert die Members als CSV (Streaming)
+        
+        Header-Block und erste Seite werden sofort geschrieben, weitere Seiten direkt beim
+        Eintreffen - die nächste Seite wird bereits geladen, während die aktuelle geschrieben wird.
+        """
         exports_dir = "exports"
         if not os.path.exists(exports_dir):
             os.makedirs(exports_dir)
@@ -224,40 +561,63 @@ class GroupMembersReport:
         filename = f"Group_{safe_groupname}_{timestamp}.csv"
         filepath = os.path.join(exports_dir, filename)
         
+        total = first_page.range.total
+        
         header_rows = [
             ["Groupnmitglieder Report"],
             ["Group", group_name],
-            ["Anzahl Members", str(len(members))],
+            ["Anzahl Members", str(total)],
             ["Datum", datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
             ["API-URL", self.dracoon.client.base_url],
             [],
             ["User-ID", "Username", "First Name", "Last Name", "Email"]
         ]
         
-        member_rows = []
-        for member in members:
-            if hasattr(member, 'userInfo') and member.userInfo:
-                user_info = member.userInfo
-                member_rows.append([
-                    str(user_info.id),
-                    getattr(user_info, 'userName', ''),
-                    getattr(user_info, 'firstName', ''),
-                    getattr(user_info, 'lastName', ''),
-                    getattr(user_info, 'email', '')
-                ])
+        exported = 0
         
         try:
             import csv
             
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            with open(filepath, 'w', newline='', encoding='utf-8') as f, Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                MofNCompleteColumn(),
+                console=self.console
+            ) as progress:
                 writer = csv.writer(f)
                 writer.writerows(header_rows)
-                writer.writerows(member_rows)
+                
+                task = progress.add_task(f"[{COLOR_PRIMARY}]Exportiere Members...[/{COLOR_PRIMARY}]", total=total)
+                
+                offsets = iter(range(PAGE_SIZE, total, PAGE_SIZE))
+                page = first_page
+                
+                while page is not None:
+                    next_offset = next(offsets, None)
+                    next_page = None
+                    if next_offset is not None:
+                        next_page = asyncio.create_task(self._get_member_page(group_id, next_offset))
+                    
+                    try:
+                        rows = [row for row in map(self._member_row, page.items) if row]
+                        writer.writerows(rows)
+                        f.flush()
+                        exported += len(rows)
+                        progress.update(task, advance=len(page.items))
+                    except BaseException:
+                        if next_page:
+                            next_page.cancel()
+                        raise
+                    
+                    page = await next_page if next_page else None
             
             self.console.print(f"\n[{COLOR_SUCCESS}]✓ CSV exported to:[/{COLOR_SUCCESS}] [{COLOR_PRIMARY}]{filepath}[/{COLOR_PRIMARY}]")
-            self.console.print(f"[{COLOR_SUCCESS}]✓ {len(member_rows)} Members exportiert[/{COLOR_SUCCESS}]")
+            self.console.print(f"[{COLOR_SUCCESS}]✓ {exported} Members exportiert[/{COLOR_SUCCESS}]")
         except Exception as e:
             self.console.print(f"\n[{COLOR_ERROR}]✗ Error during CSV export: {str(e)}[/{COLOR_ERROR}]")
+            if exported:
+                self.console.print(f"[{COLOR_WARNING}]Partial file with {exported} Members: {filepath}[/{COLOR_WARNING}]")
 
 
 def main(dracoon: DRACOON):
@@ -5,18 +5,32 @@ Zeigt an, in welchen Räumen ein User Room-Admin ist und bietet Löschfunktion
 """
 
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import (
+    Progress, SpinnerColumn, TextColumn, BarColumn, MofNCompleteColumn,
+    TimeElapsedColumn, TimeRemainingColumn
+)
 from rich.table import Table
-from rich.prompt import Confirm
+from rich.prompt import Prompt, Confirm
 from datetime import datetime
+import glob
 import os
 
 from dracoon import DRACOON
 
 from lib import (
-    show_header, search_and_select_user, pause,
+    show_header, search_and_select_user, pause, apause, read_table_file, export_to_csv,
     COLOR_PRIMARY, COLOR_SUCCESS, COLOR_ERROR, COLOR_WARNING, COLOR_DIM, TABLE_BOX
 )
+from lib.directory import get_all_users, gather_limited
+from lib.room_index import RoomPermissionIndex, crawl_room_permissions, ROLE_ADMIN
+from lib.room_deletion import (
+    build_deletion_plan, execute_deletion_plan, write_deletion_log, STATUS_DELETED, STATUS_FAILED
+)
+from lib.snapshot import SnapshotStore, open_snapshot, TABLE_LAST_ADMIN_ROOMS
+
+
+# Gleichzeitige Abfragen im Batch-Scan
+SCAN_CONCURRENCY = 8
 
 
 class RoomAdminReport:
@@ -24,6 +38,8 @@ class RoomAdminReport:
         self.dracoon = dracoon
         self.console = Console()
         self.god_mode = getattr(dracoon, "god_mode", False)
+        self.dry_run = getattr(dracoon, "dry_run", False)
+        self.prefetch = getattr(dracoon, "prefetch", None)
     
     async def run(self):
         """Hauptfunktion des Moduls"""
@@ -38,11 +54,24 @@ class RoomAdminReport:
             self.console.print(f"[{COLOR_DIM}]Useful for preparing user deletion.[/{COLOR_DIM}]\n")
             
             self.console.print(f"[{COLOR_WARNING}]Loading user list...[/{COLOR_WARNING}]")
-            users_response = await self.dracoon.users.get_users()
+            users_response = await self.prefetch.take('users') if self.prefetch else None
+            if users_response is None:
+                users_response = await self.dracoon.users.get_users()
             all_users = users_response.items
             self.console.print(f"[{COLOR_SUCCESS}]✓ {len(all_users)} users loaded[/{COLOR_SUCCESS}]\n")
             
-            pause(self.console)
+            await apause(self.console)
+            
+            mode = self._select_mode()
+            if mode in ("2", "3"):
+                if mode == "2":
+                    await self._batch_scan()
+                else:
+                    await self._room_index_mode()
+                self.console.print(f"\n[{COLOR_PRIMARY}]Back to main menu...[/{COLOR_PRIMARY}]\n")
+                return
+            
+            store = self._open_snapshot()
             
             while True:
                 self.console.clear()
@@ -77,10 +106,13 @@ class RoomAdminReport:
                 self.console.print(f"  E-Mail: [{COLOR_PRIMARY}]{user_email}[/{COLOR_PRIMARY}]")
                 self.console.print(f"  User-ID: [{COLOR_PRIMARY}]{user_id}[/{COLOR_PRIMARY}]\n")
              
-                self.console.print(f"[{COLOR_WARNING}]Searching for rooms with admin permissions...[/{COLOR_WARNING}]")
-                self.console.print(f"[{COLOR_DIM}]This may take some time...[/{COLOR_DIM}]\n")
-                
-                admin_rooms = await self._find_admin_rooms(user_id)
+                if store:
+                    admin_rooms = store.last_admin_rooms(user_id)
+                else:
+                    self.console.print(f"[{COLOR_WARNING}]Searching for rooms with admin permissions...[/{COLOR_WARNING}]")
+                    self.console.print(f"[{COLOR_DIM}]This may take some time...[/{COLOR_DIM}]\n")
+                    
+                    admin_rooms = await self._find_admin_rooms(user_id)
                 
                 if not admin_rooms:
                     self.console.print(f"\n[{COLOR_SUCCESS}]✓ User '{user_name}' ist in keinem Raum als letzter Admin eingetragen.[/{COLOR_SUCCESS}]")
@@ -91,7 +123,10 @@ class RoomAdminReport:
                     if Confirm.ask("\nExport as CSV?"):
                         self._export_csv(user_name, user_email, admin_rooms)
                     
-                    if self.god_mode:
+                    if store:
+                        # Löschen nur auf Basis einer Live-Abfrage
+                        self.console.print(f"\n[{COLOR_DIM}]Snapshot data from {store.fetched_at(TABLE_LAST_ADMIN_ROOMS)} - deletion is only offered for live queries.[/{COLOR_DIM}]")
+                    elif self.god_mode:
                         self.console.print(
                             f"\n[bold {COLOR_ERROR}]GOD-MODE active:[/bold {COLOR_ERROR}] "
                             "All listed data rooms will be deleted without further confirmation."
@@ -104,6 +139,9 @@ class RoomAdminReport:
                 if not Confirm.ask("\nCheck another user?"):
                     break
             
+            if store:
+                store.close()
+            
             self.console.print(f"\n[{COLOR_PRIMARY}]Back to main menu...[/{COLOR_PRIMARY}]\n")
             
         except KeyboardInterrupt:
@@ -112,6 +150,331 @@ class RoomAdminReport:
             self.console.print(f"\n[{COLOR_ERROR}]Error: {str(e)}[/{COLOR_ERROR}]\n")
             pause(self.console)
     
+    def _select_mode(self) -> str:
+        """Moduswahl (einzelner User, Batch-Scan oder Berechtigungsindex)"""
+        self.console.clear()
+        show_header(self.console, "Dracoon Pyclient - Room Admin Report")
+        
+        self.console.print(f"[bold {COLOR_PRIMARY}]Mode:[/bold {COLOR_PRIMARY}]")
+        self.console.print(f"  [{COLOR_PRIMARY}]1[/{COLOR_PRIMARY}] - Single user (search and select)")
+        self.console.print(f"  [{COLOR_PRIMARY}]2[/{COLOR_PRIMARY}] - Batch scan (many users, consolidated report)")
+        self.console.print(f"  [{COLOR_PRIMARY}]3[/{COLOR_PRIMARY}] - Room permission index (crawl all rooms, then query offline)\n")
+        
+        return Prompt.ask("Selection", choices=["1", "2", "3"], default="1")
+    
+    def _open_snapshot(self) -> SnapshotStore:
+        """Lokalen Snapshot für Abfragen verwenden, wenn Letzte-Admin-Räume enthalten sind und gewünscht"""
+        store = open_snapshot()
+        if not store:
+            return None
+        
+        if not store.has(TABLE_LAST_ADMIN_ROOMS):
+            store.close()
+            return None
+        
+        self.console.print(f"[{COLOR_DIM}]Local snapshot available (last-admin rooms fetched {store.fetched_at(TABLE_LAST_ADMIN_ROOMS)})[/{COLOR_DIM}]")
+        if Confirm.ask("Answer queries from the local snapshot instead of the API?", default=False):
+            return store
+        
+        store.close()
+        return None
+    
+    async def _select_batch_users(self) -> list:
+        """Auswahl der User für den Batch-Scan"""
+        self.console.print(f"\n[bold {COLOR_PRIMARY}]Users to scan:[/bold {COLOR_PRIMARY}]")
+        self.console.print(f"  [{COLOR_PRIMARY}]1[/{COLOR_PRIMARY}] - All users")
+        self.console.print(f"  [{COLOR_PRIMARY}]2[/{COLOR_PRIMARY}] - All locked users")
+        self.console.print(f"  [{COLOR_PRIMARY}]3[/{COLOR_PRIMARY}] - Users from file (CSV/XLSX with column 'email' or 'username')\n")
+        
+        choice = Prompt.ask("Selection", choices=["1", "2", "3"], default="2")
+        
+        rows = []
+        if choice == "3":
+            file_path = Prompt.ask(f"[{COLOR_PRIMARY}]Path to CSV/XLSX file[/{COLOR_PRIMARY}]")
+            try:
+                rows = read_table_file(file_path)
+            except Exception as e:
+                self.console.print(f"[{COLOR_ERROR}]✗ Could not read file: {str(e)}[/{COLOR_ERROR}]")
+                return []
+            
+            if not rows or not any(c in rows[0] for c in ('email', 'username')):
+                self.console.print(f"[{COLOR_ERROR}]✗ Expected column 'email' or 'username'![/{COLOR_ERROR}]")
+                return []
+        
+        self.console.print(f"\n[{COLOR_WARNING}]Loading users...[/{COLOR_WARNING}]")
+        user_filter = "isLocked:eq:true" if choice == "2" else None
+        users = await get_all_users(self.dracoon, filter_str=user_filter)
+        
+        if choice == "3":
+            column = 'email' if 'email' in rows[0] else 'username'
+            wanted = {row.get(column, '').lower() for row in rows if row.get(column)}
+            attribute = 'email' if column == 'email' else 'userName'
+            users = [u for u in users if (getattr(u, attribute, '') or '').lower() in wanted]
+            
+            missing = len(wanted) - len({(getattr(u, attribute, '') or '').lower() for u in users})
+            if missing > 0:
+                self.console.print(f"[{COLOR_WARNING}]⚠ {missing} entries from the file did not match any user[/{COLOR_WARNING}]")
+        
+        self.console.print(f"[{COLOR_SUCCESS}]✓ {len(users):,} users selected for scan[/{COLOR_SUCCESS}]")
+        return users
+    
+    async def _batch_scan(self):
+        """Batch-Scan: Letzte-Admin-Räume für viele User parallel ermitteln"""
+        self.console.clear()
+        show_header(self.console, "Dracoon Pyclient - Room Admin Batch Scan")
+        
+        users = await self._select_batch_users()
+        if not users:
+            pause(self.console)
+            return
+        
+        if not Confirm.ask(f"\nScan {len(users):,} users now?", default=True):
+            return
+        
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+            TextColumn("ETA"),
+            TimeRemainingColumn(),
+            console=self.console
+        ) as progress:
+            task = progress.add_task(f"[{COLOR_PRIMARY}]Querying last-admin rooms...[/{COLOR_PRIMARY}]", total=len(users))
+            
+            results = await gather_limited(
+                users,
+                lambda user: self._query_last_admin_rooms(user.id),
+                SCAN_CONCURRENCY,
+                on_done=lambda user, result: progress.update(task, advance=1)
+            )
+        
+        scan = list(zip(users, results))
+        blocked = [(u, rooms) for u, rooms in scan if not isinstance(rooms, Exception) and rooms]
+        errors = [(u, e) for u, e in scan if isinstance(e, Exception)]
+        
+        self.console.print(f"\n[bold {COLOR_PRIMARY}]Batch Scan Summary:[/bold {COLOR_PRIMARY}]")
+        self.console.print(f"  Users scanned: [{COLOR_PRIMARY}]{len(scan):,}[/{COLOR_PRIMARY}]")
+        self.console.print(f"  Users blocked (last admin): [{COLOR_ERROR}]{len(blocked):,}[/{COLOR_ERROR}]")
+        self.console.print(f"  Blocking rooms: [{COLOR_ERROR}]{sum(len(r) for _, r in blocked):,}[/{COLOR_ERROR}]")
+        self.console.print(f"  Users free to delete: [{COLOR_SUCCESS}]{len(scan) - len(blocked) - len(errors):,}[/{COLOR_SUCCESS}]")
+        if errors:
+            self.console.print(f"  Errors: [{COLOR_WARNING}]{len(errors):,}[/{COLOR_WARNING}]")
+        
+        if blocked:
+            table = Table(show_header=True, header_style=f"bold {COLOR_PRIMARY}", box=TABLE_BOX)
+            table.add_column("User-ID", style=COLOR_DIM, width=10)
+            table.add_column("Name", width=30)
+            table.add_column("Email", width=35)
+            table.add_column("Rooms", justify="right", width=8)
+            
+            blocked.sort(key=lambda entry: len(entry[1]), reverse=True)
+            for user, rooms in blocked[:20]:
+                name = f"{getattr(user, 'firstName', '')} {getattr(user, 'lastName', '')}".strip()
+                table.add_row(str(user.id), name if name else '-', getattr(user, 'email', ''), str(len(rooms)))
+            
+            self.console.print()
+            self.console.print(table)
+            
+            if len(blocked) > 20:
+                self.console.print(f"\n[{COLOR_WARNING}]Note: {len(blocked) - 20} additional users not shown.[/{COLOR_WARNING}]")
+        
+        if Confirm.ask("\nExport consolidated report as CSV?", default=True):
+            self._export_batch_csv(scan)
+        
+        pause(self.console)
+    
+    def _export_batch_csv(self, scan: list):
+        """Exportiert den konsolidierten Report (User → blockierende Räume) als CSV"""
+        exports_dir = "exports"
+        if not os.path.exists(exports_dir):
+            os.makedirs(exports_dir)
+        
+        timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        filepath = os.path.join(exports_dir, f"last_admin_rooms_batch_{timestamp}.csv")
+        
+        header_rows = [
+            ["Room Admin Report - Last Admin Rights (Batch Scan)"],
+            ["Users scanned", str(len(scan))],
+            ["Datum", datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+            ["API-URL", self.dracoon.client.base_url],
+            [],
+            ["User-ID", "Username", "First Name", "Last Name", "Email", "Locked", "Status", "Room-ID", "Room Name", "Path"]
+        ]
+        
+        rows = []
+        for user, rooms in scan:
+            user_cols = [
+                user.id,
+                getattr(user, 'userName', ''),
+                getattr(user, 'firstName', ''),
+                getattr(user, 'lastName', ''),
+                getattr(user, 'email', ''),
+                'Yes' if getattr(user, 'isLocked', False) else 'No',
+            ]
+            if isinstance(rooms, Exception):
+                rows.append(user_cols + [f"Error: {str(rooms)[:100]}", "", "", ""])
+            elif not rooms:
+                rows.append(user_cols + ["OK", "", "", ""])
+            else:
+                for room in rooms:
+                    rows.append(user_cols + ["Last admin", room['id'], room['name'], room.get('parentPath', '/')])
+        
+        try:
+            import csv
+            with open(filepath, mode='w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerows(header_rows)
+                writer.writerows(rows)
+            
+            self.console.print(f"\n[{COLOR_SUCCESS}]✓ CSV exported to:[/{COLOR_SUCCESS}] [{COLOR_PRIMARY}]{filepath}[/{COLOR_PRIMARY}]")
+        except Exception as e:
+            self.console.print(f"\n[{COLOR_ERROR}]✗ Error during CSV export: {str(e)}[/{COLOR_ERROR}]")
+    
+    async def _room_index_mode(self):
+        """Raum-Berechtigungsindex: alle Räume crawlen (oder gespeicherten Index laden), dann offline abfragen"""
+        self.console.clear()
+        show_header(self.console, "Dracoon Pyclient - Room Permission Index")
+        
+        saved = sorted(glob.glob(os.path.join("exports", "room_index_*.json")))
+        
+        self.console.print(f"[bold {COLOR_PRIMARY}]Index source:[/bold {COLOR_PRIMARY}]")
+        self.console.print(f"  [{COLOR_PRIMARY}]1[/{COLOR_PRIMARY}] - Crawl all rooms now")
+        if saved:
+            self.console.print(f"  [{COLOR_PRIMARY}]2[/{COLOR_PRIMARY}] - Load saved index ({os.path.basename(saved[-1])})")
+        self.console.print()
+        
+        choice = Prompt.ask("Selection", choices=["1", "2"] if saved else ["1"], default="1")
+        
+        if choice == "2":
+            index = RoomPermissionIndex.load(saved[-1])
+        else:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                MofNCompleteColumn(),
+                TimeElapsedColumn(),
+                console=self.console
+            ) as progress:
+                task = progress.add_task(f"[{COLOR_PRIMARY}]Crawling rooms...[/{COLOR_PRIMARY}]", total=None)
+                
+                index = await crawl_room_permissions(
+                    self.dracoon,
+                    concurrency=SCAN_CONCURRENCY,
+                    on_progress=lambda processed, discovered: progress.update(task, completed=processed, total=discovered)
+                )
+            
+            exports_dir = "exports"
+            if not os.path.exists(exports_dir):
+                os.makedirs(exports_dir)
+            timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+            index_path = os.path.join(exports_dir, f"room_index_{timestamp}.json")
+            index.save(index_path)
+            self.console.print(f"[{COLOR_DIM}]Index saved to: {index_path}[/{COLOR_DIM}]")
+        
+        rooms_without_admin = sum(1 for room_id in index.rooms if not index.admins(room_id) and not index.room_admin_groups.get(room_id))
+        users_last_admin = sum(1 for user_id in index.users if index.last_admin_rooms(user_id))
+        
+        self.console.print(f"\n[bold {COLOR_PRIMARY}]Index Summary ({index.crawled_at}):[/bold {COLOR_PRIMARY}]")
+        self.console.print(f"  Rooms: [{COLOR_PRIMARY}]{len(index.rooms):,}[/{COLOR_PRIMARY}]")
+        self.console.print(f"  Users with room permissions: [{COLOR_PRIMARY}]{len(index.users):,}[/{COLOR_PRIMARY}]")
+        self.console.print(f"  Users who are last admin somewhere: [{COLOR_WARNING}]{users_last_admin:,}[/{COLOR_WARNING}]")
+        self.console.print(f"  Rooms without user or group admin: [{COLOR_WARNING}]{rooms_without_admin:,}[/{COLOR_WARNING}]")
+        if index.failed_rooms:
+            self.console.print(f"  Rooms that could not be crawled: [{COLOR_ERROR}]{len(index.failed_rooms):,}[/{COLOR_ERROR}]")
+        
+        if Confirm.ask("\nExport index as CSV?", default=False):
+            self._export_index_csv(index)
+        
+        pause(self.console)
+        
+        users = sorted(index.users.values(), key=lambda u: (u['lastName'], u['firstName']))
+        while True:
+            self.console.clear()
+            show_header(self.console, "Dracoon Pyclient - Room Permission Index")
+            
+            selected_user = search_and_select_user(self.console, users, "Select a user")
+            if selected_user:
+                self._display_user_rooms(index, selected_user)
+            else:
+                self.console.print(f"[{COLOR_WARNING}]No selection made.[/{COLOR_WARNING}]")
+            
+            if not Confirm.ask("\nCheck another user?"):
+                break
+    
+    def _display_user_rooms(self, index: RoomPermissionIndex, user: dict):
+        """Zeigt alle Räume eines Users mit Rolle aus dem Index"""
+        user_name = f"{user.get('firstName', '')} {user.get('lastName', '')}".strip()
+        rooms = index.rooms_of_user(user['id'])
+        
+        self.console.print(f"\n[bold {COLOR_PRIMARY}]{user_name}[/bold {COLOR_PRIMARY}] ({user.get('email', '')}) - {len(rooms)} room(s)\n")
+        
+        if not rooms:
+            self.console.print(f"[{COLOR_SUCCESS}]User has no direct room permissions.[/{COLOR_SUCCESS}]")
+            return
+        
+        table = Table(show_header=True, header_style=f"bold {COLOR_PRIMARY}", box=TABLE_BOX)
+        table.add_column("Room-ID", style=COLOR_DIM, width=10)
+        table.add_column("Path", width=50)
+        table.add_column("Role", width=8)
+        table.add_column("Last Admin", width=12)
+        
+        ordered = sorted(rooms.items(), key=lambda item: (item[1] != ROLE_ADMIN, index.room_path(item[0])))
+        for room_id, role in ordered:
+            last_admin = index.is_last_admin(user['id'], room_id)
+            table.add_row(
+                str(room_id),
+                index.room_path(room_id),
+                role,
+                f"[{COLOR_ERROR}]Yes[/{COLOR_ERROR}]" if last_admin else ""
+            )
+        
+        self.console.print(table)
+    
+    def _export_index_csv(self, index: RoomPermissionIndex):
+        """Exportiert den Index (eine Zeile je User und Raum) als CSV"""
+        exports_dir = "exports"
+        if not os.path.exists(exports_dir):
+            os.makedirs(exports_dir)
+        
+        timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        filepath = os.path.join(exports_dir, f"room_permissions_{timestamp}.csv")
+        
+        headers = ["User-ID", "Username", "Email", "Room-ID", "Path", "Role", "Last Admin"]
+        rows = [
+            [
+                user_id,
+                index.users.get(user_id, {}).get('userName', ''),
+                index.users.get(user_id, {}).get('email', ''),
+                room_id,
+                index.room_path(room_id),
+                role,
+                'Yes' if index.is_last_admin(user_id, room_id) else 'No',
+            ]
+            for user_id, rooms in index.user_rooms.items()
+            for room_id, role in rooms.items()
+        ]
+        
+        if export_to_csv(filepath, headers, rows):
+            self.console.print(f"\n[{COLOR_SUCCESS}]✓ CSV exported to:[/{COLOR_SUCCESS}] [{COLOR_PRIMARY}]{filepath}[/{COLOR_PRIMARY}]")
+        else:
+            self.console.print(f"\n[{COLOR_ERROR}]✗ Error during CSV export[/{COLOR_ERROR}]")
+    
+    async def _query_last_admin_rooms(self, user_id: int) -> list:
+        """Fragt die Räume ab, in denen der User LETZTER Room-Admin ist (wirft bei Fehlern)"""
+        response = await self.dracoon.users.get_user_last_admin_rooms(user_id=user_id, raise_on_err=True)
+        
+        return [
+            {
+                "id": room.id,
+                "name": room.name,
+                "parentPath": getattr(room, "parentPath", "/"),
+            }
+            for room in getattr(response, "items", []) or []
+        ]
+    
     async def _find_admin_rooms(self, user_id: int) -> list:
         """Sucht alle Räume, in denen der User LETZTER Room-Admin ist"""
         admin_rooms = []
@@ -128,19 +491,12 @@ class RoomAdminReport:
             )
 
             try:
-                response = await self.dracoon.users.get_user_last_admin_rooms(user_id=user_id)
+                admin_rooms = await self._query_last_admin_rooms(user_id)
                 progress.update(task, completed=True)
             except Exception as e:
                 self.console.print(f"[{COLOR_ERROR}]Error during query: {e}[/{COLOR_ERROR}]")
                 return []
 
-            for room in getattr(response, "items", []):
-                admin_rooms.append({
-                    "id": room.id,
-                    "name": room.name,
-                    "parentPath": getattr(room, "parentPath", "/"),
-                })
-
         return admin_rooms
     
     async def _delete_last_admin_rooms(self, user_name: str, admin_rooms: list) -> None:
@@ -157,6 +513,9 @@ class RoomAdminReport:
             f"[bold {COLOR_WARNING}]{len(admin_rooms)}[/bold {COLOR_WARNING}] room(s)."
         )
 
+        if self.dry_run:
+            self.console.print(f"[{COLOR_WARNING}]DRY-RUN: Only the deletion plan is written, nothing is deleted.[/{COLOR_WARNING}]")
+
         table = Table(show_header=True, header_style=f"bold {COLOR_PRIMARY}", box=TABLE_BOX)
         table.add_column("Room-ID", style=COLOR_DIM, width=10)
         table.add_column("Room Name", width=40)
@@ -173,28 +532,11 @@ class RoomAdminReport:
         self.console.print(table)
         self.console.print()
 
-        deleted = []
-        failed = []
-
-        if self.god_mode:
-            for room in admin_rooms:
-                room_id = room.get("id")
-                name = room.get("name", "")
-                parent_path = room.get("parentPath", "/") or "/"
-                full_path = f"{parent_path}{name}"
-                
-                try:
-                    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), console=self.console) as progress:
-                        task = progress.add_task(f"[{COLOR_ERROR}]Deleting room {full_path} (ID {room_id})...[/{COLOR_ERROR}]", total=None)
-                        await self.dracoon.nodes.delete_nodes(node_list=[room_id])
-                        progress.update(task, completed=True)
-
-                    self.console.print(f"[{COLOR_SUCCESS}]✓ Room deleted (God-Mode):[/{COLOR_SUCCESS}] [{COLOR_PRIMARY}]{full_path}[/{COLOR_PRIMARY}]")
-                    deleted.append(room_id)
-                except Exception as e:
-                    self.console.print(f"[{COLOR_ERROR}]✗ Deletion failed for room ID {room_id}: {e}[/{COLOR_ERROR}]")
-                    failed.append(room_id)
+        if self.god_mode or self.dry_run:
+            rooms_to_delete = list(admin_rooms)
         else:
+            # Zweistufige Bestätigung pro Raum, gelöscht wird danach gebündelt
+            rooms_to_delete = []
             for room in admin_rooms:
                 room_id = room.get("id")
                 name = room.get("name", "")
@@ -213,22 +555,61 @@ class RoomAdminReport:
                     self.console.print(f"[{COLOR_WARNING}]→ Safety check cancelled, room will remain.[/{COLOR_WARNING}]")
                     continue
 
-                try:
-                    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), console=self.console) as progress:
-                        task = progress.add_task(f"[{COLOR_ERROR}]Deleting room {full_path} (ID {room_id})...[/{COLOR_ERROR}]", total=None)
-                        await self.dracoon.nodes.delete_nodes(node_list=[room_id])
-                        progress.update(task, completed=True)
+                rooms_to_delete.append(room)
+
+        if not rooms_to_delete:
+            self.console.print(f"\n[{COLOR_WARNING}]No rooms selected for deletion.[/{COLOR_WARNING}]")
+            return
 
-                    self.console.print(f"[{COLOR_SUCCESS}]✓ Room deleted:[/{COLOR_SUCCESS}] [{COLOR_PRIMARY}]{full_path}[/{COLOR_PRIMARY}]")
-                    deleted.append(room_id)
-                except Exception as e:
-                    self.console.print(f"[{COLOR_ERROR}]✗ Deletion failed for room ID {room_id}: {e}[/{COLOR_ERROR}]")
-                    failed.append(room_id)
+        plan = build_deletion_plan(rooms_to_delete)
+        batch_count = len({entry['batch'] for entry in plan})
+
+        if not self.dry_run:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                MofNCompleteColumn(),
+                console=self.console
+            ) as progress:
+                task = progress.add_task(
+                    f"[{COLOR_ERROR}]Deleting {len(plan)} room(s) in {batch_count} request(s)...[/{COLOR_ERROR}]",
+                    total=len(plan)
+                )
+                plan = await execute_deletion_plan(
+                    self.dracoon,
+                    plan,
+                    on_batch_done=lambda room_ids, result: progress.update(task, advance=len(room_ids))
+                )
+
+            for entry in plan:
+                if entry['status'] == STATUS_DELETED:
+                    label = "Room deleted (God-Mode):" if self.god_mode else "Room deleted:"
+                    self.console.print(f"[{COLOR_SUCCESS}]✓ {label}[/{COLOR_SUCCESS}] [{COLOR_PRIMARY}]{entry['path']}[/{COLOR_PRIMARY}]")
+                else:
+                    self.console.print(f"[{COLOR_ERROR}]✗ Deletion failed for room ID {entry['id']}: {entry['error']}[/{COLOR_ERROR}]")
+
+        try:
+            log_path = write_deletion_log(plan, {
+                'mode': "dry-run" if self.dry_run else "delete",
+                'god_mode': self.god_mode,
+                'user': user_name,
+                'api_url': str(self.dracoon.client.base_url),
+            })
+            self.console.print(f"\n[{COLOR_DIM}]Deletion log written to: {log_path}[/{COLOR_DIM}]")
+        except Exception as e:
+            self.console.print(f"\n[{COLOR_ERROR}]✗ Could not write deletion log: {str(e)}[/{COLOR_ERROR}]")
+
+        deleted = [entry for entry in plan if entry['status'] == STATUS_DELETED]
+        failed = [entry for entry in plan if entry['status'] == STATUS_FAILED]
 
         self.console.print("\n" + "=" * 100)
         self.console.print(f"[bold {COLOR_PRIMARY}]Deletion Summary:[/bold {COLOR_PRIMARY}]")
-        self.console.print(f"[{COLOR_SUCCESS}]Deleted rooms:[/{COLOR_SUCCESS}] {len(deleted)}")
-        self.console.print(f"[{COLOR_ERROR}]Failed deletion attempts:[/{COLOR_ERROR}] {len(failed)}")
+        if self.dry_run:
+            self.console.print(f"[{COLOR_WARNING}]Planned deletions (dry-run):[/{COLOR_WARNING}] {len(plan)} in {batch_count} request(s)")
+        else:
+            self.console.print(f"[{COLOR_SUCCESS}]Deleted rooms:[/{COLOR_SUCCESS}] {len(deleted)}")
+            self.console.print(f"[{COLOR_ERROR}]Failed deletion attempts:[/{COLOR_ERROR}] {len(failed)}")
         self.console.print("=" * 100 + "\n")
     
     def _display_results(self, user_name: str, user_email: str, admin_rooms: list):
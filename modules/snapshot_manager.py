@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Dracoon Pyclient - Local Snapshot
+Zeigt den Stand des lokalen SQLite-Snapshots und aktualisiert ihn über SDK und Provisioning API
+"""
+
+import os
+from datetime import datetime
+from rich.console import Console
+from rich.table import Table
+from rich.prompt import Prompt
+from dotenv import load_dotenv
+
+from dracoon import DRACOON
+
+from lib import (
+    show_header, pause,
+    COLOR_PRIMARY, COLOR_SUCCESS, COLOR_ERROR, COLOR_WARNING, COLOR_DIM, TABLE_BOX
+)
+from lib.provisioning import ProvisioningClient
+from lib.prefetch import DataPrefetcher
+from lib.snapshot import (
+    SnapshotStore, refresh_directory, refresh_customers, SNAPSHOT_FILE,
+    TABLE_CUSTOMERS, TABLE_CUSTOMER_USERS, TABLE_USERS, TABLE_GROUPS, TABLE_MEMBERSHIPS, TABLE_LAST_ADMIN_ROOMS
+)
+from lib.query_service import QueryService, SERVICE_HOST, SERVICE_PORT
+from lib.snapshot_watch import (
+    SnapshotWatcher, WATCH_INTERVAL, WATCH_CONCURRENCY, WATCH_FULL_EVERY, STRATEGY_COUNTS, STRATEGY_FULL
+)
+
+
+# Gleichzeitige Requests beim Aktualisieren
+REFRESH_CONCURRENCY = 8
+
+SNAPSHOT_TABLES = [
+    (TABLE_CUSTOMERS, "Customers", "Provisioning API"),
+    (TABLE_CUSTOMER_USERS, "Customer users (email export)", "Provisioning API"),
+    (TABLE_USERS, "Users", "OAuth"),
+    (TABLE_GROUPS, "Groups", "OAuth"),
+    (TABLE_MEMBERSHIPS, "Group memberships", "OAuth"),
+    (TABLE_LAST_ADMIN_ROOMS, "Last-admin rooms", "OAuth"),
+]
+
+
+def provisioning_client_from_env() -> ProvisioningClient:
+    """Provisioning-Client aus .env (None, wenn kein Service Token konfiguriert ist)"""
+    load_dotenv()
+    base_url = os.getenv('DRACOON_BASE_URL')
+    service_token = os.getenv('DRACOON_SERVICE_TOKEN')
+    if not base_url or not service_token:
+        return None
+    return ProvisioningClient(base_url, service_token)
+
+
+async def refresh_snapshot(console: Console, dracoon: DRACOON = None, prov_client: ProvisioningClient = None,
+                           file_path: str = SNAPSHOT_FILE) -> bool:
+    """
+    Aktualisiert alle Tabellen, für die ein Zugang vorhanden ist
+
+    Returns:
+        True wenn alle angestoßenen Aktualisierungen erfolgreich waren
+    """
+    store = SnapshotStore(file_path)
+    ok = True
+
+    def _step(table, count):
+        console.print(f"[{COLOR_SUCCESS}]✓ {table}: {count:,} rows[/{COLOR_SUCCESS}]")
+
+    try:
+        if dracoon:
+            console.print(f"[{COLOR_WARNING}]Refreshing users, groups, memberships and last-admin rooms...[/{COLOR_WARNING}]")
+            try:
+                await refresh_directory(store, dracoon, concurrency=REFRESH_CONCURRENCY, on_step=_step)
+            except Exception as e:
+                console.print(f"[{COLOR_ERROR}]✗ Directory refresh failed: {str(e)}[/{COLOR_ERROR}]")
+                ok = False
+
+        if prov_client:
+            console.print(f"[{COLOR_WARNING}]Refreshing customers and customer users...[/{COLOR_WARNING}]")
+            try:
+                await refresh_customers(store, prov_client, concurrency=REFRESH_CONCURRENCY, on_step=_step)
+            except Exception as e:
+                console.print(f"[{COLOR_ERROR}]✗ Customer refresh failed: {str(e)}[/{COLOR_ERROR}]")
+                ok = False
+    finally:
+        store.close()
+
+    return ok
+
+
+def _describe(result: dict, label: str) -> str:
+    """Kurzbeschreibung eines Watch-Ergebnisses für Kunden bzw. Groups"""
+    if result.get('full'):
+        return f"full reload ({result['rows']:,} rows)"
+    text = f"{result['checked']:,} {label} checked, {result['changed']:,} reloaded, {result['removed']:,} removed"
+    if result['failed']:
+        text += f", {len(result['failed']):,} failed (retried next cycle)"
+    return text
+
+
+def print_cycle(console: Console, report: dict):
+    """Eine Zeile je Watch-Durchlauf mit Dauer und Änderungen"""
+    timestamp = datetime.now().strftime('%H:%M:%S')
+    kind = "full" if report['full'] else "incremental"
+    console.print(f"[{COLOR_PRIMARY}]{timestamp}[/{COLOR_PRIMARY}] Cycle {report['cycle']} ({kind}, {report['seconds']:.1f} s)")
+    if report['customers']:
+        console.print(f"  [{COLOR_SUCCESS}]✓ Customers: {_describe(report['customers'], 'customers')}[/{COLOR_SUCCESS}]")
+    if report['directory']:
+        console.print(f"  [{COLOR_SUCCESS}]✓ Users/groups: {_describe(report['directory'], 'groups')}[/{COLOR_SUCCESS}]")
+    if not report['full'] and report.get('last_admin_age') is not None:
+        console.print(f"  [{COLOR_DIM}]Last-admin rooms: {report['last_admin_age'] / 3600:.1f} h old (refreshed by full cycles)[/{COLOR_DIM}]")
+    for error in report['errors']:
+        console.print(f"  [{COLOR_ERROR}]✗ {error}[/{COLOR_ERROR}]")
+
+
+async def watch_snapshot(console: Console, dracoon: DRACOON = None, prov_client: ProvisioningClient = None,
+                         interval: float = WATCH_INTERVAL, concurrency: int = WATCH_CONCURRENCY,
+                         strategy: str = STRATEGY_COUNTS, full_every: int = WATCH_FULL_EVERY,
+                         reconnect=None, file_path: str = SNAPSHOT_FILE):
+    """
+    Hält den Snapshot aktuell, bis der Lauf abgebrochen wird (--watch)
+
+    Gibt je Durchlauf eine Zeile mit Dauer und Änderungen aus.
+    """
+    store = SnapshotStore(file_path)
+    # Module in anderen Prozessen lesen, während hier geschrieben wird
+    store.enable_concurrent_reads()
+
+    watcher = SnapshotWatcher(
+        store, dracoon, prov_client, interval=interval, concurrency=concurrency,
+        strategy=strategy, full_every=full_every, reconnect=reconnect,
+        on_cycle=lambda report: print_cycle(console, report)
+    )
+
+    sources = [name for name, client in (("customers", prov_client), ("users/groups", dracoon)) if client]
+    console.print(f"[{COLOR_WARNING}]Watching {' and '.join(sources)} - snapshot {file_path}[/{COLOR_WARNING}]")
+    full_note = "every cycle" if strategy == STRATEGY_FULL else (f"every {full_every} cycles" if full_every else "never")
+    console.print(f"[{COLOR_DIM}]Interval {interval / 60:g} min, {concurrency} parallel requests, "
+                  f"change detection: {strategy}, full reload {full_note}. Press Ctrl+C to stop.[/{COLOR_DIM}]\n")
+
+    try:
+        await watcher.run()
+    finally:
+        store.close()
+
+
+async def serve_snapshot(console: Console, dracoon: DRACOON = None, prov_client: ProvisioningClient = None,
+                         host: str = SERVICE_HOST, port: int = SERVICE_PORT, interval: float = None,
+                         concurrency: int = WATCH_CONCURRENCY, strategy: str = STRATEGY_COUNTS,
+                         full_every: int = WATCH_FULL_EVERY, reconnect=None, file_path: str = SNAPSHOT_FILE):
+    """
+    Lokaler HTTP/JSON-Dienst über den Snapshot, bis der Lauf abgebrochen wird (--serve)
+
+    Mit Zugangsdaten kann der Snapshot per POST /refresh (und mit interval periodisch)
+    aktualisiert werden - geschrieben wird über eine eigene Verbindung in Worker-Threads,
+    die Event-Loop beantwortet währenddessen weiter Requests.
+    """
+    store = SnapshotStore(file_path)
+    store.enable_concurrent_reads()
+
+    watcher = None
+    if dracoon or prov_client:
+        watcher = SnapshotWatcher(
+            store, dracoon, prov_client, concurrency=concurrency,
+            strategy=strategy, full_every=full_every, reconnect=reconnect
+        )
+
+    service = QueryService(file_path, watcher, interval, on_refresh=lambda report: print_cycle(console, report))
+
+    def _ready(bound_host, bound_port):
+        console.print(f"[{COLOR_SUCCESS}]✓ Query service listening on http://{bound_host}:{bound_port}[/{COLOR_SUCCESS}]")
+        for path, (method, _) in service.routes.items():
+            console.print(f"  [{COLOR_DIM}]{method:<4} {path}[/{COLOR_DIM}]")
+        if not watcher:
+            console.print(f"[{COLOR_WARNING}]No credentials - serving the snapshot as is, /refresh is disabled[/{COLOR_WARNING}]")
+        elif interval:
+            console.print(f"[{COLOR_DIM}]Refreshing every {interval / 60:g} min (change detection: {strategy})[/{COLOR_DIM}]")
+        if host not in ("127.0.0.1", "localhost", "::1"):
+            console.print(f"[{COLOR_WARNING}]⚠ Listening on {host} - the service has no authentication![/{COLOR_WARNING}]")
+        console.print(f"[{COLOR_DIM}]Press Ctrl+C to stop.[/{COLOR_DIM}]\n")
+
+    try:
+        await service.serve(host, port, on_ready=_ready)
+    finally:
+        service.close()
+        store.close()
+
+
+class SnapshotManager:
+    def __init__(self, dracoon: DRACOON = None):
+        self.dracoon = dracoon
+        self.console = Console()
+
+    async def run(self):
+        """Hauptfunktion des Moduls"""
+        try:
+            while True:
+                self.console.clear()
+                show_header(self.console, "Dracoon Pyclient - Local Snapshot")
+
+                self._show_status()
+
+                prov_client = provisioning_client_from_env()
+
+                self.console.print(f"\n[bold {COLOR_PRIMARY}]Refresh:[/bold {COLOR_PRIMARY}]")
+                self.console.print(f"  [{COLOR_PRIMARY}]1[/{COLOR_PRIMARY}] - Users, groups, memberships, last-admin rooms (OAuth)")
+                self.console.print(f"  [{COLOR_PRIMARY}]2[/{COLOR_PRIMARY}] - Customers and customer users (Provisioning API)")
+                self.console.print(f"  [{COLOR_PRIMARY}]3[/{COLOR_PRIMARY}] - Everything")
+                self.console.print(f"  [{COLOR_PRIMARY}]q[/{COLOR_PRIMARY}] - Back to main menu\n")
+
+                choice = Prompt.ask("Selection", choices=["1", "2", "3", "q"], default="q")
+                if choice == "q":
+                    break
+
+                dracoon = self.dracoon if choice in ("1", "3") else None
+                prov = prov_client if choice in ("2", "3") else None
+
+                if choice in ("1", "3") and not dracoon:
+                    self.console.print(f"[{COLOR_ERROR}]✗ OAuth not connected - directory data cannot be refreshed[/{COLOR_ERROR}]")
+                if choice in ("2", "3") and not prov:
+                    self.console.print(f"[{COLOR_ERROR}]✗ DRACOON_SERVICE_TOKEN not configured - customer data cannot be refreshed[/{COLOR_ERROR}]")
+
+                if dracoon or prov:
+                    self.console.print()
+                    await refresh_snapshot(self.console, dracoon, prov)
+
+                pause(self.console)
+
+            self.console.print(f"\n[{COLOR_PRIMARY}]Back to main menu...[/{COLOR_PRIMARY}]\n")
+
+        except KeyboardInterrupt:
+            self.console.print(f"\n\n[{COLOR_WARNING}]Cancelled by user[/{COLOR_WARNING}]\n")
+        except Exception as e:
+            self.console.print(f"\n[{COLOR_ERROR}]Error: {str(e)}[/{COLOR_ERROR}]\n")
+            pause(self.console)
+
+    def _show_status(self):
+        """Tabellen des Snapshots mit Zeilenzahl und Abrufzeitpunkt"""
+        self.console.print(f"[{COLOR_DIM}]Snapshot file: {SNAPSHOT_FILE}[/{COLOR_DIM}]\n")
+
+        info = {}
+        if os.path.exists(SNAPSHOT_FILE):
+            store = SnapshotStore(SNAPSHOT_FILE)
+            info = store.fetch_info()
+            store.close()
+
+        table = Table(show_header=True, header_style=f"bold {COLOR_PRIMARY}", box=TABLE_BOX)
+        table.add_column("Data", width=32)
+        table.add_column("Source", width=18)
+        table.add_column("Rows", justify="right", width=12)
+        table.add_column("Fetched At", width=22)
+
+        for table_name, label, source in SNAPSHOT_TABLES:
+            entry = info.get(table_name)
+            if entry:
+                table.add_row(label, source, f"{entry['row_count']:,}", entry['fetched_at'])
+            else:
+                table.add_row(label, source, "-", f"[{COLOR_DIM}]never[/{COLOR_DIM}]")
+
+        self.console.print(table)
+
+
+async def main(dracoon: DRACOON = None, prefetch: DataPrefetcher = None):
+    """Entry Point für das Modul"""
+    manager = SnapshotManager(dracoon)
+    await manager.run()
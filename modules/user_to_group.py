@@ -7,20 +7,25 @@ Interaktive Konsolen-Oberfläche zum Hinzufügen von Usern zu Gruppen
 from rich.console import Console
 from rich.table import Table
 from rich.prompt import Prompt, Confirm
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+from datetime import datetime
+import os
 
 from dracoon import DRACOON
 
 from lib import (
-    show_header, pause,
+    show_header, pause, apause, read_table_file, export_to_csv, parse_selection,
     COLOR_PRIMARY, COLOR_SUCCESS, COLOR_ERROR, COLOR_WARNING, COLOR_DIM, TABLE_BOX
 )
+from lib.directory import get_all_users, get_all_groups
+from lib.group_sync import build_sync_plan, apply_sync_plan, plan_requests
 
 
 class UserToGroupManager:
     def __init__(self, dracoon: DRACOON):
         self.dracoon = dracoon
         self.console = Console()
+        self.prefetch = getattr(dracoon, "prefetch", None)
         self.all_users = []
         self.all_groups = []
         self.selected_group = None
@@ -32,7 +37,13 @@ class UserToGroupManager:
             self.console.clear()
             show_header(self.console, "Dracoon Pyclient - User-to-Group Manager")
             await self._load_data()
-            pause(self.console)
+            await apause(self.console)
+            
+            mode = self._select_mode()
+            if mode in ("2", "3"):
+                await self._bulk_assign_from_file(sync=(mode == "3"))
+                self.console.print(f"\n[{COLOR_PRIMARY}]Back to main menu...[/{COLOR_PRIMARY}]\n")
+                return
             
             while True:
                 if not await self._select_group():
@@ -63,19 +74,36 @@ class UserToGroupManager:
             console=self.console
         ) as progress:
             
+            # Im Hintergrund vorgeladene Daten übernehmen, sonst direkt laden
             task1 = progress.add_task(f"[{COLOR_PRIMARY}]Loading groups...[/{COLOR_PRIMARY}]", total=None)
-            groups_response = await self.dracoon.groups.get_groups()
+            groups_response = await self.prefetch.take('groups') if self.prefetch else None
+            if groups_response is None:
+                groups_response = await self.dracoon.groups.get_groups()
             self.all_groups = groups_response.items
             progress.update(task1, completed=True)
             
             task2 = progress.add_task(f"[{COLOR_PRIMARY}]Loading users...[/{COLOR_PRIMARY}]", total=None)
-            users_response = await self.dracoon.users.get_users()
+            users_response = await self.prefetch.take('users') if self.prefetch else None
+            if users_response is None:
+                users_response = await self.dracoon.users.get_users()
             self.all_users = users_response.items
             progress.update(task2, completed=True)
         
         self.console.print(f"[{COLOR_SUCCESS}]✓ {len(self.all_groups)} groups loaded[/{COLOR_SUCCESS}]")
         self.console.print(f"[{COLOR_SUCCESS}]✓ {len(self.all_users)} users loaded[/{COLOR_SUCCESS}]\n")
     
+    def _select_mode(self) -> str:
+        """Mode selection (interactive, file import or sync)"""
+        self.console.clear()
+        show_header(self.console, "Dracoon Pyclient - User-to-Group Manager")
+        
+        self.console.print(f"[bold {COLOR_PRIMARY}]Mode:[/bold {COLOR_PRIMARY}]")
+        self.console.print(f"  [{COLOR_PRIMARY}]1[/{COLOR_PRIMARY}] - Interactive (select group and users)")
+        self.console.print(f"  [{COLOR_PRIMARY}]2[/{COLOR_PRIMARY}] - Import assignments from file (CSV/XLSX: email,group or username,group)")
+        self.console.print(f"  [{COLOR_PRIMARY}]3[/{COLOR_PRIMARY}] - Sync memberships from file (desired state - adds AND removes)\n")
+        
+        return Prompt.ask("Selection", choices=["1", "2", "3"], default="1")
+    
     async def _select_group(self):
         """Group selection"""
         self.console.clear()
@@ -245,18 +273,7 @@ class UserToGroupManager:
             return await self._select_individual_users(member_ids)
         
         try:
-            selected_indices = set()
-            parts = choice.split(',')
-            
-            for part in parts:
-                part = part.strip()
-                if '-' in part:
-                    # Range
-                    start, end = part.split('-')
-                    selected_indices.update(range(int(start), int(end) + 1))
-                else:
-                    # Single number
-                    selected_indices.add(int(part))
+            selected_indices = parse_selection(choice)
             
             selected_users = []
             for idx in selected_indices:
@@ -376,6 +393,312 @@ class UserToGroupManager:
         
         self.console.print()
         pause(self.console)
+    
+    async def _bulk_assign_from_file(self, sync: bool = False):
+        """
+        Bulk assignment from a CSV/XLSX file (email,group or username,group)
+        
+        Args:
+            sync: True = file is the desired state, members not listed are removed
+        """
+        title = "Group Membership Sync" if sync else "Bulk Group Assignment"
+        self.console.clear()
+        show_header(self.console, f"Dracoon Pyclient - {title}")
+        
+        if sync:
+            self.console.print(f"[{COLOR_WARNING}]Each group in the file will contain exactly the listed users.[/{COLOR_WARNING}]")
+            self.console.print(f"[{COLOR_DIM}]A row with an empty user column marks a group that should be empty.[/{COLOR_DIM}]\n")
+        
+        file_path = Prompt.ask(f"[{COLOR_PRIMARY}]Path to CSV/XLSX file[/{COLOR_PRIMARY}]")
+        
+        try:
+            rows = read_table_file(file_path)
+        except Exception as e:
+            self.console.print(f"[{COLOR_ERROR}]✗ Could not read file: {str(e)}[/{COLOR_ERROR}]\n")
+            pause(self.console)
+            return
+        
+        if not rows:
+            self.console.print(f"[{COLOR_WARNING}]File contains no assignments.[/{COLOR_WARNING}]\n")
+            pause(self.console)
+            return
+        
+        user_column = next((c for c in ('email', 'username') if c in rows[0]), None)
+        if not user_column or 'group' not in rows[0]:
+            self.console.print(f"[{COLOR_ERROR}]✗ Expected columns 'email,group' or 'username,group'![/{COLOR_ERROR}]\n")
+            pause(self.console)
+            return
+        
+        self.console.print(f"[{COLOR_SUCCESS}]✓ {len(rows):,} rows read (matching by {user_column})[/{COLOR_SUCCESS}]\n")
+        
+        # Für die Auflösung werden ALLE User und Groups benötigt (nicht nur die erste Seite)
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=self.console
+        ) as progress:
+            task = progress.add_task(f"[{COLOR_PRIMARY}]Loading all users and groups...[/{COLOR_PRIMARY}]", total=None)
+            self.all_users = await get_all_users(self.dracoon)
+            self.all_groups = await get_all_groups(self.dracoon)
+            progress.update(task, completed=True)
+        
+        desired, unresolved = self._resolve_assignments(rows, user_column)
+        
+        self.console.print(f"[{COLOR_SUCCESS}]✓ {sum(len(u) for u in desired.values()):,} assignments resolved for {len(desired):,} groups[/{COLOR_SUCCESS}]")
+        if unresolved:
+            self.console.print(f"[{COLOR_WARNING}]⚠ {len(unresolved):,} rows could not be resolved[/{COLOR_WARNING}]")
+        
+        # Ein Sync mit unvollständigem Soll-Zustand würde die nicht aufgelösten User entfernen
+        user_errors = [row for row in unresolved if row[3] != "Unknown group"]
+        if sync and user_errors:
+            self.console.print(f"[{COLOR_ERROR}]✗ Sync aborted: {len(user_errors):,} rows with unknown or ambiguous users.[/{COLOR_ERROR}]")
+            self.console.print(f"[{COLOR_DIM}]  Those users would be removed from their groups - fix the file and run the sync again.[/{COLOR_DIM}]")
+            self._export_unresolved(unresolved)
+            pause(self.console)
+            return
+        
+        if not desired:
+            self._export_unresolved(unresolved)
+            pause(self.console)
+            return
+        
+        plan = await self._build_assignment_plan(desired, sync)
+        self._display_assignment_plan(plan, sync)
+        self._export_unresolved(unresolved)
+        
+        requests = plan_requests(plan)
+        if not requests:
+            self.console.print(f"\n[{COLOR_SUCCESS}]✓ Nothing to do - memberships already match.[/{COLOR_SUCCESS}]\n")
+            pause(self.console)
+            return
+        
+        if Confirm.ask("\nExport plan as CSV (dry run)?", default=False):
+            self._export_plan(plan)
+        
+        total_changes = sum(len(p['to_add']) + len(p['to_remove']) for p in plan)
+        if not Confirm.ask(f"\nApply {total_changes:,} changes in {len(requests):,} requests now?", default=False):
+            self.console.print(f"[{COLOR_WARNING}]→ Dry run only, no changes made.[/{COLOR_WARNING}]")
+            pause(self.console)
+            return
+        
+        await self._apply_assignment_plan(plan)
+    
+    def _resolve_assignments(self, rows: list, user_column: str) -> tuple:
+        """
+        Resolves file rows against user and group indexes
+        
+        Returns:
+            (desired, unresolved) - desired: {group_id: set(user_ids)},
+            unresolved: list of [row number, user, group, reason]
+        """
+        user_index = {}
+        ambiguous = set()
+        for user in self.all_users:
+            key = (getattr(user, 'email', '') if user_column == 'email' else getattr(user, 'userName', '')) or ''
+            key = key.lower()
+            if not key:
+                continue
+            if key in user_index:
+                ambiguous.add(key)
+            user_index[key] = user.id
+        
+        group_index = {g.name.lower(): g.id for g in self.all_groups}
+        group_ids = {str(g.id): g.id for g in self.all_groups}
+        
+        desired = {}
+        unresolved = []
+        
+        # Zeile 1 ist die Kopfzeile
+        for row_no, row in enumerate(rows, 2):
+            user_key = row.get(user_column, '')
+            group_key = row.get('group', '')
+            
+            group_id = group_index.get(group_key.lower(), group_ids.get(group_key))
+            user_id = user_index.get(user_key.lower())
+            
+            if group_id is None:
+                unresolved.append([row_no, user_key, group_key, "Unknown group"])
+            elif not user_key:
+                # Group ohne User: Soll-Zustand "leer"
+                desired.setdefault(group_id, set())
+            elif user_key.lower() in ambiguous:
+                unresolved.append([row_no, user_key, group_key, f"Ambiguous {user_column}"])
+            elif user_id is None:
+                unresolved.append([row_no, user_key, group_key, "Unknown user"])
+            else:
+                desired.setdefault(group_id, set()).add(user_id)
+        
+        return desired, unresolved
+    
+    async def _build_assignment_plan(self, desired: dict, sync: bool) -> list:
+        """Loads current memberships of all affected groups and computes adds/removes"""
+        group_names = {g.id: g.name for g in self.all_groups}
+        
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TextColumn("{task.completed}/{task.total}"),
+            console=self.console
+        ) as progress:
+            task = progress.add_task(f"[{COLOR_PRIMARY}]Loading current memberships...[/{COLOR_PRIMARY}]", total=len(desired))
+            
+            plan = await build_sync_plan(
+                self.dracoon,
+                desired,
+                remove=sync,
+                on_group_loaded=lambda group_id, result: progress.update(task, advance=1)
+            )
+        
+        for entry in plan:
+            entry['group_name'] = group_names.get(entry['group_id'], str(entry['group_id']))
+        
+        plan.sort(key=lambda p: len(p['to_add']) + len(p['to_remove']), reverse=True)
+        return plan
+    
+    def _display_assignment_plan(self, plan: list, sync: bool):
+        """Shows the precomputed assignment plan"""
+        self.console.print(f"\n[bold {COLOR_PRIMARY}]{'Sync' if sync else 'Assignment'} Plan:[/bold {COLOR_PRIMARY}]\n")
+        
+        table = Table(show_header=True, header_style=f"bold {COLOR_PRIMARY}", box=TABLE_BOX)
+        table.add_column("Group-ID", style=COLOR_DIM, width=10)
+        table.add_column("Group", width=36)
+        table.add_column("Requested", justify="right", width=10)
+        table.add_column("Current", justify="right", width=10)
+        table.add_column("Add", justify="right", width=8)
+        if sync:
+            table.add_column("Remove", justify="right", width=8)
+        
+        for entry in plan[:20]:
+            row = [
+                str(entry['group_id']),
+                entry['group_name'],
+                f"{entry['requested']:,}",
+                f"{entry['current']:,}",
+                f"[{COLOR_SUCCESS}]+{len(entry['to_add']):,}[/{COLOR_SUCCESS}]",
+            ]
+            if sync:
+                row.append(f"[{COLOR_ERROR}]-{len(entry['to_remove']):,}[/{COLOR_ERROR}]")
+            table.add_row(*row)
+        
+        self.console.print(table)
+        
+        if len(plan) > 20:
+            self.console.print(f"\n[{COLOR_WARNING}]Note: {len(plan) - 20} additional groups not shown.[/{COLOR_WARNING}]")
+        
+        unchanged = sum(1 for p in plan if not p['to_add'] and not p['to_remove'])
+        self.console.print(f"\n  Users to add: [{COLOR_PRIMARY}]{sum(len(p['to_add']) for p in plan):,}[/{COLOR_PRIMARY}]")
+        if sync:
+            self.console.print(f"  Users to remove: [{COLOR_PRIMARY}]{sum(len(p['to_remove']) for p in plan):,}[/{COLOR_PRIMARY}]")
+        self.console.print(f"  Already members (skipped): [{COLOR_DIM}]{sum(p['already_member'] for p in plan):,}[/{COLOR_DIM}]")
+        self.console.print(f"  Groups without changes: [{COLOR_DIM}]{unchanged:,}[/{COLOR_DIM}]")
+        self.console.print(f"  API requests: [{COLOR_PRIMARY}]{len(plan_requests(plan)):,}[/{COLOR_PRIMARY}]")
+    
+    def _exports_path(self, prefix: str) -> str:
+        """Builds a timestamped path in the exports directory"""
+        exports_dir = "exports"
+        if not os.path.exists(exports_dir):
+            os.makedirs(exports_dir)
+        
+        timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        return os.path.join(exports_dir, f"{prefix}_{timestamp}.csv")
+    
+    def _export_unresolved(self, unresolved: list):
+        """Offers a CSV export of rows that could not be resolved"""
+        if not unresolved or not Confirm.ask(f"\nExport {len(unresolved):,} unresolved rows as CSV?"):
+            return
+        
+        filepath = self._exports_path("bulk_assignment_unresolved")
+        
+        if export_to_csv(filepath, ["Row", "User", "Group", "Reason"], unresolved):
+            self.console.print(f"[{COLOR_SUCCESS}]✓ CSV exported to:[/{COLOR_SUCCESS}] [{COLOR_PRIMARY}]{filepath}[/{COLOR_PRIMARY}]")
+        else:
+            self.console.print(f"[{COLOR_ERROR}]✗ Error during CSV export[/{COLOR_ERROR}]")
+    
+    def _export_plan(self, plan: list):
+        """Exports the plan (one row per change) as CSV"""
+        users_by_id = {u.id: u for u in self.all_users}
+        rows = []
+        for entry in plan:
+            for action, user_ids in (("add", entry['to_add']), ("remove", entry['to_remove'])):
+                for user_id in user_ids:
+                    user = users_by_id.get(user_id)
+                    rows.append([
+                        action,
+                        entry['group_id'],
+                        entry['group_name'],
+                        user_id,
+                        getattr(user, 'userName', '') if user else '',
+                        getattr(user, 'email', '') if user else '',
+                    ])
+        
+        filepath = self._exports_path("group_sync_plan")
+        
+        if export_to_csv(filepath, ["Action", "Group-ID", "Group", "User-ID", "Username", "Email"], rows):
+            self.console.print(f"[{COLOR_SUCCESS}]✓ CSV exported to:[/{COLOR_SUCCESS}] [{COLOR_PRIMARY}]{filepath}[/{COLOR_PRIMARY}]")
+        else:
+            self.console.print(f"[{COLOR_ERROR}]✗ Error during CSV export[/{COLOR_ERROR}]")
+    
+    async def _apply_assignment_plan(self, plan: list):
+        """Applies the plan: batched add/remove requests with bounded concurrency"""
+        requests = plan_requests(plan)
+        total_changes = sum(len(user_ids) for _, _, user_ids in requests)
+        
+        # Suppress SDK log outputs
+        import sys
+        import io
+        old_stderr = sys.stderr
+        sys.stderr = io.StringIO()
+        
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                TextColumn("{task.completed:,}/{task.total:,}"),
+                console=self.console
+            ) as progress:
+                task = progress.add_task(f"[{COLOR_PRIMARY}]Applying changes in {len(requests):,} requests...[/{COLOR_PRIMARY}]", total=total_changes)
+                
+                failures = await apply_sync_plan(
+                    self.dracoon,
+                    plan,
+                    on_request_done=lambda request, result: progress.update(task, advance=len(request[2]))
+                )
+        finally:
+            sys.stderr = old_stderr
+        
+        self.console.print(f"\n[{COLOR_SUCCESS}]✓ {total_changes - len(failures):,} of {total_changes:,} changes successfully applied![/{COLOR_SUCCESS}]")
+        
+        if failures:
+            self.console.print(f"[{COLOR_ERROR}]✗ {len(failures):,} changes failed:[/{COLOR_ERROR}]\n")
+            
+            group_names = {entry['group_id']: entry['group_name'] for entry in plan}
+            users_by_id = {u.id: u for u in self.all_users}
+            
+            table = Table(show_header=True, header_style=f"bold {COLOR_ERROR}", box=TABLE_BOX)
+            table.add_column("Action", width=8)
+            table.add_column("Group", width=30)
+            table.add_column("Email", width=35)
+            table.add_column("User-ID", style=COLOR_DIM, width=10)
+            
+            for failure in failures[:20]:
+                user = users_by_id.get(failure['user_id'])
+                table.add_row(
+                    failure['action'],
+                    group_names.get(failure['group_id'], str(failure['group_id'])),
+                    getattr(user, 'email', '') if user else '',
+                    str(failure['user_id'])
+                )
+            
+            self.console.print(table)
+            
+            if len(failures) > 20:
+                self.console.print(f"\n[{COLOR_WARNING}]Note: {len(failures) - 20} additional failures not shown.[/{COLOR_WARNING}]")
+            self.console.print(f"\n[{COLOR_DIM}]Note: These users may be guest users or have special permissions.[/{COLOR_DIM}]")
+        
+        self.console.print()
+        pause(self.console)
 
 
 def main(dracoon: DRACOON):